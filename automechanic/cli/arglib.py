@@ -1,6 +1,16 @@
 """ library of command-line arguments for automech
 """
 
+# batch arg(s)
+BATCH_FILE = (
+    'batch_file',
+    (
+        ('type', str),
+        ('help', "file with one automech command per line, as JSON "
+                 "(- for stdin)"),
+    )
+)
+
 # common subcommand arg(s)
 SUBCMD = (
     'subcommand',
@@ -34,6 +44,14 @@ PRINT_OUT = (
     )
 )
 
+PROFILE = (
+    'profile',
+    (
+        ('action', 'store_true'),
+        ('help', "write cProfile statistics next to the log file")
+    )
+)
+
 FILESYSTEM_PREFIX = (
     'filesystem_prefix',
     (
@@ -46,7 +64,47 @@ REACTIONS_CSV = (
     'reactions_csv',
     (
         ('type', str),
-        ('help', "CSV with reaction data"),
+        ('help', "reaction table (.csv, .feather, .parquet, or .npz)"),
+    )
+)
+
+CHUNK_SIZE = (
+    'chunk_size',
+    (
+        ('type', int),
+        ('help', "stream the table in chunks of this many rows")
+    )
+)
+
+NPROCS = (
+    'nprocs',
+    (
+        ('type', int),
+        ('help', "number of worker processes")
+    )
+)
+
+BATCH_SIZE = (
+    'batch_size',
+    (
+        ('type', int),
+        ('help', "number of items sent to a worker process at a time")
+    )
+)
+
+MAX_STEREOISOMERS = (
+    'max_stereoisomers',
+    (
+        ('type', int),
+        ('help', "maximum number of stereoisomers per species")
+    )
+)
+
+RESUME = (
+    'resume',
+    (
+        ('action', 'store_true'),
+        ('help', "resume after the last row written (requires chunk size)")
     )
 )
 
@@ -54,7 +112,7 @@ SPECIES_CSV = (
     'species_csv',
     (
         ('type', str),
-        ('help', "CSV with species data")
+        ('help', "species table (.csv, .feather, .parquet, or .npz)")
     )
 )
 
@@ -67,6 +125,118 @@ MECHANISM_TXT = (
     )
 )
 
+SPECIES_NAMES = (
+    'species_names',
+    (
+        ('type', str),
+        ('nargs', '+'),
+        ('help', "CHEMKIN species names"),
+    )
+)
+
+DEPTH = (
+    'depth',
+    (
+        ('type', int),
+        ('help', "number of reaction steps away from the species"),
+    )
+)
+
+EXCLUDE_SPECIES = (
+    'exclude_species',
+    (
+        ('type', str),
+        ('nargs', '*'),
+        ('help', "species not to step through, such as small radicals"),
+    )
+)
+
+# reactions arg(s)
+REACTION_CLASS = (
+    'reaction_class',
+    (
+        ('type', str),
+        ('help', "reaction class"),
+    )
+)
+
+UNMAPPED_CSV = (
+    'unmapped_csv',
+    (
+        ('type', str),
+        ('help', "table of the candidates that couldn't be mapped, with "
+                 "their errors"),
+    )
+)
+
+TEMPLATE_TXT = (
+    'template_txt',
+    (
+        ('type', str),
+        ('help', "job input template, with {nodes} and the reaction's "
+                 "species ({q1h}, {q2}, etc.) to fill in"),
+    )
+)
+
+RUN_DIR = (
+    'run_dir',
+    (
+        ('type', str),
+        ('help', "directory to write the job directories to"),
+    )
+)
+
+NTHREADS = (
+    'nthreads',
+    (
+        ('type', int),
+        ('help', "number of threads to write files on"),
+    )
+)
+
+JOB_ARGV = (
+    'job_argv',
+    (
+        ('type', str),
+        ('nargs', '+'),
+        ('help', "command to run in each job directory (put it after -- "
+                 "if it has options)"),
+    )
+)
+
+NODES = (
+    'nodes',
+    (
+        ('type', str),
+        ('nargs', '+'),
+        ('help', "nodes to run jobs on"),
+    )
+)
+
+NODE_LIMIT = (
+    'node_limit',
+    (
+        ('type', int),
+        ('help', "maximum number of jobs to run on a node at a time"),
+    )
+)
+
+RETRIES = (
+    'retries',
+    (
+        ('type', int),
+        ('help', "number of times to rerun a failed job"),
+    )
+)
+
+TIMEOUT = (
+    'timeout',
+    (
+        ('type', float),
+        ('help', "seconds after which to kill a job"),
+    )
+)
+
 # species arg(s)
 SPECIES_ID = (
     'species_id',
@@ -5,11 +5,16 @@ from . import arglib as al
 from .arg import specifier_from_kernel as specifier
 from .clihelp import call_subcommand
 from .clihelp import call_task
+from .clihelp import call_batch
 from .. import task
 
 RXN_CSV_DEF = 'reactions.csv'
 SPC_CSV_DEF = 'species.csv'
+RXN_SUBSET_CSV_DEF = 'reactions_subset.csv'
+RXN_MAPPED_CSV_DEF = 'reactions_mapped.csv'
+RXN_UNMAPPED_CSV_DEF = 'reactions_unmapped.csv'
 RXN_CSV_CHAR = 'r'
+UNMAPPED_CSV_CHAR = 'u'
 SPC_CSV_CHAR = 's'
 
 HOME_DIR = os.path.expanduser("~")
@@ -19,6 +24,20 @@ FILESYSTEM_PREFIX_CHAR = 'f'
 
 STEREO_HANDLING_CHAR = 't'
 
+CHUNK_SIZE_CHAR = 'c'
+RESUME_CHAR = 'r'
+NPROCS_CHAR = 'n'
+BATCH_SIZE_CHAR = 'b'
+MAX_STEREOISOMERS_CHAR = 'm'
+DEPTH_CHAR = 'd'
+EXCLUDE_SPECIES_CHAR = 'x'
+NODES_CHAR = 'n'
+NODE_LIMIT_CHAR = 'l'
+RETRIES_CHAR = 'y'
+TIMEOUT_CHAR = 't'
+RUN_DIR_CHAR = 'd'
+NTHREADS_CHAR = 'j'
+
 
 def automech(argt):
     """ automech command
@@ -28,6 +47,23 @@ def automech(argt):
         subcmds=(
             ('chemkin', chemkin),
             ('species', species),
+            ('reactions', reactions),
+            ('batch', batch),
+        )
+    )
+
+
+def batch(argt):
+    """ run a batch of automech commands in one process
+    """
+    call_batch(
+        argt,
+        automech,
+        specs=(
+            specifier(
+                al.BATCH_FILE, inp=True,
+                extra_kwargs=(('nargs', '?'), ('default', '-')),
+            ),
         )
     )
 
@@ -39,6 +75,7 @@ def chemkin(argt):
         argt,
         subcmds=(
             ('to_csv', chemkin__to_csv),
+            ('subset', chemkin__subset),
         )
     )
 
@@ -69,6 +106,36 @@ def chemkin__to_csv(argt):
     )
 
 
+def chemkin__subset(argt):
+    """ reactions near some species, for targeted calculations
+    """
+    call_task(
+        argt,
+        task.chemkin.subset,
+        specs=(
+            specifier(
+                al.REACTIONS_CSV, inp=True,
+            ),
+            specifier(
+                al.SPECIES_NAMES,
+            ),
+            specifier(
+                al.DEPTH, opt_char=DEPTH_CHAR,
+                extra_kwargs=(('default', task.chemkin.DEFS.SUBSET.DEPTH),),
+            ),
+            specifier(
+                al.EXCLUDE_SPECIES, opt_char=EXCLUDE_SPECIES_CHAR,
+                extra_kwargs=(
+                    ('default', task.chemkin.DEFS.SUBSET.EXCLUDE_SPECIES),),
+            ),
+            specifier(
+                al.REACTIONS_CSV, out=True, opt_char=RXN_CSV_CHAR.upper(),
+                extra_kwargs=(('default', RXN_SUBSET_CSV_DEF),),
+            ),
+        )
+    )
+
+
 def species(argt):
     """ species sub-command
     """
@@ -99,6 +166,21 @@ def species__to_inchi(argt):
                 al.SPECIES_CSV, out=True, opt_char=SPC_CSV_CHAR.upper(),
                 extra_kwargs=(('default', SPC_CSV_DEF),),
             ),
+            specifier(
+                al.CHUNK_SIZE, opt_char=CHUNK_SIZE_CHAR,
+            ),
+            specifier(
+                al.RESUME, opt_char=RESUME_CHAR,
+            ),
+            specifier(
+                al.NPROCS, opt_char=NPROCS_CHAR,
+                extra_kwargs=(('default', task.species.DEFS.TOxINCHI.NPROCS),),
+            ),
+            specifier(
+                al.BATCH_SIZE, opt_char=BATCH_SIZE_CHAR,
+                extra_kwargs=(
+                    ('default', task.species.DEFS.TOxINCHI.BATCH_SIZE),),
+            ),
         )
     )
 
@@ -128,5 +210,168 @@ def species__filesystem(argt):
                 opt_char=FILESYSTEM_PREFIX_CHAR.upper(),
                 extra_kwargs=(('default', FILESYSTEM_PREFIX_DEF),),
             ),
+            specifier(
+                al.CHUNK_SIZE, opt_char=CHUNK_SIZE_CHAR,
+            ),
+            specifier(
+                al.RESUME, opt_char=RESUME_CHAR,
+            ),
+            specifier(
+                al.NPROCS, opt_char=NPROCS_CHAR,
+                extra_kwargs=(
+                    ('default', task.species.DEFS.FILESYSTEM.NPROCS),),
+            ),
+            specifier(
+                al.BATCH_SIZE, opt_char=BATCH_SIZE_CHAR,
+                extra_kwargs=(
+                    ('default', task.species.DEFS.FILESYSTEM.BATCH_SIZE),),
+            ),
+            specifier(
+                al.MAX_STEREOISOMERS, opt_char=MAX_STEREOISOMERS_CHAR,
+                extra_kwargs=(
+                    ('default',
+                     task.species.DEFS.FILESYSTEM.MAX_STEREOISOMERS),),
+            ),
+        )
+    )
+
+
+def reactions(argt):
+    """ reactions sub-command
+    """
+    call_subcommand(
+        argt,
+        subcmds=(
+            ('map_indices', reactions__map_indices),
+            ('setup', reactions__setup),
+            ('run', reactions__run),
+            ('status', reactions__status),
+        )
+    )
+
+
+def reactions__map_indices(argt):
+    """ map the candidates for a reaction class onto atom indices
+    """
+    call_task(
+        argt,
+        task.reactions.map_indices,
+        specs=(
+            specifier(
+                al.REACTION_CLASS,
+                allowed_values=task.reactions.VALS.MAPxINDICES.REACTION_CLASS,
+            ),
+            specifier(
+                al.REACTIONS_CSV, inp=True,
+            ),
+            specifier(
+                al.SPECIES_CSV, inp=True,
+            ),
+            specifier(
+                al.REACTIONS_CSV, out=True, opt_char=RXN_CSV_CHAR.upper(),
+                extra_kwargs=(('default', RXN_MAPPED_CSV_DEF),),
+            ),
+            specifier(
+                al.UNMAPPED_CSV, out=True,
+                opt_char=UNMAPPED_CSV_CHAR.upper(),
+                extra_kwargs=(('default', RXN_UNMAPPED_CSV_DEF),),
+            ),
+        )
+    )
+
+
+def reactions__setup(argt):
+    """ write a job directory for each mapped reaction
+    """
+    call_task(
+        argt,
+        task.reactions.setup,
+        specs=(
+            specifier(
+                al.REACTION_CLASS,
+                allowed_values=task.reactions.VALS.SETUP.REACTION_CLASS,
+            ),
+            specifier(
+                al.REACTIONS_CSV, inp=True, out=True,
+            ),
+            specifier(
+                al.SPECIES_CSV, inp=True,
+            ),
+            specifier(
+                al.TEMPLATE_TXT, inp=True,
+            ),
+            specifier(
+                al.RUN_DIR, out=True, opt_char=RUN_DIR_CHAR.upper(),
+                extra_kwargs=(('default', task.reactions.DEFS.SETUP.RUN_DIR),),
+            ),
+            specifier(
+                al.NODES, opt_char=NODES_CHAR,
+                extra_kwargs=(('default', task.reactions.DEFS.SETUP.NODES),),
+            ),
+            specifier(
+                al.NTHREADS, opt_char=NTHREADS_CHAR,
+                extra_kwargs=(
+                    ('default', task.reactions.DEFS.SETUP.NTHREADS),),
+            ),
+        )
+    )
+
+
+def reactions__run(argt):
+    """ run a job for each created reaction, on a set of nodes
+    """
+    call_task(
+        argt,
+        task.reactions.run,
+        specs=(
+            specifier(
+                al.REACTION_CLASS,
+                allowed_values=task.reactions.VALS.RUN.REACTION_CLASS,
+            ),
+            specifier(
+                al.REACTIONS_CSV, inp=True, out=True,
+            ),
+            specifier(
+                al.TEMPLATE_TXT, inp=True,
+            ),
+            specifier(
+                al.JOB_ARGV,
+            ),
+            specifier(
+                al.NODES, opt_char=NODES_CHAR,
+                extra_kwargs=(('default', task.reactions.DEFS.RUN.NODES),),
+            ),
+            specifier(
+                al.SPECIES_CSV, inp=True, opt_char=SPC_CSV_CHAR,
+                extra_helps=('with InChI strings, to run the largest '
+                             'species first',),
+            ),
+            specifier(
+                al.NODE_LIMIT, opt_char=NODE_LIMIT_CHAR,
+                extra_kwargs=(
+                    ('default', task.reactions.DEFS.RUN.NODE_LIMIT),),
+            ),
+            specifier(
+                al.RETRIES, opt_char=RETRIES_CHAR,
+                extra_kwargs=(('default', task.reactions.DEFS.RUN.RETRIES),),
+            ),
+            specifier(
+                al.TIMEOUT, opt_char=TIMEOUT_CHAR,
+                extra_kwargs=(('default', task.reactions.DEFS.RUN.TIMEOUT),),
+            ),
+        )
+    )
+
+
+def reactions__status(argt):
+    """ report on the job statuses recorded since the table was last updated
+    """
+    call_task(
+        argt,
+        task.reactions.status,
+        specs=(
+            specifier(
+                al.REACTIONS_CSV, inp=True,
+            ),
         )
     )
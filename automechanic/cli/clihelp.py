@@ -2,7 +2,11 @@
 """
 import os
 import sys
+import json
+import time
+import shlex
 import logging
+import cProfile
 from argparse import ArgumentParser
 from argparse import ArgumentDefaultsHelpFormatter
 from itertools import chain
@@ -12,11 +16,17 @@ from .arg import specifier_value_mapping
 from .arg import interpret_specifier
 from .arg import specifier_from_kernel
 from .arg import set_specifier_keyword_value
+from .. import timing
 from ..iohelp import timestamp_if_exists
+from ..sched import error_string
 
 LOG_NAME = specifier_from_kernel(al.LOG_NAME, opt_char='L', out=True)
 LOG_LEVEL = specifier_from_kernel(al.LOG_LEVEL, opt_char='V')
 PRINT_OUT = specifier_from_kernel(al.PRINT_OUT, opt_char='p')
+PROFILE = specifier_from_kernel(al.PROFILE, opt_char='P')
+
+SUMMARY_EXT = '.json'
+PROFILE_EXT = '.prof'
 
 
 def tracker(argv, pos):
@@ -146,14 +156,14 @@ def call_task(argt, task, specs):
     fname = log_file_name(argt)
     log_name_spec = set_specifier_keyword_value(LOG_NAME, 'default', fname)
 
-    extra_specs = (log_name_spec, LOG_LEVEL, PRINT_OUT)
+    extra_specs = (log_name_spec, LOG_LEVEL, PRINT_OUT, PROFILE)
     all_specs = tuple(chain(specs, extra_specs))
     all_vals = parse_arguments(argt, all_specs)
 
     nextra = len(extra_specs)
     vals, extra_vals = all_vals[:-nextra], all_vals[-nextra:]
 
-    log_name, log_level, print_out = extra_vals
+    log_name, log_level, print_out, profile = extra_vals
 
     timestamp_if_exists(log_name)
     logger = _logger(log_name, log_level, print_out)
@@ -161,7 +171,91 @@ def call_task(argt, task, specs):
     cmd_str = command_line(argt)
     logger.info("# {:s}".format(cmd_str))
 
-    task(*vals, logger=logger)
+    try:
+        _run_task(task, vals, logger=logger, cmd_str=cmd_str,
+                  log_name=log_name, profile=profile)
+    finally:
+        _close_logger(logger)
+
+
+def call_batch(argt, command, specs):
+    """ parse remaining arguments to run a batch of commands in one process
+
+    `specs` must specify the batch file, which has one command per line:
+    either a JSON list of arguments or a JSON string with the command line,
+    not including the program name; '-' reads the commands from stdin
+    """
+    argt = increment_tracker(argt)
+    batch_file, = parse_arguments(argt, specs)
+
+    argv, _ = argt
+    if batch_file == '-':
+        nfails = _run_batch(command, argv[0], sys.stdin)
+    else:
+        with open(batch_file, encoding='utf-8') as file_obj:
+            nfails = _run_batch(command, argv[0], file_obj)
+    if nfails:
+        sys.exit(1)
+
+
+def _run_batch(command, prog, file_obj):
+    """ run the commands in a batch file, reporting failures on stderr
+
+    a line that can't be parsed counts as a failed command
+
+    :returns: the number of commands that failed
+    """
+    nfails = 0
+    for num, line in enumerate(map(str.strip, file_obj), start=1):
+        if not line:
+            continue
+        try:
+            args = json.loads(line)
+            args = shlex.split(args) if isinstance(args, str) else list(args)
+            command(make_tracker([prog] + args))
+        except (Exception, SystemExit) as err:  # pylint: disable=W0703
+            nfails += 1
+            sys.stderr.write("Failed: line {:d}: {:s}\n{:s}\n"
+                             .format(num, line, error_string(err)))
+    return nfails
+
+
+def _run_task(task, vals, logger, cmd_str, log_name, profile):
+    """ run a task, timing it and writing a JSON summary next to the log
+
+    with `profile`, cProfile statistics are written next to the log as well
+    """
+    log_base, _ = os.path.splitext(log_name)
+    summ_name = log_base + SUMMARY_EXT
+    prof_name = log_base + PROFILE_EXT
+    prof = cProfile.Profile() if profile else None
+
+    timing.reset()
+    start = time.time()
+    error = None
+    try:
+        if prof is not None:
+            prof.runcall(task, *vals, logger=logger)
+        else:
+            task(*vals, logger=logger)
+    except BaseException as err:
+        error = error_string(err)
+        raise
+    finally:
+        wall_time = time.time() - start
+        summ = timing.summary(command=cmd_str, start_time=start,
+                              wall_time=wall_time, error=error)
+        for stage, stage_time in summ['stages'].items():
+            logger.info("Stage '{:s}': {:.3f} s".format(stage, stage_time))
+        logger.info("Finished in {:.3f} s".format(wall_time))
+
+        timestamp_if_exists(summ_name)
+        timing.write_summary(summ_name, summ)
+
+        if prof is not None:
+            timestamp_if_exists(prof_name)
+            prof.dump_stats(prof_name)
+            logger.info("Wrote profile to {:s}".format(prof_name))
 
 
 def _quit_with_help_message(par):
@@ -206,3 +300,9 @@ def _logger(log_name, log_level, print_out):
         logger.addHandler(shandler)
 
     return logger
+
+
+def _close_logger(logger):
+    for handler in tuple(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
@@ -0,0 +1,92 @@
+""" molecular formulas and element balance
+
+A formula is a dictionary of element counts, keyed by symbols as they are
+written in InChI formulas ('C', 'H', 'Ar'). Charges are counted as electrons,
+under the symbol 'E' as in CHEMKIN thermo data, so that the element balance
+of a reaction also covers its charge balance.
+"""
+import re
+import numpy
+from . import stoich
+from .mol.inchi import formula_layer as _inchi_formula_layer
+from .mol.inchi import key_layer_content as _inchi_key_layer_content
+
+ELECTRON = 'E'
+
+_COMPONENT_PATTERN = re.compile(r'^(\d*)(.*)$')
+_ELEMENT_PATTERN = re.compile(r'([A-Z][a-z]?)(\d*)')
+_COMPONENT_FORMULA_PATTERN = re.compile(r'^(?:[A-Z][a-z]?\d*)+$')
+
+
+def from_string(fml_str):
+    """ formula from a string such as 'C2H6O', or '2CH4.H2O' for an InChI
+    formula with several components
+    """
+    fml = {}
+    for cmp_str in fml_str.split('.'):
+        mult, cmp_str = _COMPONENT_PATTERN.match(cmp_str).groups()
+        mult = int(mult) if mult else 1
+        assert _COMPONENT_FORMULA_PATTERN.match(cmp_str), fml_str
+        for sym, cnt in _ELEMENT_PATTERN.findall(cmp_str):
+            fml[sym] = fml.get(sym, 0) + mult * (int(cnt) if cnt else 1)
+    return fml
+
+
+def from_inchi(ich):
+    """ formula from an InChI string, with any charge counted as electrons
+    """
+    fml = from_string(_inchi_formula_layer(ich))
+    # protons (/p) add hydrogens and positive charge
+    nprot = _charge_sum(_inchi_key_layer_content(ich, 'p'))
+    charge = _charge_sum(_inchi_key_layer_content(ich, 'q')) + nprot
+    if nprot:
+        fml['H'] = fml.get('H', 0) + nprot
+    if charge:
+        fml[ELECTRON] = -charge
+    return {sym: cnt for sym, cnt in fml.items() if cnt}
+
+
+def composition_matrix(fmls, elems=None):
+    """ element counts for a sequence of species formulas
+
+    returns the elements (sorted, unless given) and a (nspc, nelem) array;
+    formulas that are None (unknown) give rows of NaNs
+    """
+    if elems is None:
+        elems = tuple(sorted(set().union(*filter(None, fmls))))
+    col_dct = {elem: col for col, elem in enumerate(elems)}
+    cmp_arr = numpy.zeros((len(fmls), len(elems)))
+    for row, fml in enumerate(fmls):
+        if fml is None:
+            cmp_arr[row] = numpy.nan
+            continue
+        for sym, cnt in fml.items():
+            cmp_arr[row, col_dct[sym]] = cnt
+    return elems, cmp_arr
+
+
+def imbalances(rct_mat, prd_mat, cmp_arr):
+    """ net change in each element for each reaction (zero if balanced)
+
+    with one sparse product of the net stoichiometry (see `stoich`) and the
+    species composition matrix
+    """
+    return stoich.dot(stoich.net(rct_mat, prd_mat), cmp_arr)
+
+
+def unbalanced_reactions(rxns, elems, imb_arr):
+    """ (reaction index, reaction, {element: net change}) for reactions that
+    don't balance
+    """
+    rows = numpy.flatnonzero(numpy.any(imb_arr != 0., axis=1))
+    return tuple((row, rxns[row],
+                  {elem: int(imb) for elem, imb in zip(elems, imb_arr[row])
+                   if imb})
+                 for row in rows)
+
+
+def _charge_sum(layer_str):
+    """ total charge in a charge layer such as '-1' or '+1;-1'
+    """
+    return (sum(int(chg) for chg in re.findall(r'[+-]\d+', layer_str))
+            if layer_str else 0)
@@ -3,7 +3,11 @@
 from __future__ import unicode_literals
 from builtins import open
 import os
+import re
+import json
 import time
+import mmap
+import contextlib
 import yaml
 
 
@@ -19,12 +23,123 @@ def timestamp_if_exists(file_pth):
 def read_string(file_pth):
     """ read in a file as a string
     """
-    with open(file_pth, encoding='utf8', errors='ignore') as file_obj:
-        string = file_obj.read()
+    with mapped(file_pth) as buf:
+        string = _decode(buf)
 
     return string
 
 
+def read_offsets(file_pth, offsets):
+    """ read in the regions of a file between pairs of byte offsets
+    """
+    strings = []
+    with mapped(file_pth) as buf, memoryview(buf) as view:
+        for start, end in offsets:
+            with view[start:end] as region:
+                strings.append(_decode(region))
+
+    return tuple(strings)
+
+
+def find_offsets(file_pth, start_pattern, end_pattern):
+    """ byte offsets of the regions running from each match of
+    `start_pattern` through the next match of `end_pattern`
+    """
+    start_rgx = _bytes_regex(start_pattern)
+    end_rgx = _bytes_regex(end_pattern)
+
+    offsets = []
+    with mapped(file_pth) as buf:
+        start_match = start_rgx.search(buf)
+        while start_match:
+            end_match = end_rgx.search(buf, start_match.end())
+            end = end_match.end() if end_match else len(buf)
+            offsets.append((start_match.start(), end))
+            start_match = start_rgx.search(buf, end)
+
+    return tuple(offsets)
+
+
+def find_lines(file_pth, pattern, start=0, end=None):
+    """ byte offsets and strings of the lines matching `pattern` between two
+    byte offsets
+    """
+    rgx = _bytes_regex(pattern)
+
+    lines = []
+    with mapped(file_pth) as buf:
+        end = len(buf) if end is None else end
+        for match in rgx.finditer(buf, start, end):
+            line_start = buf.rfind(b'\n', 0, match.start()) + 1
+            line_end = buf.find(b'\n', match.end())
+            line_end = len(buf) if line_end < 0 else line_end
+            lines.append((line_start, _decode(buf[line_start:line_end])))
+
+    return tuple(lines)
+
+
+def cached_index(file_pth, build, suffix='.idx'):
+    """ an index of a file, built by `build(file_pth)` and cached next to it
+
+    The index must be JSON-serializable. It is rebuilt if the file has
+    changed since it was cached, and isn't cached if it can't be written.
+    """
+    stat = os.stat(file_pth)
+    stamp = [stat.st_size, stat.st_mtime_ns]
+    idx_pth = file_pth + suffix
+
+    if os.path.isfile(idx_pth):
+        try:
+            with open(idx_pth, encoding='utf-8') as file_obj:
+                cache = json.load(file_obj)
+            if cache['stamp'] == stamp:
+                return cache['index']
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    idx = build(file_pth)
+    # write through a temporary file, so that a half-written index is never
+    # read back
+    root, ext = os.path.splitext(idx_pth)
+    tmp_pth = '{:s}.tmp{:s}'.format(root, ext)
+    try:
+        with open(tmp_pth, mode='w', encoding='utf-8') as file_obj:
+            json.dump({'stamp': stamp, 'index': idx}, file_obj)
+        os.replace(tmp_pth, idx_pth)
+    except OSError:
+        pass
+
+    return idx
+
+
+@contextlib.contextmanager
+def mapped(file_pth):
+    """ a read-only memory map of a file
+    """
+    with open(file_pth, mode='rb') as file_obj:
+        if os.fstat(file_obj.fileno()).st_size == 0:
+            # empty files can't be mapped
+            yield b''
+        else:
+            buf = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield buf
+            finally:
+                buf.close()
+
+
+def _bytes_regex(pattern):
+    return re.compile(pattern.encode(), flags=re.MULTILINE)
+
+
+def _decode(buf):
+    string = str(buf, encoding='utf8', errors='ignore')
+    # universal newlines, as for files opened in text mode
+    if '\r' in string:
+        string = string.replace('\r\n', '\n').replace('\r', '\n')
+    return string
+
+
 # def write_string(file_pth, string):
 #     """ write a string to a file
 #     """
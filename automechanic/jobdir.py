@@ -0,0 +1,134 @@
+""" job directories: input templates and bulk writes
+
+Templates are parsed once (`template`) and then rendered by joining their
+pieces, rather than parsing the format string again for every job.
+
+Job directories are written from {file name: contents} dictionaries on a
+pool of threads (`write_all`), since on parallel file systems most of the
+time goes into waiting on file creation. Each directory keeps a digest of
+what it was written from, so that directories that are already current
+(`current_all`) can be left alone.
+"""
+import os
+import string
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+DIGEST_NAME = '.digest'
+
+_FORMATTER = string.Formatter()
+
+
+# templates
+def template(tpl_str):
+    """ a pre-parsed `str.format` template
+    """
+    tpl = tuple(_FORMATTER.parse(tpl_str))
+    assert all(fld is None or '{' not in spec for _, fld, spec, _ in tpl), (
+        "Nested replacement fields aren't supported")
+    return tpl
+
+
+def template_fields(tpl):
+    """ the names of the values a template needs
+    """
+    return frozenset(fld.split('.')[0].split('[')[0]
+                     for _, fld, _, _ in tpl if fld is not None)
+
+
+def render(tpl, val_dct):
+    """ render a template, as `tpl_str.format(**val_dct)` would
+    """
+    pieces = []
+    for lit, fld, spec, conv in tpl:
+        pieces.append(lit)
+        if fld is not None:
+            val, _ = _FORMATTER.get_field(fld, (), val_dct)
+            val = _FORMATTER.convert_field(val, conv)
+            pieces.append(format(val, spec))
+    return ''.join(pieces)
+
+
+# directories
+def digest(file_dct):
+    """ a hash of the file names and contents for a job directory
+    """
+    hsh = hashlib.sha256()
+    for name in sorted(file_dct):
+        for part in (name, file_dct[name]):
+            data = part.encode()
+            hsh.update(len(data).to_bytes(8, 'little'))
+            hsh.update(data)
+    return hsh.hexdigest()
+
+
+def is_current(dir_pth, dgst):
+    """ was a job directory last written with this digest?
+    """
+    dgst_pth = os.path.join(dir_pth, DIGEST_NAME)
+    ret = False
+    if os.path.isfile(dgst_pth):
+        with open(dgst_pth, encoding='utf-8') as file_obj:
+            ret = file_obj.read() == dgst
+    return ret
+
+
+def write(dir_pth, file_dct, dgst=None):
+    """ write the files for a job directory, along with their digest
+
+    :param dgst: the digest to record, if not the hash of the files (such as
+        a hash of what they were generated from)
+    """
+    dgst = digest(file_dct) if dgst is None else dgst
+    dgst_pth = os.path.join(dir_pth, DIGEST_NAME)
+    os.makedirs(dir_pth, exist_ok=True)
+    # if this write is cut short, the directory won't look current
+    if os.path.exists(dgst_pth):
+        os.remove(dgst_pth)
+    for name, contents in file_dct.items():
+        file_pth = os.path.join(dir_pth, name)
+        with open(file_pth, 'w', encoding='utf-8') as file_obj:
+            file_obj.write(contents)
+    with open(dgst_pth, 'w', encoding='utf-8') as file_obj:
+        file_obj.write(dgst)
+
+
+def current_all(dir_pths, dgsts, nthreads=1):
+    """ check a series of job directories against their digests, on a pool
+    of threads
+
+    :returns: whether each directory is current
+    """
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        return tuple(executor.map(is_current, dir_pths, dgsts))
+
+
+def write_all(dir_pths, file_dcts, dgsts=None, nthreads=1, callback=None):
+    """ write a series of job directories on a pool of threads
+
+    :param callback: called as `callback(pos, ok, val)` for each directory,
+        in order, as soon as it is written (and before the pool is shut down)
+    :returns: (ok, None or exception) for each directory
+    """
+    dir_pths = tuple(dir_pths)
+    dgsts = (tuple(dgsts) if dgsts is not None else
+             (None,) * len(dir_pths))
+    rets = []
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        for pos, (ok, val) in enumerate(
+                executor.map(_try_write, dir_pths, file_dcts, dgsts)):
+            if callback is not None:
+                callback(pos, ok, val)
+            rets.append((ok, val))
+    return tuple(rets)
+
+
+def _try_write(dir_pth, file_dct, dgst):
+    """ `write`, returning (ok, None or exception)
+    """
+    try:
+        write(dir_pth, file_dct, dgst=dgst)
+        ret = (True, None)
+    except (OSError, UnicodeError) as exc:
+        ret = (False, exc)
+    return ret
@@ -0,0 +1,116 @@
+""" append-only journals of table row updates
+
+A journal sits next to its table file and records row updates as they
+happen, one JSON object per line, with the row index under `tab.IDX_KEY`, the
+time under `TIME_KEY` and the new column values. Appending a line costs the
+same however large the table is, and a crash loses at most the line being
+written (a partial last line is ignored when the journal is read).
+
+`compact` folds a journal into its table, through a temporary file that
+replaces the table in one step, and then removes the journal. Updates are
+applied by row index with the latest one winning, so compacting the same
+journal twice (after a crash between the two steps) does no harm.
+"""
+import os
+import json
+import time
+import contextlib
+import collections
+from . import tab
+
+SUFFIX = '.journal'
+TIME_KEY = 'time'
+
+
+def path_(tbl_pth):
+    """ the journal path for a table file
+    """
+    return tbl_pth + SUFFIX
+
+
+@contextlib.contextmanager
+def writer(jnl_pth):
+    """ a function that appends an update to a journal, called as
+    `append(idx, **vals)`
+
+    each update is flushed as it is written, and the journal is synced to
+    disk when the context exits
+    """
+    with open(jnl_pth, 'a', encoding='utf-8') as file_obj:
+
+        def _append(idx, **vals):
+            rec = {tab.IDX_KEY: int(idx), TIME_KEY: round(time.time(), 3)}
+            rec.update(vals)
+            file_obj.write(json.dumps(rec) + '\n')
+            file_obj.flush()
+
+        try:
+            yield _append
+        finally:
+            os.fsync(file_obj.fileno())
+
+
+def read(jnl_pth):
+    """ the updates in a journal, in order (none if it doesn't exist)
+    """
+    recs = []
+    if os.path.exists(jnl_pth):
+        with open(jnl_pth, encoding='utf-8') as file_obj:
+            for line in file_obj:
+                if not line.endswith('\n'):
+                    break
+                recs.append(json.loads(line))
+    return recs
+
+
+def latest(jnl_pth):
+    """ the latest values of each updated row, by row index, in the order
+    the rows were first updated
+    """
+    val_dct = collections.OrderedDict()
+    for rec in read(jnl_pth):
+        rec = dict(rec)
+        idx = rec.pop(tab.IDX_KEY)
+        val_dct.setdefault(idx, {}).update(rec)
+    return val_dct
+
+
+def compact(tbl_pth, jnl_pth=None, keys=None):
+    """ fold a journal into its table and remove it
+
+    :param keys: the columns to update; by default, all of the ones in the
+        journal apart from the time
+    :returns: the number of rows updated
+    """
+    jnl_pth = path_(tbl_pth) if jnl_pth is None else jnl_pth
+    val_dct = latest(jnl_pth)
+    if val_dct:
+        keys = (tuple(keys) if keys is not None else
+                tuple(collections.OrderedDict.fromkeys(
+                    key for vals in val_dct.values() for key in vals
+                    if key != TIME_KEY)))
+
+        tbl = tab.read(tbl_pth)
+        pos_dct = {idx: pos for pos, idx in enumerate(tab.idxs_(tbl))}
+        for key in keys:
+            col = (list(tbl[key]) if key in tab.keys_(tbl) else
+                   [None] * len(tbl))
+            for idx, vals in val_dct.items():
+                if key in vals:
+                    col[pos_dct[idx]] = vals[key]
+            tbl[key] = col
+        _write_atomic(tbl_pth, tbl)
+
+    if os.path.exists(jnl_pth):
+        os.remove(jnl_pth)
+    return len(val_dct)
+
+
+def _write_atomic(tbl_pth, tbl):
+    """ write a table through a temporary file, so that it is never left
+    half-written
+    """
+    root, ext = os.path.splitext(tbl_pth)
+    tmp_pth = '{:s}.tmp{:s}'.format(root, ext)
+    tab.write(tmp_pth, tbl)
+    os.replace(tmp_pth, tbl_pth)
@@ -0,0 +1,124 @@
+""" rate constants, vectorized over reaction tables
+
+Values are returned as 2d arrays with one row per reaction and one column per
+temperature. Rate constants are in mol, cm, s units and activation energies
+in cal/mol, as `parse.chemkin.reaction_data` gives them.
+"""
+import numpy
+from . import tab
+from . import thermo
+from . import stoich
+from .params import SPC as _SPC
+from .params import RXN as _RXN
+from .parse.chemkin import reaction_is_reversible as _reaction_is_reversible
+from .parse.chemkin import reaction_has_third_body as _reaction_has_third_body
+
+GAS_CONSTANT_CAL = thermo.GAS_CONSTANT_CAL   # cal mol-1 K-1
+GAS_CONSTANT_ATM_CM3 = 82.057366            # atm cm3 mol-1 K-1
+BOLTZMANN_OVER_PLANCK = 2.083661912e10      # s-1 K-1
+AVOGADRO = 6.02214076e23
+
+# upper limits on rate constants, by the number of reactants (counting a +M
+# third body): the transition state theory prefactor kT/h for one, and a
+# gas-kinetic collision rate of 1e-9 cm3 molecule-1 s-1 for two
+COLLISION_LIMITS = {1: lambda temps: BOLTZMANN_OVER_PLANCK * temps,
+                    2: lambda temps: numpy.full_like(temps, 1e-9 * AVOGADRO)}
+
+
+def rate_constants(rxn_tbl, temps):
+    """ forward rate constants, k = A T^b exp(-E/RT)
+    """
+    temps = _temperatures(temps)
+    arrh = tab.arr_(rxn_tbl, _RXN.TAB.ARRH_KEYS, typ=float)
+    arrh_a, arrh_b, arrh_e = (arrh[:, idx:idx+1] for idx in range(3))
+    return arrh_a * numpy.exp(arrh_b * numpy.log(temps) -
+                              arrh_e / (GAS_CONSTANT_CAL * temps))
+
+
+def stoichiometry(rxn_tbl, spc_tbl):
+    """ reactant and product stoichiometry matrices (see `stoich`)
+
+    the columns follow the rows of the species table
+    """
+    spcs = tuple(spc_tbl[_SPC.TAB.NAME_KEY])
+    rxns = tuple(rxn_tbl[_RXN.TAB.NAME_KEY])
+    all_spcs, rct_mat, prd_mat = stoich.matrices(rxns, spcs)
+    if len(all_spcs) > len(spcs):
+        raise ValueError("Species missing from the species table: {:s}"
+                         .format(' '.join(all_spcs[len(spcs):])))
+    return rct_mat, prd_mat
+
+
+def equilibrium_constants(rxn_tbl, spc_tbl, temps, stoich_mats=None):
+    """ concentration-based equilibrium constants, Kc = Kp (P0/RT)^dn
+
+    with P0 = 1 atm; the Gibbs energies of all species are evaluated once and
+    combined through the net stoichiometry matrix, built from
+    `stoichiometry()` if the matrices aren't given
+    """
+    temps = _temperatures(temps)
+    stoich_mats = (stoichiometry(rxn_tbl, spc_tbl) if stoich_mats is None
+                   else stoich_mats)
+    net_mat = stoich.net(*stoich_mats)
+    gibbs = thermo.gibbs_over_rt(spc_tbl, temps[0])
+    dgibbs = stoich.dot(net_mat, gibbs)
+    dnum = stoich.dot(net_mat, numpy.ones((len(spc_tbl), 1)))
+    with numpy.errstate(over='ignore'):
+        return numpy.exp(-dgibbs - dnum * numpy.log(GAS_CONSTANT_ATM_CM3 *
+                                                    temps))
+
+
+def reverse_rate_constants(rxn_tbl, spc_tbl, temps, stoich_mats=None):
+    """ reverse rate constants, from detailed balance (zero if irreversible)
+    """
+    temps = _temperatures(temps)
+    rate_cfts = rate_constants(rxn_tbl, temps[0])
+    eq_cfts = equilibrium_constants(rxn_tbl, spc_tbl, temps[0], stoich_mats)
+    with numpy.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        rev_rate_cfts = rate_cfts / eq_cfts
+    is_rev = numpy.array(
+        [_reaction_is_reversible(rxn) for rxn in rxn_tbl[_RXN.TAB.NAME_KEY]],
+        dtype=bool)
+    rev_rate_cfts[~is_rev] = 0.
+    return rev_rate_cfts
+
+
+def rate_violations(rxn_tbl, spc_tbl, temps):
+    """ check forward and reverse rate constants over a temperature grid
+
+    returns boolean (nrxn, ntmp) arrays for rate constants that are negative
+    or not finite, and for rate constants above the collision limit of
+    reactions with one or two reactants (forward) or products (reverse),
+    under the keys 'negative', 'nonfinite', 'over_limit', 'rev_negative',
+    'rev_nonfinite' and 'rev_over_limit'
+    """
+    temps = _temperatures(temps)
+    rct_mat, prd_mat = stoichiometry(rxn_tbl, spc_tbl)
+    rate_cfts = rate_constants(rxn_tbl, temps[0])
+    rev_rate_cfts = reverse_rate_constants(rxn_tbl, spc_tbl, temps[0],
+                                           (rct_mat, prd_mat))
+    has_m = numpy.array([_reaction_has_third_body(rxn)
+                         for rxn in rxn_tbl[_RXN.TAB.NAME_KEY]], dtype=int)
+    ones = numpy.ones(len(spc_tbl))
+    nrcts = has_m + stoich.dot(rct_mat, ones)
+    nprds = has_m + stoich.dot(prd_mat, ones)
+
+    viol_dct = {}
+    for prefix, vals, nrgts in (('', rate_cfts, nrcts),
+                                ('rev_', rev_rate_cfts, nprds)):
+        limits = numpy.full(vals.shape, numpy.inf)
+        for nrgt, limit_ in COLLISION_LIMITS.items():
+            limits[nrgts == nrgt] = limit_(temps)
+        with numpy.errstate(invalid='ignore'):
+            viol_dct[prefix + 'negative'] = vals < 0.
+            viol_dct[prefix + 'nonfinite'] = ~numpy.isfinite(vals)
+            viol_dct[prefix + 'over_limit'] = numpy.abs(vals) > limits
+    return viol_dct
+
+
+def _temperatures(temps):
+    """ temperatures as a (1, ntmp) row, to broadcast against reactions
+    """
+    temps = numpy.atleast_1d(numpy.asarray(temps, dtype=float))
+    assert temps.ndim == 1
+    return temps[numpy.newaxis, :]
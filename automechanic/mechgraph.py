@@ -0,0 +1,187 @@
+""" mechanism graphs: species-reaction adjacency for whole mechanisms
+
+A mechanism graph is a bipartite graph of species and reactions, stored as
+reactant and product stoichiometry matrices in CSR form (see `stoich`) along
+with their transposes. Reaction rows give the species of a reaction and
+species rows give its reactions, so lookups in either direction take time
+proportional to the number of neighbors.
+"""
+import collections
+import numpy
+from . import stoich
+
+
+# constructors
+def from_reactions(rxns, spcs=()):
+    """ mechanism graph from CHEMKIN reaction names
+
+    species in `spcs` come first, in that order, followed by any others found
+    in the reactions
+    """
+    spcs, rct_mat, prd_mat = stoich.matrices(rxns, spcs)
+    return _from_matrices(spcs, tuple(rxns), rct_mat, prd_mat)
+
+
+def _from_matrices(spcs, rxns, rct_mat, prd_mat):
+    spc_idx_dct = {spc: idx for idx, spc in enumerate(spcs)}
+    return (spcs, rxns, rct_mat, prd_mat, stoich.transpose(rct_mat),
+            stoich.transpose(prd_mat), spc_idx_dct)
+
+
+# getters
+def species(mgr):
+    """ species names, in column order
+    """
+    spcs, _, _, _, _, _, _ = mgr
+    return spcs
+
+
+def reactions(mgr):
+    """ reaction names, in row order
+    """
+    _, rxns, _, _, _, _, _ = mgr
+    return rxns
+
+
+def stoichiometry_matrices(mgr):
+    """ reactant and product stoichiometry matrices
+    """
+    _, _, rct_mat, prd_mat, _, _, _ = mgr
+    return rct_mat, prd_mat
+
+
+# lookups
+def consuming_reactions(mgr, spc):
+    """ indices of the reactions with this species as a reactant
+    """
+    _, _, _, _, spc_rct_mat, _, spc_idx_dct = mgr
+    rxn_idxs, _ = stoich.row_entries(spc_rct_mat, spc_idx_dct[spc])
+    return tuple(map(int, rxn_idxs))
+
+
+def producing_reactions(mgr, spc):
+    """ indices of the reactions with this species as a product
+    """
+    _, _, _, _, _, spc_prd_mat, spc_idx_dct = mgr
+    rxn_idxs, _ = stoich.row_entries(spc_prd_mat, spc_idx_dct[spc])
+    return tuple(map(int, rxn_idxs))
+
+
+def reactants(mgr, rxn_idx):
+    """ reactant species of a reaction, with their counts
+    """
+    spcs, _, rct_mat, _, _, _, _ = mgr
+    spc_idxs, cnts = stoich.row_entries(rct_mat, rxn_idx)
+    return {spcs[idx]: int(cnt) for idx, cnt in zip(spc_idxs, cnts)}
+
+
+def products(mgr, rxn_idx):
+    """ product species of a reaction, with their counts
+    """
+    spcs, _, _, prd_mat, _, _, _ = mgr
+    spc_idxs, cnts = stoich.row_entries(prd_mat, rxn_idx)
+    return {spcs[idx]: int(cnt) for idx, cnt in zip(spc_idxs, cnts)}
+
+
+def next_steps(mgr, spc, both_ways=False, exclude=()):
+    """ (reaction index, species) for each species one reaction away
+
+    follows reactions from reactants to products, and also from products to
+    reactants if `both_ways` is set (for reversible reactions); species in
+    `exclude` are left out, which is useful for pools of small radicals such
+    as H and OH that would otherwise connect everything
+    """
+    steps = []
+    for rxn_idx in consuming_reactions(mgr, spc):
+        steps.extend((rxn_idx, nspc) for nspc in products(mgr, rxn_idx))
+    if both_ways:
+        for rxn_idx in producing_reactions(mgr, spc):
+            steps.extend((rxn_idx, nspc) for nspc in reactants(mgr, rxn_idx))
+    exclude = set(exclude) | {spc}
+    return tuple((rxn_idx, nspc) for rxn_idx, nspc in steps
+                 if nspc not in exclude)
+
+
+def shortest_path(mgr, source, target, both_ways=False, exclude=()):
+    """ a shortest reaction pathway from one species to another
+
+    returned as (source, reaction index, species, ..., target), or None if
+    there is no pathway; found by breadth-first search over `next_steps`
+    """
+    prev_dct = {source: None}
+    queue = collections.deque([source])
+    while queue and target not in prev_dct:
+        spc = queue.popleft()
+        for rxn_idx, nspc in next_steps(mgr, spc, both_ways=both_ways,
+                                        exclude=exclude):
+            if nspc not in prev_dct:
+                prev_dct[nspc] = (rxn_idx, spc)
+                queue.append(nspc)
+
+    if target not in prev_dct:
+        return None
+
+    path = [target]
+    while prev_dct[path[-1]] is not None:
+        rxn_idx, spc = prev_dct[path[-1]]
+        path.extend([rxn_idx, spc])
+    return tuple(reversed(path))
+
+
+def neighborhood(mgr, spcs, depth=1, exclude=()):
+    """ indices of the reactions within `depth` steps of some species
+
+    the reactions of the given species (as reactants or products) come at
+    depth 1; the species in those reactions, except for excluded ones, lead
+    on to the reactions at depth 2, and so on
+    """
+    exclude = set(exclude)
+    rxn_idxs = set()
+    seen_spcs = set(spcs)
+    front_spcs = set(spcs)
+    for _ in range(depth):
+        new_rxn_idxs = set()
+        for spc in front_spcs:
+            new_rxn_idxs.update(consuming_reactions(mgr, spc))
+            new_rxn_idxs.update(producing_reactions(mgr, spc))
+        new_rxn_idxs -= rxn_idxs
+        rxn_idxs |= new_rxn_idxs
+
+        front_spcs = set()
+        for rxn_idx in new_rxn_idxs:
+            front_spcs.update(reactants(mgr, rxn_idx))
+            front_spcs.update(products(mgr, rxn_idx))
+        front_spcs -= seen_spcs | exclude
+        seen_spcs |= front_spcs
+    return tuple(sorted(rxn_idxs))
+
+
+def subgraph(mgr, rxn_idxs):
+    """ mechanism graph for a subset of the reactions
+
+    keeps only the species that take part in them, in their original order
+    """
+    spcs, rxns, rct_mat, prd_mat, _, _, _ = mgr
+    rxn_idxs = numpy.asarray(rxn_idxs, dtype=int)
+
+    sub_trips = []
+    for mat in (rct_mat, prd_mat):
+        data, indices, indptr, _ = mat
+        starts, ends = indptr[rxn_idxs], indptr[rxn_idxs+1]
+        rows = numpy.repeat(numpy.arange(len(rxn_idxs)), ends - starts)
+        pos = (numpy.concatenate([numpy.arange(start, end) for start, end
+                                  in zip(starts, ends)])
+               if len(rxn_idxs) else numpy.array([], dtype=int))
+        sub_trips.append((rows, indices[pos], data[pos]))
+
+    spc_idxs = numpy.unique(numpy.concatenate(
+        [cols for _, cols, _ in sub_trips]))
+    col_map = numpy.full(len(spcs), -1)
+    col_map[spc_idxs] = numpy.arange(len(spc_idxs))
+    shape = (len(rxn_idxs), len(spc_idxs))
+    sub_rct_mat, sub_prd_mat = (
+        stoich.from_triples(rows, col_map[cols], data, shape=shape)
+        for rows, cols, data in sub_trips)
+    return _from_matrices(tuple(spcs[idx] for idx in spc_idxs),
+                          tuple(rxns[idx] for idx in rxn_idxs),
+                          sub_rct_mat, sub_prd_mat)
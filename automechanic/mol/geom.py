@@ -22,6 +22,23 @@ def connectivity_graph(geo):
     return cgr
 
 
+def xyz_string(geo, first_keys=(), comment=''):
+    """ .xyz file string of a cartesian geometry
+
+    the atoms in `first_keys` are moved to the front, in that order, with the
+    others following in their original order
+    """
+    first_keys = tuple(first_keys)
+    keys = first_keys + tuple(key for key in range(len(geo))
+                              if key not in first_keys)
+    lines = ['{:d}'.format(len(geo)), comment]
+    for key in keys:
+        sym, (xcoo, ycoo, zcoo) = geo[key]
+        lines.append('{:2s} {:15.10f} {:15.10f} {:15.10f}'
+                     .format(sym, xcoo, ycoo, zcoo))
+    return '\n'.join(lines) + '\n'
+
+
 def _connectivity_graph_and_atom_coordinates(geo):
     # using the same cut-offs as x2z:
     xy_bond_max = 3.5 / 1.8897259886
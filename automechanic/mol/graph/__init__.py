@@ -47,6 +47,9 @@ from ._conn import atom_inchi_numbers
 from ._conn import inchi
 from ._stereo import inchi as stereo_inchi
 from ._stereo import atom_stereo_coordinates
+from ._react import atom_invariants
+from ._react import invariant
+from ._react import atom_unsaturated_valences
 # transformations
 from ._base import implicit
 from ._base import explicit
@@ -62,6 +65,11 @@ from ._res import lowspin_resonance
 # comparisons
 from ._base import backbone_isomorphic
 from ._base import backbone_isomorphism
+# reactions
+from ._react import forward_abstraction_indices
+from ._react import abstraction_indices
+from ._react import addition_indices
+from ._react import migration_indices
 # submodules
 from . import to_inchi
 
@@ -84,12 +92,16 @@ __all__ = [
     'atom_radical_valences', 'atom_neighbor_keys',
     'atom_explicit_hydrogen_keys', 'atom_bond_keys', 'atom_neighborhoods',
     'atom_inchi_numbers', 'inchi', 'stereo_inchi', 'atom_stereo_coordinates',
+    'atom_invariants', 'invariant', 'atom_unsaturated_valences',
     # transformations
     'implicit', 'explicit', 'explicit_stereo_sites', 'delete_atoms',
     'add_explicit_hydrogens', 'subgraph', 'subgraph_by_bonds', 'relabel',
     'reflection', 'subresonances', 'lowspin_resonance',
     # comparisons
     'backbone_isomorphic', 'backbone_isomorphism',
+    # reactions
+    'forward_abstraction_indices', 'abstraction_indices', 'addition_indices',
+    'migration_indices',
     # submodules
     'to_inchi',
 ]
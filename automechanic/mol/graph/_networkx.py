@@ -1,13 +1,23 @@
 """ networkx interface
+
+(networkx is imported on first use, to keep start-up times short)
 """
-import networkx
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def _networkx():
+    """ the networkx module
+    """
+    import networkx
+    return networkx
 
 
 def from_graph(xgr):
     """ networkx graph object from a molecular graph
     """
     atms, bnds = xgr
-    nxg = networkx.Graph()
+    nxg = _networkx().Graph()
     for atm_key, atm_vals in atms.items():
         nxg.add_node(atm_key, props=atm_vals)
     for bnd_key, bnd_val in bnds.items():
@@ -18,7 +28,7 @@ def from_graph(xgr):
 def ring_keys_list(nxg):
     """ minimum cycle basis for the graph
     """
-    rng_keys_lst = networkx.algorithms.cycles.minimum_cycle_basis(nxg)
+    rng_keys_lst = _networkx().algorithms.cycles.minimum_cycle_basis(nxg)
     return tuple(map(tuple, rng_keys_lst))
 
 
@@ -29,7 +39,7 @@ def isomorphism(nxg1, nxg2):
     def _same_props(dct1, dct2):
         return dct1['props'] == dct2['props']
 
-    matcher = networkx.algorithms.isomorphism.GraphMatcher(
+    matcher = _networkx().algorithms.isomorphism.GraphMatcher(
         nxg1, nxg2, node_match=_same_props, edge_match=_same_props)
 
     iso_dct = None
@@ -0,0 +1,228 @@
+""" reaction mapping: atom indices for abstractions, additions and migrations
+
+Reactions are mapped by binding atoms at reactive sites of one side and
+testing the result for isomorphism with the other side. Candidate sites are
+pruned with atom invariants (element, neighbor count, and labels refined over
+neighbors) before any isomorphism test is run:
+
+ - only unsaturated atoms (with free valences) are tried
+ - sites must have an invariant that could give the target graph
+ - one site of each symmetry class is tried before the others
+ - a bound graph must match the target's invariants before an isomorphism
+   test is run on it
+"""
+from itertools import product as _product
+from ._base import atom_keys as _atom_keys
+from ._base import atom_symbols as _atom_symbols
+from ._base import atom_total_valences as _atom_total_valences
+from ._base import (atom_implicit_hydrogen_valences as
+                    _atom_implicit_hydrogen_valences)
+from ._base import bond_orders as _bond_orders
+from ._base import add_atoms as _add_atoms
+from ._base import add_bonds as _add_bonds
+from ._base import relabel as _relabel
+from ._networkx import from_graph as _nxg_from_graph
+from ._networkx import isomorphism as _nxg_isomorphism
+
+INVARIANT_ROUNDS = 3
+
+
+# invariants
+def atom_invariants(xgr, nrounds=INVARIANT_ROUNDS):
+    """ atom labels, by atom, that are the same for symmetry-equivalent atoms
+
+    starts from the element and neighbor count of each atom and refines them
+    with the labels of their neighbors, `nrounds` times (labels are hashes, so
+    they only compare within one process)
+    """
+    atm_ngb_keys_dct = _atom_neighbor_keys(xgr)
+    atm_sym_dct = _atom_symbols(xgr)
+    atm_imp_hyd_vlc_dct = _atom_implicit_hydrogen_valences(xgr)
+    atm_inv_dct = {
+        atm_key: hash((atm_sym_dct[atm_key], atm_imp_hyd_vlc_dct[atm_key],
+                       len(atm_ngb_keys)))
+        for atm_key, atm_ngb_keys in atm_ngb_keys_dct.items()}
+    for _ in range(nrounds):
+        atm_inv_dct = {
+            atm_key: hash((atm_inv_dct[atm_key], tuple(sorted(
+                atm_inv_dct[ngb_key] for ngb_key in atm_ngb_keys))))
+            for atm_key, atm_ngb_keys in atm_ngb_keys_dct.items()}
+    return atm_inv_dct
+
+
+def invariant(xgr, nrounds=INVARIANT_ROUNDS):
+    """ a graph label, which is the same for isomorphic graphs
+    """
+    return tuple(sorted(atom_invariants(xgr, nrounds=nrounds).values()))
+
+
+def atom_unsaturated_valences(xgr):
+    """ free valences, by atom, for atoms that have some
+    """
+    atm_bnd_vlc_dct = dict(_atom_implicit_hydrogen_valences(xgr))
+    for bnd_key, bnd_ord in _bond_orders(xgr).items():
+        for atm_key in bnd_key:
+            atm_bnd_vlc_dct[atm_key] += bnd_ord
+    return {atm_key: tot_vlc - atm_bnd_vlc_dct[atm_key]
+            for atm_key, tot_vlc in _atom_total_valences(xgr).items()
+            if tot_vlc > atm_bnd_vlc_dct[atm_key]}
+
+
+# reaction indices
+def forward_abstraction_indices(qh_xgr, q_xgr):
+    """ (H atom in QH, site in Q) for QH => Q + H, or None
+    """
+    qh_inv = invariant(qh_xgr)
+    qh_sites = _hydrogen_neighbor_signatures(qh_xgr)
+
+    def _fits(_, sig):
+        sym, nngbs = sig
+        return (sym, nngbs + 1) in qh_sites
+
+    for q_key in _candidate_sites(q_xgr, _fits):
+        qh_xgr_, h_key = _add_hydrogen(q_xgr, q_key)
+        iso = _isomorphism(qh_xgr_, qh_xgr, qh_inv)
+        if iso is not None:
+            return (iso[h_key], q_key)
+    return None
+
+
+def abstraction_indices(q1h_xgr, q2_xgr, q1_xgr, q2h_xgr):
+    """ (Q1H H atom, Q2 site, Q1 site, Q2H H atom) for Q1H + Q2 => Q1 + Q2H,
+    or None
+    """
+    idxs1 = forward_abstraction_indices(q1h_xgr, q1_xgr)
+    idxs2 = forward_abstraction_indices(q2h_xgr, q2_xgr) if idxs1 else None
+    if not idxs2:
+        return None
+    q1h_key, q1_key = idxs1
+    q2h_key, q2_key = idxs2
+    return (q1h_key, q2_key, q1_key, q2h_key)
+
+
+def addition_indices(x_xgr, y_xgr, xy_xgr):
+    """ (X site, Y site, X site in XY, Y site in XY) for X + Y => XY, or None
+    """
+    xy_inv = invariant(xy_xgr)
+    xy_sigs = set(_atom_signatures(xy_xgr).values())
+
+    def _fits(_, sig):
+        sym, nngbs = sig
+        return (sym, nngbs + 1) in xy_sigs
+
+    x_keys = _candidate_sites(x_xgr, _fits)
+    y_keys = _candidate_sites(y_xgr, _fits)
+    offset = max(_atom_keys(x_xgr)) + 1
+    y_xgr = _relabel(y_xgr, {key: key + offset for key in _atom_keys(y_xgr)})
+    for x_key, y_key in _product(x_keys, y_keys):
+        xy_xgr_ = _union(x_xgr, y_xgr)
+        xy_xgr_ = _add_bonds(xy_xgr_, [frozenset({x_key, y_key + offset})])
+        iso = _isomorphism(xy_xgr_, xy_xgr, xy_inv)
+        if iso is not None:
+            return (x_key, y_key, iso[x_key], iso[y_key + offset])
+    return None
+
+
+def migration_indices(r_xgr, p_xgr):
+    """ (H atom in R, R site, H atom in P, P site) for an H migration R => P,
+    or None
+
+    the sites are where the H atom ends up (in R) and where it came from (in
+    P); binding an H atom to each gives the same graph
+    """
+    r_keys = _candidate_sites(r_xgr)
+    p_keys = _candidate_sites(p_xgr)
+
+    # one invariant per bound graph, rather than one per pair
+    p_inv_dct = {}
+    for p_key in p_keys:
+        ph_xgr_, ph_key = _add_hydrogen(p_xgr, p_key)
+        p_inv_dct.setdefault(invariant(ph_xgr_), []).append(
+            (p_key, ph_xgr_, ph_key))
+
+    for r_key in r_keys:
+        rh_xgr_, rh_key = _add_hydrogen(r_xgr, r_key)
+        rh_inv = invariant(rh_xgr_)
+        for p_key, ph_xgr_, ph_key in p_inv_dct.get(rh_inv, ()):
+            iso = _isomorphism(rh_xgr_, ph_xgr_, rh_inv)
+            if iso is not None:
+                inv_iso = {val: key for key, val in iso.items()}
+                if inv_iso[ph_key] != rh_key:
+                    return (inv_iso[ph_key], r_key, iso[rh_key], p_key)
+    return None
+
+
+# helpers
+def _atom_neighbor_keys(xgr):
+    """ neighbor keys, by atom (from the bond keys alone)
+    """
+    atm_ngb_keys_dct = {atm_key: [] for atm_key in _atom_keys(xgr)}
+    for atm1_key, atm2_key in map(tuple, _bond_orders(xgr)):
+        atm_ngb_keys_dct[atm1_key].append(atm2_key)
+        atm_ngb_keys_dct[atm2_key].append(atm1_key)
+    return atm_ngb_keys_dct
+
+
+def _atom_signatures(xgr):
+    """ (symbol, neighbor count), by atom
+    """
+    atm_sym_dct = _atom_symbols(xgr)
+    return {atm_key: (atm_sym_dct[atm_key], len(atm_ngb_keys))
+            for atm_key, atm_ngb_keys in _atom_neighbor_keys(xgr).items()}
+
+
+def _hydrogen_neighbor_signatures(xgr):
+    """ the signatures of atoms bonded to a hydrogen
+    """
+    atm_sym_dct = _atom_symbols(xgr)
+    atm_sig_dct = _atom_signatures(xgr)
+    return {atm_sig_dct[ngb_key]
+            for atm_key, atm_ngb_keys in _atom_neighbor_keys(xgr).items()
+            if atm_sym_dct[atm_key] == 'H' for ngb_key in atm_ngb_keys}
+
+
+def _candidate_sites(xgr, fits=None):
+    """ unsaturated atoms that pass a signature test, with one atom of each
+    symmetry class ahead of the rest
+    """
+    atm_sig_dct = _atom_signatures(xgr)
+    atm_keys = sorted(
+        atm_key for atm_key in atom_unsaturated_valences(xgr)
+        if fits is None or fits(atm_key, atm_sig_dct[atm_key]))
+    atm_inv_dct = atom_invariants(xgr)
+    seen_invs = set()
+    first_keys, other_keys = [], []
+    for atm_key in atm_keys:
+        inv = atm_inv_dct[atm_key]
+        (other_keys if inv in seen_invs else first_keys).append(atm_key)
+        seen_invs.add(inv)
+    return tuple(first_keys + other_keys)
+
+
+def _add_hydrogen(xgr, atm_key):
+    """ bind a new hydrogen atom to an atom; returns the graph and its key
+    """
+    h_key = max(_atom_keys(xgr)) + 1
+    xgr = _add_atoms(xgr, {h_key: 'H'})
+    xgr = _add_bonds(xgr, [frozenset({atm_key, h_key})])
+    return xgr, h_key
+
+
+def _union(xgr1, xgr2):
+    """ the disconnected union of two graphs with different atom keys
+    """
+    atm_dct1, bnd_dct1 = xgr1
+    atm_dct2, bnd_dct2 = xgr2
+    assert not set(atm_dct1) & set(atm_dct2)
+    return ({**atm_dct1, **atm_dct2}, {**bnd_dct1, **bnd_dct2})
+
+
+def _isomorphism(xgr1, xgr2, xgr2_inv=None):
+    """ the isomorphism from one graph to another, or None
+
+    graphs with different invariants are turned down without a search
+    """
+    xgr2_inv = invariant(xgr2) if xgr2_inv is None else xgr2_inv
+    if invariant(xgr1) != xgr2_inv:
+        return None
+    return _nxg_isomorphism(_nxg_from_graph(xgr1), _nxg_from_graph(xgr2))
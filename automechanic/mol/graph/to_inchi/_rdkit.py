@@ -1,16 +1,32 @@
 """ rdkit interface
+
+(rdkit is imported on first use, to keep start-up times short)
 """
-from rdkit import RDLogger
-import rdkit.Chem as _rd_chem
+import functools
+from .... import timing
+
+
+def _rd_chem():
+    """ the rdkit.Chem module, counting each use as an rdkit call
+    """
+    timing.count(timing.RDKIT_CALLS_KEY)
+    return _rd_chem_module()
+
 
-_LOGGER = RDLogger.logger()
-_LOGGER.setLevel(RDLogger.ERROR)
+@functools.lru_cache(maxsize=None)
+def _rd_chem_module():
+    """ the rdkit.Chem module
+    """
+    from rdkit import RDLogger
+    import rdkit.Chem
+    RDLogger.logger().setLevel(RDLogger.ERROR)
+    return rdkit.Chem
 
 
 def from_molfile(mfl):
     """ rdkit molecule object from a mol block string
     """
-    rdm = _rd_chem.rdmolfiles.MolFromMolBlock(mfl, removeHs=False)
+    rdm = _rd_chem().rdmolfiles.MolFromMolBlock(mfl, removeHs=False)
     assert rdm is not None
     return rdm
 
@@ -18,5 +34,5 @@ def from_molfile(mfl):
 def to_inchi_with_aux_info(rdm):
     """ InChI string from an rdkit molecule object
     """
-    ich, ich_aux = _rd_chem.inchi.MolToInchiAndAuxInfo(rdm)
+    ich, ich_aux = _rd_chem().inchi.MolToInchiAndAuxInfo(rdm)
     return ich, ich_aux
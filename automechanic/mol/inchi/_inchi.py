@@ -1,6 +1,7 @@
 """ functions operating on InChI strings
 """
 import itertools
+import functools
 from string import ascii_lowercase as _ascii_lowercase
 from ._rdkit import from_inchi as _rdm_from_inchi
 from ._rdkit import to_inchi as _rdm_to_inchi
@@ -25,6 +26,11 @@ from ...rere.pattern_lib import STRING_START as _STRING_START
 from ...rere.pattern_lib import STRING_END as _STRING_END
 from ...rere.find import first_named_capture as _first_named_capture
 from ...rere.find import all_captures as _all_captures
+from ... import timing
+
+# conversions are cached, so that repeated species (and repeated commands in
+# `automech batch`) don't go back to the toolkit
+_CACHE_SIZE = 2 ** 16
 
 _NONWHITESPACES_NONGREEDY = _one_or_more(_NONWHITESPACE, greedy=False)
 _INCHI_SUBLAYER_END = _one_of_these([_escape('/'), _STRING_END])
@@ -128,6 +134,7 @@ def smiles(ich):
     return smi
 
 
+@functools.lru_cache(maxsize=_CACHE_SIZE)
 def recalculate(ich, force_stereo=False):
     """ recalculate InChI string
     """
@@ -137,6 +144,9 @@ def recalculate(ich, force_stereo=False):
     return ich
 
 
+timing.register_cache('inchi.recalculate', recalculate)
+
+
 def is_closed(ich):
     """ regenerating the InChI string yields the same thing
     """
@@ -229,12 +239,28 @@ def has_unknown_stereo_elements(ich):
             _known_bond_stereo_elements(ich_ste))
 
 
-def compatible_stereoisomers(ich):
+def compatible_stereoisomers(ich, max_count=None):
     """ expand InChI string to its compatible stereoisomers
+
+    candidates are generated one at a time and duplicates are dropped; if
+    `max_count` is set, the expansion stops after that many stereoisomers
+
+    (the candidates are distinct strings by construction; they only turn out
+    to be the same stereoisomer once they are recalculated, so duplicates
+    can't be dropped any earlier)
+    """
+    ich_itr = _unique(map(recalculate, _stereoisomer_candidates(ich)))
+    ich_lst = tuple(itertools.islice(ich_itr, max_count))
+    return ich_lst
+
+
+def _stereoisomer_candidates(ich):
+    """ generate candidate InChI strings for the compatible stereoisomers
     """
+    ich_ste = recalculate(ich, force_stereo=True)
+
     atm_terms_lst = []
-    for num, (key, val) in enumerate(
-            atom_stereo_elements(recalculate(ich, force_stereo=True))):
+    for num, (key, val) in enumerate(atom_stereo_elements(ich_ste)):
         terms = ([key + val] if val not in PARSE.ATOMxSTEREO.TERM.UNKNOWN_VALS
                  else [key + PARSE.ATOMxSTEREO.TERM.MINUS_VAL] if num == 0
                  else [key + PARSE.ATOMxSTEREO.TERM.MINUS_VAL,
@@ -242,36 +268,43 @@ def compatible_stereoisomers(ich):
         atm_terms_lst.append(terms)
 
     bnd_terms_lst = []
-    for key, val in bond_stereo_elements(recalculate(ich, force_stereo=True)):
+    for key, val in bond_stereo_elements(ich_ste):
         terms = ([key + val] if val not in PARSE.BONDxSTEREO.TERM.UNKNOWN_VALS
                  else [key + PARSE.BONDxSTEREO.TERM.MINUS_VAL,
                        key + PARSE.BONDxSTEREO.TERM.PLUS_VAL])
         bnd_terms_lst.append(terms)
 
+    # one product over all of the terms, rather than a product of per-layer
+    # products, so that candidates are built one at a time (itertools.product
+    # reads its inputs in full, and these are short lists)
+    nbnds = len(bnd_terms_lst)
     ich_cp = core_parent(ich)
-    ich_lst = [ich_cp]
-    if bnd_terms_lst:
-        lyr_lst = ['b' + ','.join(terms)
-                   for terms in itertools.product(*bnd_terms_lst)]
-        ich_lst = [ich_start + '/' + lyr
-                   for ich_start, lyr in itertools.product(ich_lst, lyr_lst)]
-
-    if atm_terms_lst:
-        lyr_lst = ['t' + ','.join(terms)
-                   for terms in itertools.product(*atm_terms_lst)]
-        ich_lst = [ich_start + '/' + lyr
-                   for ich_start, lyr in itertools.product(ich_lst, lyr_lst)]
-
-    ich_lst = tuple(map(recalculate, ich_lst))
-    return ich_lst
+    for terms in itertools.product(*(bnd_terms_lst + atm_terms_lst)):
+        lyrs = ((('b' + ','.join(terms[:nbnds]),) if nbnds else ()) +
+                (('t' + ','.join(terms[nbnds:]),) if atm_terms_lst else ()))
+        yield '/'.join((ich_cp,) + lyrs)
 
 
+def _unique(itr):
+    """ iterate over the unique values, in order
+    """
+    seen = set()
+    for val in itr:
+        if val not in seen:
+            seen.add(val)
+            yield val
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
 def inchi_key(ich):
     """ computes InChIKey from an InChI string
     """
     return _inchi_to_inchi_key(ich)
 
 
+timing.register_cache('inchi.inchi_key', inchi_key)
+
+
 def connectivity_graph(ich):
     """ connectivity graph from an InChI string
     """
@@ -323,8 +356,12 @@ def stereo_graph(ich):
     return sgr
 
 
-def geometry(ich):
+def geometry(ich, fallback=True):
     """ cartesian geometry from an InChI string
+
+    the atoms are in the order of `connectivity_graph`, unless RDKit fails and
+    the geometry comes from pybel instead; without `fallback`, a ValueError is
+    raised then
     """
     try:
         rdm = _rdm_from_inchi(ich)
@@ -332,7 +369,10 @@ def geometry(ich):
         geo_ich = _inchi_from_geometry(geo)
         assert _has_same_connectivity(ich, geo_ich)
         assert _has_compatible_stereo(ich, geo_ich)
-    except (AssertionError, RuntimeError):
+    except (AssertionError, RuntimeError) as err:
+        if not fallback:
+            raise ValueError("RDKit couldn't generate a geometry for {:s}"
+                             .format(ich)) from err
         pbm = _pbm_from_inchi(ich)
         geo = _pbm_to_geometry(pbm)
         geo_ich = _inchi_from_geometry(geo)
@@ -1,12 +1,22 @@
 """ pybel interface
+
+(pybel is imported on first use, to keep start-up times short)
 """
-import pybel
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def _pybel():
+    """ the pybel module
+    """
+    import pybel
+    return pybel
 
 
 def from_inchi(ich):
     """ pybel molecule object from an InChI string
     """
-    pbm = pybel.readstring('inchi', ich)
+    pbm = _pybel().readstring('inchi', ich)
     return pbm
 
 
@@ -1,24 +1,48 @@
 """ rdkit interface
+
+(rdkit is imported on first use, to keep start-up times short)
 """
-from rdkit import RDLogger
-import rdkit.Chem as _rd_chem
-import rdkit.Chem.AllChem as _rd_all_chem
+import functools
+from ... import timing
+
+
+def _rd_chem():
+    """ the rdkit.Chem module, counting each use as an rdkit call
+    """
+    timing.count(timing.RDKIT_CALLS_KEY)
+    return _rd_chem_module()
+
 
-_LOGGER = RDLogger.logger()
-_LOGGER.setLevel(RDLogger.ERROR)
+@functools.lru_cache(maxsize=None)
+def _rd_chem_module():
+    """ the rdkit.Chem module
+    """
+    from rdkit import RDLogger
+    import rdkit.Chem
+    RDLogger.logger().setLevel(RDLogger.ERROR)
+    return rdkit.Chem
+
+
+@functools.lru_cache(maxsize=None)
+def _rd_all_chem():
+    """ the rdkit.Chem.AllChem module
+    """
+    _rd_chem_module()
+    import rdkit.Chem.AllChem
+    return rdkit.Chem.AllChem
 
 
 def inchi_to_inchi_key(ich):
     """ InChI-Key from an InChI string
     """
-    ick = _rd_chem.inchi.InchiToInchiKey(ich)
+    ick = _rd_chem().inchi.InchiToInchiKey(ich)
     return ick
 
 
 def from_smiles(smi):
     """ rdkit molecule object from a SMILES string
     """
-    rdm = _rd_chem.MolFromSmiles(smi)
+    rdm = _rd_chem().MolFromSmiles(smi)
     assert rdm is not None
     return rdm
 
@@ -26,7 +50,7 @@ def from_smiles(smi):
 def from_inchi(ich):
     """ rdkit molecule object from an InChI string
     """
-    rdm = _rd_chem.inchi.MolFromInchi(ich, treatWarningAsError=False)
+    rdm = _rd_chem().inchi.MolFromInchi(ich, treatWarningAsError=False)
     assert rdm is not None
     return rdm
 
@@ -34,7 +58,7 @@ def from_inchi(ich):
 def to_smiles(rdm):
     """ SMILES string from an rdkit molecule object
     """
-    smi = _rd_chem.MolToSmiles(rdm)
+    smi = _rd_chem().MolToSmiles(rdm)
     return smi
 
 
@@ -42,16 +66,16 @@ def to_inchi(rdm, options='', with_aux_info=False):
     """ InChI string from an rdkit molecule object
     """
     if with_aux_info:
-        ret = _rd_chem.inchi.MolToInchiAndAuxInfo(rdm, options=options)
+        ret = _rd_chem().inchi.MolToInchiAndAuxInfo(rdm, options=options)
     else:
-        ret = _rd_chem.inchi.MolToInchi(rdm, options=options)
+        ret = _rd_chem().inchi.MolToInchi(rdm, options=options)
     return ret
 
 
 def geometry(rdm):
     """ cartesian geometry from an rdkit molecule object
     """
-    rdm = _rd_chem.AddHs(rdm)
+    rdm = _rd_chem().AddHs(rdm)
     atms = rdm.GetAtoms()
     natms = len(rdm.GetAtoms())
     if natms == 1:
@@ -59,8 +83,8 @@ def geometry(rdm):
         xyz = (0., 0., 0.)
         geo = ((asb, xyz),)
     else:
-        _rd_all_chem.EmbedMolecule(rdm)
-        _rd_all_chem.MMFFOptimizeMolecule(rdm)
+        _rd_all_chem().EmbedMolecule(rdm)
+        _rd_all_chem().MMFFOptimizeMolecule(rdm)
         asbs = tuple(rda.GetSymbol() for rda in atms)
         xyzs = tuple(map(tuple, rdm.GetConformer(0).GetPositions()))
         geo = tuple(zip(asbs, xyzs))
@@ -70,7 +94,7 @@ def geometry(rdm):
 def connectivity_graph(rdm):
     """ connection graph from an rdkit molecule object
     """
-    rdm = _rd_chem.AddHs(rdm)
+    rdm = _rd_chem().AddHs(rdm)
     atms = rdm.GetAtoms()
     bnds = rdm.GetBonds()
     asbs = dict(enumerate((rda.GetSymbol(), 0, None) for rda in atms))
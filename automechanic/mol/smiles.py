@@ -1,12 +1,14 @@
 """ functions operating on SMILES strings
+
+(rdkit is imported on first use, to keep start-up times short)
 """
-from rdkit import RDLogger
-import rdkit.Chem as _rd_chem
+import functools
+from .. import timing
 
-_LOGGER = RDLogger.logger()
-_LOGGER.setLevel(RDLogger.ERROR)
+_CACHE_SIZE = 2 ** 16
 
 
+@functools.lru_cache(maxsize=_CACHE_SIZE)
 def inchi(smi):
     """ InChI string from a SMILES string
     """
@@ -15,10 +17,13 @@ def inchi(smi):
     return ich
 
 
+timing.register_cache('smiles.inchi', inchi)
+
+
 def _rdm_from_smiles(smi):
     """ rdkit molecule object from a SMILES string
     """
-    rdm = _rd_chem.MolFromSmiles(smi)
+    rdm = _rd_chem().MolFromSmiles(smi)
     assert rdm is not None
     return rdm
 
@@ -26,5 +31,22 @@ def _rdm_from_smiles(smi):
 def _rdm_to_inchi(rdm):
     """ InChI string from an rdkit molecule object
     """
-    ret = _rd_chem.inchi.MolToInchi(rdm)
+    ret = _rd_chem().inchi.MolToInchi(rdm)
     return ret
+
+
+def _rd_chem():
+    """ the rdkit.Chem module, counting each use as an rdkit call
+    """
+    timing.count(timing.RDKIT_CALLS_KEY)
+    return _rd_chem_module()
+
+
+@functools.lru_cache(maxsize=None)
+def _rd_chem_module():
+    """ the rdkit.Chem module
+    """
+    from rdkit import RDLogger
+    import rdkit.Chem
+    RDLogger.logger().setLevel(RDLogger.ERROR)
+    return rdkit.Chem
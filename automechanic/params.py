@@ -11,6 +11,8 @@ _MULT_KEY = 'mult'
 _MULT_TYP = tab.dt_(int)
 _FILESYSTEM_PATH_KEY = 'path'
 _FILESYSTEM_PATH_TYP = tab.dt_(str)
+_ERROR_KEY = 'error'
+_ERROR_TYP = tab.dt_(str)
 
 
 class SPC():
@@ -38,6 +40,9 @@ class SPC():
         FILESYSTEM_PATH_KEY = _FILESYSTEM_PATH_KEY
         FILESYSTEM_PATH_TYP = _FILESYSTEM_PATH_TYP
 
+        ERROR_KEY = _ERROR_KEY
+        ERROR_TYP = _ERROR_TYP
+
         NASA_C_TYP = tab.dt_(float)
         NASA_C_LO_KEYS = ('nasa_lo_1', 'nasa_lo_2', 'nasa_lo_3', 'nasa_lo_4',
                           'nasa_lo_5', 'nasa_lo_6', 'nasa_lo_7')
@@ -55,6 +60,14 @@ class RXN():
 
     FILESYSTEM_DIR_NAME = 'RXN'
 
+    JOB_INPUT_NAME = 'input.dat'
+    JOB_OUT_NAME = 'job.out'
+    JOB_ERR_NAME = 'job.err'
+
+    CREATED = 'created'
+    RAN = 'ran'
+    FAILED = 'failed'
+
     class TAB():
         """ species table parameters
         """
@@ -70,3 +83,12 @@ class RXN():
 
         ARRH_TYP = tab.dt_(float)
         ARRH_KEYS = ('arrh_a', 'arrh_b', 'arrh_e')
+
+        ERROR_KEY = _ERROR_KEY
+        ERROR_TYP = _ERROR_TYP
+
+        STATUS_KEY = 'status'
+        STATUS_TYP = tab.dt_(str)
+
+        NODE_KEY = 'node'
+        NODE_TYP = tab.dt_(str)
@@ -37,7 +37,9 @@ from ..rere.find import headlined_sections as find_headlined_sections
 SPACES = one_or_more(NONNEWLINE_WHITESPACE)
 CHEMKIN_ARROW = maybe(escape('<')) + escape('=') + maybe(escape('>'))
 CHEMKIN_PLUS_EM = PLUS + 'M'
-CHEMKIN_PAREN_PLUS_EM = escape('(') + PLUS + 'M' + escape(')')
+# a falloff collider, either (+M) or a specific species such as (+AR)
+CHEMKIN_PAREN_PLUS_EM = (escape('(') + PLUS + one_or_more('[A-Z0-9]') +
+                         escape(')'))
 A_UNITS = (
     ('MOLECULES', 6.02214076e23),
     ('MOLES', 1.)
@@ -49,6 +51,31 @@ E_UNITS = (
     ('JOULES/MOLE', 0.239006),
     ('KELVINS', 0.001987191686485529 * 1.e3)
 )
+SPECIES_BLOCK_KEYS = ('SPECIES', 'SPEC')
+REACTIONS_BLOCK_KEYS = ('REACTIONS', 'REAC')
+THERMO_BLOCK_KEYS = ('THERMO ALL', 'THERM ALL', 'THER ALL',
+                     'THERMO', 'THERM', 'THER')
+# lines opening and closing the blocks used by the parsers below, and the
+# first lines of thermo data entries, for finding them in a file before it is
+# read in (see `iohelp.find_offsets` and `iohelp.find_lines`)
+SPECIES_BLOCK_START_LINE = (
+    LINE_START + zero_or_more(NONNEWLINE_WHITESPACE) +
+    one_of_these(SPECIES_BLOCK_KEYS))
+REACTIONS_BLOCK_START_LINE = (
+    LINE_START + zero_or_more(NONNEWLINE_WHITESPACE) +
+    one_of_these(REACTIONS_BLOCK_KEYS))
+THERMO_BLOCK_START_LINE = (
+    LINE_START + zero_or_more(NONNEWLINE_WHITESPACE) +
+    one_of_these(THERMO_BLOCK_KEYS))
+BLOCK_END_LINE = (
+    LINE_START + zero_or_more(NONNEWLINE_WHITESPACE) + 'END' +
+    not_followed_by(r'[^\s!]') + zero_or_more(NONNEWLINE) + LINE_END)
+THERMO_HEADLINE = (
+    LINE_START + zero_or_more(NONNEWLINE_WHITESPACE) +
+    not_followed_by(one_of_these([DIGIT, PLUS, escape('='), escape('!'),
+                                  NONNEWLINE_WHITESPACE])) +
+    one_or_more(r'[^\n!]') + '1' + zero_or_more(NONNEWLINE_WHITESPACE) +
+    maybe(escape('!') + zero_or_more(NONNEWLINE)) + maybe(r'\r') + LINE_END)
 
 
 def species_names(mech_str):
@@ -114,19 +141,39 @@ def split_reaction_name(rxn):
     return rcts, prds
 
 
+def reaction_is_reversible(rxn):
+    """ is this reaction reversible, or does it have a one-way arrow (=>)?
+    """
+    return (find_if_has_match(escape('<') + escape('='), rxn) or
+            not find_if_has_match(escape('=') + escape('>'), rxn))
+
+
+def reaction_has_third_body(rxn):
+    """ does this reaction have a +M third body (as opposed to (+M), (+AR),
+    etc. or none)?
+    """
+    rxn = find_remove(NONNEWLINE_WHITESPACE, rxn)
+    rxn = find_remove(CHEMKIN_PAREN_PLUS_EM, rxn)
+    pattern = CHEMKIN_PLUS_EM + not_followed_by(r'[^+=<>]')
+    return find_if_has_match(pattern, rxn)
+
+
 def _split_reagent_string(rgt_str):
 
     def _interpret_reagent_count(rgt_cnt_str):
-        _pattern = (STRING_START + capturing(maybe(DIGIT)) +
+        # a count can't run into a digit, dash or comma, as in 1-C4H8
+        _pattern = (STRING_START + capturing(zero_or_more(DIGIT)) +
+                    not_followed_by(r'[\d,-]') +
                     capturing(one_or_more(ANY_CHAR)))
-        cnt, rgt = find_first_capture(_pattern, rgt_cnt_str)
+        captures = find_first_capture(_pattern, rgt_cnt_str)
+        cnt, rgt = captures if captures else ('', rgt_cnt_str)
         cnt = int(cnt) if cnt else 1
         rgts = (rgt,) * cnt
         return rgts
 
     rgt_str = find_remove(NONNEWLINE_WHITESPACE, rgt_str)
     rgt_str = find_remove(CHEMKIN_PAREN_PLUS_EM, rgt_str)
-    rgt_str = find_remove(CHEMKIN_PLUS_EM, rgt_str)
+    rgt_str = find_remove(CHEMKIN_PLUS_EM + not_followed_by(r'[^+]'), rgt_str)
     pattern = PLUS + not_followed_by(PLUS)
     rgt_cnt_strs = find_split(pattern, rgt_str)
     rgts = tuple(chain(*map(_interpret_reagent_count, rgt_cnt_strs)))
@@ -158,6 +205,12 @@ def thermo_data(mech_str):
     """ find all thermo data
     """
     thm_dstr_lst = thermo_data_strings(mech_str)
+    return thermo_data_from_strings(thm_dstr_lst)
+
+
+def thermo_data_from_strings(thm_dstr_lst):
+    """ thermo data from thermo data strings
+    """
     thm_dat_lst = tuple(zip(
         map(thermo_data_species_name, thm_dstr_lst),
         map(thermo_data_lo_coefficients, thm_dstr_lst),
@@ -166,6 +219,15 @@ def thermo_data(mech_str):
     return thm_dat_lst
 
 
+def thermo_data_string(thm_str):
+    """ the thermo data string for an entry read in from a thermo block,
+    without its comments and blanks
+    """
+    thm_dstr = remove_blanks(remove_comments(thm_str)).strip()
+    assert len(find_split_lines(thm_dstr)) == 4
+    return thm_dstr
+
+
 def thermo_data_strings(mech_str):
     """ find all thermo data strings
     """
@@ -201,6 +263,25 @@ def thermo_data_temperatures(thm_dstr):
     return tmps
 
 
+def thermo_data_elements(thm_dstr):
+    """ get the element counts from a thermo data string
+
+    these are read from the four fixed-width element fields of the headline;
+    symbols are capitalized as in InChI formulas (AR -> Ar)
+    """
+    headline = find_split_lines(thm_dstr)[0]
+    fml = {}
+    for start in (24, 29, 34, 39):
+        field = headline[start:start+5]
+        sym, cnt = field[:2].strip(), field[2:].strip()
+        if sym.isalpha() and cnt:
+            cnt = int(float(cnt))
+            if cnt:
+                sym = sym.title()
+                fml[sym] = fml.get(sym, 0) + cnt
+    return fml
+
+
 def thermo_data_lo_coefficients(thm_dstr):
     """ get the low temperature thermo coefficients
     """
@@ -253,20 +334,19 @@ def thermo_t_common_default(mech_str):
 def species_block(mech_str):
     """ find the species block
     """
-    return _block(mech_str, block_keys=['SPECIES', 'SPEC'])
+    return _block(mech_str, block_keys=SPECIES_BLOCK_KEYS)
 
 
 def reactions_block(mech_str):
     """ find the reactions block
     """
-    return _block(mech_str, block_keys=['REACTIONS', 'REAC'])
+    return _block(mech_str, block_keys=REACTIONS_BLOCK_KEYS)
 
 
 def thermo_block(mech_str):
     """ find the thermodynamics block
     """
-    return _block(mech_str, block_keys=['THERMO ALL', 'THERM ALL', 'THER ALL',
-                                        'THERMO', 'THERM', 'THER'])
+    return _block(mech_str, block_keys=THERMO_BLOCK_KEYS)
 
 
 def remove_comments(mech_str):
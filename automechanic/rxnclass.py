@@ -0,0 +1,216 @@
+""" reaction class screening for whole mechanisms
+
+Reactions are sorted into hydrogen abstractions, additions and migrations
+from their stoichiometry and species formulas alone, so that the costly
+search for reacting atoms only runs for reactions that can be of the class.
+
+The screen works on the reactant and product stoichiometry matrices (see
+`stoich`) and a species composition matrix (see `formula`), which are built
+once for the whole mechanism, with each rule applied to every reaction at
+the same time:
+
+    abstraction:  Q1H + Q2 => Q1 + Q2H  (one H moves from Q1H to Q2)
+    addition:     X + Y => XY  (or the reverse)
+    migration:    R => P  (an isomerization)
+
+A screen is a tuple of per-reaction arrays (classes, species indices, is
+radical-radical, is spin-balanced). The species indices of a candidate are
+given in the order above, padded with -1.
+"""
+import numpy
+from . import stoich
+from . import formula
+
+ABSTRACTION = 'abstraction'
+ADDITION = 'addition'
+MIGRATION = 'migration'
+CLASSES = (ABSTRACTION, ADDITION, MIGRATION)
+
+_NSPCS_MAX = 4
+
+
+# constructors
+def from_reactions(rxns, fml_dct, mult_dct=None):
+    """ reaction class screen from CHEMKIN reaction names
+
+    :param fml_dct: formulas (see `formula`), by species name; reactions with
+        species that aren't in here are left unclassified
+    :param mult_dct: spin multiplicities, by species name
+    """
+    spcs, rct_mat, prd_mat = stoich.matrices(rxns)
+    elems, cmp_arr = formula.composition_matrix(
+        [fml_dct.get(spc) for spc in spcs])
+    mults = (numpy.array([mult_dct.get(spc, numpy.nan) for spc in spcs])
+             if mult_dct is not None else None)
+    return screen(rct_mat, prd_mat, elems, cmp_arr, mults)
+
+
+def screen(rct_mat, prd_mat, elems, cmp_arr, mults=None):
+    """ reaction class screen from stoichiometry matrices
+
+    :param elems: the elements of the composition matrix columns
+    :param cmp_arr: species composition matrix, with NaN rows for species of
+        unknown formula
+    :param mults: species spin multiplicities (optional)
+    """
+    nrxns, _ = stoich.shape_(rct_mat)
+    rct_idx_arr = _side_species_indices(rct_mat, 2)
+    prd_idx_arr = _side_species_indices(prd_mat, 2)
+    rct_cnts = stoich.dot(rct_mat, numpy.ones(len(cmp_arr)))
+    prd_cnts = stoich.dot(prd_mat, numpy.ones(len(cmp_arr)))
+
+    imb_arr = formula.imbalances(rct_mat, prd_mat, numpy.nan_to_num(cmp_arr))
+    unknown = numpy.any(numpy.isnan(cmp_arr), axis=1).astype(float)
+    known = ((stoich.dot(rct_mat, unknown) == 0.) &
+             (stoich.dot(prd_mat, unknown) == 0.))
+    balanced = known & numpy.all(imb_arr == 0., axis=1)
+
+    cls_arr = numpy.full(nrxns, '', dtype=object)
+    idx_arr = numpy.full((nrxns, _NSPCS_MAX), -1)
+
+    # migration: R => P
+    rows = numpy.flatnonzero(balanced & (rct_cnts == 1) & (prd_cnts == 1))
+    cls_arr[rows] = MIGRATION
+    idx_arr[rows, :2] = numpy.stack(
+        [rct_idx_arr[rows, 0], prd_idx_arr[rows, 0]], axis=1)
+
+    # addition: X + Y => XY, or XY => X + Y
+    for cnts1, cnts2, idx_arr1, idx_arr2 in (
+            (rct_cnts, prd_cnts, rct_idx_arr, prd_idx_arr),
+            (prd_cnts, rct_cnts, prd_idx_arr, rct_idx_arr)):
+        rows = numpy.flatnonzero(balanced & (cnts1 == 2) & (cnts2 == 1))
+        cls_arr[rows] = ADDITION
+        idx_arr[rows, :3] = numpy.concatenate(
+            [idx_arr1[rows], idx_arr2[rows, :1]], axis=1)
+
+    # abstraction: Q1H + Q2 => Q1 + Q2H
+    rows = numpy.flatnonzero(balanced & (rct_cnts == 2) & (prd_cnts == 2))
+    abs_idx_arr = _abstraction_species_indices(
+        rct_idx_arr[rows], prd_idx_arr[rows], elems, cmp_arr)
+    found = abs_idx_arr[:, 0] >= 0
+    cls_arr[rows[found]] = ABSTRACTION
+    idx_arr[rows[found]] = abs_idx_arr[found]
+
+    # spin
+    if mults is not None:
+        spin_cnts = numpy.asarray(mults, dtype=float) - 1.
+        rct_spin = stoich.dot(rct_mat, spin_cnts)
+        prd_spin = stoich.dot(prd_mat, spin_cnts)
+        spin_bal_arr = rct_spin == prd_spin
+        rad_rad_arr = (_is_radical_radical(rct_mat, rct_cnts, spin_cnts) |
+                       _is_radical_radical(prd_mat, prd_cnts, spin_cnts))
+    else:
+        spin_bal_arr = numpy.ones(nrxns, dtype=bool)
+        rad_rad_arr = numpy.zeros(nrxns, dtype=bool)
+
+    return (cls_arr, idx_arr, rad_rad_arr, spin_bal_arr)
+
+
+# getters
+def classes(scr):
+    """ reaction classes ('' for reactions that fit none)
+    """
+    cls_arr, _, _, _ = scr
+    return cls_arr
+
+
+def species_indices(scr):
+    """ candidate species indices, in class order and padded with -1
+    """
+    _, idx_arr, _, _ = scr
+    return idx_arr
+
+
+def is_radical_radical(scr):
+    """ do the reactions have two or more radicals on one side?
+    """
+    _, _, rad_rad_arr, _ = scr
+    return rad_rad_arr
+
+
+def is_spin_balanced(scr):
+    """ do the reactions have the same total spin on both sides?
+    """
+    _, _, _, spin_bal_arr = scr
+    return spin_bal_arr
+
+
+# lookups
+def candidates(scr, cls):
+    """ indices of the reactions that are candidates for a class
+    """
+    assert cls in CLASSES
+    return tuple(map(int, numpy.flatnonzero(classes(scr) == cls)))
+
+
+def candidate_species(scr, rxn_idx, spcs):
+    """ the species of a candidate reaction, in class order
+    """
+    return tuple(spcs[idx] for idx in species_indices(scr)[rxn_idx]
+                 if idx >= 0)
+
+
+def map_candidates(func, scr, cls, spcs):
+    """ apply a function to the species of each candidate for a class
+
+    this is where the graph-based search for reacting atoms goes, so that it
+    only runs for the reactions that passed the screen
+
+    :param func: called with the candidate species, in class order
+    :returns: {reaction index: return value}
+    """
+    return {rxn_idx: func(*candidate_species(scr, rxn_idx, spcs))
+            for rxn_idx in candidates(scr, cls)}
+
+
+# helpers
+def _side_species_indices(mat, size):
+    """ (nrxn, size) array of the species on one side of each reaction,
+    repeated by their counts and padded with -1
+    """
+    data, indices, indptr, (nrows, _) = mat
+    cnts = numpy.rint(data).astype(int)
+    rows = numpy.repeat(numpy.repeat(numpy.arange(nrows), numpy.diff(indptr)),
+                        cnts)
+    cols = numpy.repeat(indices, cnts)
+    pos = numpy.arange(len(rows)) - numpy.searchsorted(rows, rows)
+    keep = pos < size
+    idx_arr = numpy.full((nrows, size), -1)
+    idx_arr[rows[keep], pos[keep]] = cols[keep]
+    return idx_arr
+
+
+def _abstraction_species_indices(rct_idx_arr, prd_idx_arr, elems, cmp_arr):
+    """ (Q1H, Q2, Q1, Q2H) species indices for two-by-two reactions, or -1s
+    if no hydrogen moves
+
+    tries the reactant and product orderings in turn, keeping the first match
+    """
+    idx_arr = numpy.full((len(rct_idx_arr), 4), -1)
+    if 'H' not in elems:
+        return idx_arr
+
+    h_vec = numpy.zeros(len(elems))
+    h_vec[elems.index('H')] = 1.
+    for rcol1, rcol2 in ((0, 1), (1, 0)):
+        for pcol1, pcol2 in ((0, 1), (1, 0)):
+            r1_arr = cmp_arr[rct_idx_arr[:, rcol1]]
+            r2_arr = cmp_arr[rct_idx_arr[:, rcol2]]
+            p1_arr = cmp_arr[prd_idx_arr[:, pcol1]]
+            p2_arr = cmp_arr[prd_idx_arr[:, pcol2]]
+            match = (numpy.all(p1_arr - r1_arr == -h_vec, axis=1) &
+                     numpy.all(p2_arr - r2_arr == h_vec, axis=1) &
+                     (idx_arr[:, 0] < 0))
+            idx_arr[match] = numpy.stack(
+                [rct_idx_arr[match, rcol1], rct_idx_arr[match, rcol2],
+                 prd_idx_arr[match, pcol1], prd_idx_arr[match, pcol2]],
+                axis=1)
+    return idx_arr
+
+
+def _is_radical_radical(mat, cnts, spin_cnts):
+    """ does one side of each reaction have more than one species, all of
+    which are radicals?
+    """
+    nrads = stoich.dot(mat, (spin_cnts > 0).astype(float))
+    return (cnts > 1) & (nrads == cnts)
@@ -0,0 +1,119 @@
+""" reaction mapping for whole mechanisms
+
+The candidates of each class from the reaction class screen (see `rxnclass`)
+are mapped onto atom indices with the reaction functions of `mol.graph`.
+Species graphs are built once, keyed by InChIKey, and shared between all of
+the reactions they take part in, so that small species such as H and OH
+aren't rebuilt thousands of times.
+"""
+from . import params as par
+from . import tab
+from . import stoich
+from . import formula
+from . import rxnclass
+from . import sched
+from .mol import inchi as _inchi
+from .mol import graph as _graph
+
+SPECIES_KEYS = {
+    rxnclass.ABSTRACTION: ('q1h', 'q2', 'q1', 'q2h'),
+    rxnclass.ADDITION: ('x', 'y', 'xy'),
+    rxnclass.MIGRATION: ('r', 'p'),
+}
+INDEX_KEYS = {
+    rxnclass.ABSTRACTION: ('q1h_idx', 'q2_idx', 'q1_idx', 'q2h_idx'),
+    rxnclass.ADDITION: ('x_idx', 'y_idx', 'xy_idx_x', 'xy_idx_y'),
+    rxnclass.MIGRATION: ('r_idx_h', 'r_idx_a', 'p_idx_h', 'p_idx_a'),
+}
+
+INDEX_FINDERS = {
+    rxnclass.ABSTRACTION: _graph.abstraction_indices,
+    rxnclass.ADDITION: _graph.addition_indices,
+    rxnclass.MIGRATION: _graph.migration_indices,
+}
+
+NO_MAPPING_ERROR = 'no mapping found'
+
+
+def graph_cache(ichs, gra_dct=None):
+    """ connectivity graphs for some InChI strings, by InChIKey
+
+    each graph is built once, however often its InChI comes up; pass in an
+    existing cache to add to it
+    """
+    gra_dct = {} if gra_dct is None else gra_dct
+    for ich in ichs:
+        ick = _inchi.inchi_key(ich)
+        if ick not in gra_dct:
+            gra_dct[ick] = _inchi.connectivity_graph(ich)
+    return gra_dct
+
+
+def find(rxns, ich_dct, cls, mult_dct=None, gra_dct=None):
+    """ map the candidates for a reaction class onto atom indices
+
+    :param ich_dct: InChI strings, by species name
+    :param mult_dct: spin multiplicities, by species name
+    :param gra_dct: a graph cache (see `graph_cache`), which is added to
+    :returns: {reaction index: (species, indices, error)}, with the species
+        and indices in class order; the indices are None if the reaction
+        couldn't be mapped, and the error says why
+    """
+    assert cls in rxnclass.CLASSES
+    gra_dct = {} if gra_dct is None else gra_dct
+
+    spcs, rct_mat, prd_mat = stoich.matrices(rxns)
+    elems, cmp_arr = formula.composition_matrix(
+        [formula.from_inchi(ich_dct[spc]) if spc in ich_dct else None
+         for spc in spcs])
+    mults = ([mult_dct.get(spc, float('nan')) for spc in spcs]
+             if mult_dct is not None else None)
+    scr = rxnclass.screen(rct_mat, prd_mat, elems, cmp_arr, mults)
+
+    def _map(*rxn_spcs):
+        try:
+            gras = [graph_cache([ich_dct[spc]], gra_dct)[
+                _inchi.inchi_key(ich_dct[spc])] for spc in rxn_spcs]
+            idxs = INDEX_FINDERS[cls](*gras)
+            err = None if idxs else NO_MAPPING_ERROR
+        except Exception as exc:  # pylint: disable=broad-except
+            idxs, err = None, sched.error_string(exc)
+        return rxn_spcs, idxs, err
+
+    return rxnclass.map_candidates(_map, scr, cls, spcs)
+
+
+def table(rxn_tbl, spc_tbl, cls, gra_dct=None):
+    """ map the candidates for a reaction class in a reaction table
+
+    the species table needs names and InChI strings, and may have spin
+    multiplicities
+
+    :returns: a table of the mapped reactions, with their species and indices
+        in class order, and a table of candidates that couldn't be mapped,
+        with their errors
+    """
+    name_key = par.SPC.TAB.NAME_KEY
+    ich_dct = dict(zip(spc_tbl[name_key], spc_tbl[par.SPC.ID_ICH_KEY]))
+    mult_dct = (dict(zip(spc_tbl[name_key], spc_tbl[par.SPC.MULT_KEY]))
+                if par.SPC.MULT_KEY in tab.keys_(spc_tbl) else None)
+
+    rxns = tuple(rxn_tbl[par.RXN.TAB.NAME_KEY])
+    map_dct = find(rxns, ich_dct, cls, mult_dct=mult_dct, gra_dct=gra_dct)
+
+    rows = [row for row, (_, idxs, _) in map_dct.items() if idxs]
+    map_tbl = tab.take(rxn_tbl, rows).copy()
+    spc_lst = [map_dct[row][0] for row in rows]
+    idxs_lst = [map_dct[row][1] for row in rows]
+    for key, vals in zip(SPECIES_KEYS[cls], zip(*spc_lst)):
+        map_tbl[key] = vals
+    for key, vals in zip(INDEX_KEYS[cls], zip(*idxs_lst)):
+        map_tbl[key] = vals
+
+    rows = [row for row, (_, idxs, _) in map_dct.items() if not idxs]
+    err_tbl = tab.take(rxn_tbl, rows).copy()
+    spc_lst = [map_dct[row][0] for row in rows]
+    for key, vals in zip(SPECIES_KEYS[cls], zip(*spc_lst)):
+        err_tbl[key] = vals
+    err_tbl[par.RXN.TAB.ERROR_KEY] = [map_dct[row][2] for row in rows]
+    return map_tbl, err_tbl
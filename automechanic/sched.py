@@ -0,0 +1,197 @@
+""" priority scheduling of jobs on named nodes
+
+Jobs are handed out to the nodes from the calling thread, at most
+`node_limit` at a time per node. Dispatch is driven by completions: the
+calling thread sleeps until a job finishes and then fills the freed slot with
+the pending job of highest priority, so that idle workers never wake up to
+poll and pending jobs never pile up in a pool's own queue.
+
+Failed jobs (those that raise) go back in the queue, with their priority,
+until they have been retried `retries` times; a retry goes to a node the job
+hasn't failed on, if one is free.
+
+`run` runs the jobs on a pool of worker threads, with one thread per node
+slot. `run_async` runs coroutines on an event loop in the calling thread
+instead, which lets hundreds of external commands (see `subproc`) be waited
+on at once without a thread each.
+"""
+import heapq
+import asyncio
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import wait as _wait
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def run(func, args_lst, nodes, node_limit=1, priorities=None, retries=0,
+        callback=None, logger=None):
+    """ run a function over a series of argument tuples on named nodes
+
+    if the caller is interrupted (or `callback` raises), jobs that haven't
+    started are dropped and the running ones are waited on before the
+    exception goes through
+
+    :param func: called as `func(*args, node=node)`; jobs fail by raising
+    :param nodes: node names, which may not repeat
+    :param node_limit: the most jobs to run on one node at a time
+    :param priorities: a number for each job; higher ones start first, and
+        equal ones start in order
+    :param retries: the number of times to rerun a failed job
+    :param callback: called as `callback(job_idx, node, ok, val)` in the
+        calling thread as each job finishes for good
+    :returns: (ok, return value or exception) for each job
+    """
+    args_lst = tuple(map(tuple, args_lst))
+    nodes = tuple(nodes)
+    logger = _LOGGER if logger is None else logger
+    start, finish, rets = _dispatcher(
+        len(args_lst), nodes, node_limit=node_limit, priorities=priorities,
+        retries=retries, callback=callback, logger=logger)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=len(nodes)*node_limit) as executor:
+        try:
+            for job_idx, node in start():
+                fut = executor.submit(func, *args_lst[job_idx], node=node)
+                running[fut] = (job_idx, node)
+            while running:
+                done_futs, _ = _wait(tuple(running),
+                                     return_when=FIRST_COMPLETED)
+                for fut in done_futs:
+                    job_idx, node = running.pop(fut)
+                    exc = fut.exception()
+                    finish(job_idx, node, exc,
+                           fut.result() if exc is None else None)
+                for job_idx, node in start():
+                    fut = executor.submit(func, *args_lst[job_idx], node=node)
+                    running[fut] = (job_idx, node)
+        except BaseException:
+            nwaiting = sum(not fut.cancel() for fut in running)
+            logger.warning("Scheduler stopped; waiting on {:d} running job(s)"
+                           .format(nwaiting))
+            raise
+
+    return tuple(rets)
+
+
+def run_async(coro_func, args_lst, nodes, node_limit=1, priorities=None,
+              retries=0, callback=None, logger=None):
+    """ run a coroutine function over a series of argument tuples on named
+    nodes, on an event loop in the calling thread
+
+    takes the same arguments as `run`, with `coro_func(*args, node=node)`
+    giving a coroutine; if the caller is interrupted (or `callback` raises),
+    the running jobs are cancelled and waited on before the exception goes
+    through
+
+    :returns: (ok, return value or exception) for each job
+    """
+    return asyncio.run(_run_async(
+        coro_func, args_lst, nodes, node_limit=node_limit,
+        priorities=priorities, retries=retries, callback=callback,
+        logger=logger))
+
+
+async def _run_async(coro_func, args_lst, nodes, node_limit, priorities,
+                     retries, callback, logger):
+    """ the coroutine behind `run_async`
+    """
+    args_lst = tuple(map(tuple, args_lst))
+    nodes = tuple(nodes)
+    logger = _LOGGER if logger is None else logger
+    start, finish, rets = _dispatcher(
+        len(args_lst), nodes, node_limit=node_limit, priorities=priorities,
+        retries=retries, callback=callback, logger=logger)
+    running = {}
+
+    try:
+        for job_idx, node in start():
+            tsk = asyncio.ensure_future(coro_func(*args_lst[job_idx],
+                                                  node=node))
+            running[tsk] = (job_idx, node)
+        while running:
+            done_tsks, _ = await asyncio.wait(
+                tuple(running), return_when=asyncio.FIRST_COMPLETED)
+            for tsk in done_tsks:
+                job_idx, node = running.pop(tsk)
+                exc = tsk.exception()
+                finish(job_idx, node, exc,
+                       tsk.result() if exc is None else None)
+            for job_idx, node in start():
+                tsk = asyncio.ensure_future(coro_func(*args_lst[job_idx],
+                                                      node=node))
+                running[tsk] = (job_idx, node)
+    except BaseException:
+        logger.warning("Scheduler stopped; cancelling {:d} running job(s)"
+                       .format(len(running)))
+        for tsk in running:
+            tsk.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
+
+    return tuple(rets)
+
+
+def error_string(exc):
+    """ a one-line description of an exception
+    """
+    return ': '.join(filter(None, (type(exc).__name__, str(exc))))
+
+
+def _dispatcher(njobs, nodes, node_limit, priorities, retries, callback,
+                logger):
+    """ functions to start and finish jobs, sharing one queue and one set of
+    node slots
+
+    `start()` takes the jobs that can start now off the queue, as (job index,
+    node) pairs; `finish(job_idx, node, exc, val)` frees the node and either
+    requeues the job or records its result in the returned list
+    """
+    assert nodes and len(set(nodes)) == len(nodes) and node_limit > 0
+    prios = (tuple(priorities) if priorities is not None else
+             tuple(itertools.repeat(0, njobs)))
+    assert len(prios) == njobs
+
+    queue = [(-prio, job_idx) for job_idx, prio in enumerate(prios)]
+    heapq.heapify(queue)
+    free_dct = {node: node_limit for node in nodes}
+    failed_nodes_lst = [set() for _ in range(njobs)]
+    nfails_lst = [0] * njobs
+    rets = [None] * njobs
+
+    def _start():
+        starts = []
+        while queue and any(free_dct.values()):
+            _, job_idx = heapq.heappop(queue)
+            node = _pick_node(free_dct, failed_nodes_lst[job_idx])
+            free_dct[node] -= 1
+            starts.append((job_idx, node))
+        return starts
+
+    def _finish(job_idx, node, exc, val):
+        free_dct[node] += 1
+        if exc is not None and nfails_lst[job_idx] < retries:
+            nfails_lst[job_idx] += 1
+            failed_nodes_lst[job_idx].add(node)
+            logger.info("job {:d} failed on node {:s}, retrying ({:d}/{:d}): "
+                        "{:s}".format(job_idx, node, nfails_lst[job_idx],
+                                      retries, error_string(exc)))
+            heapq.heappush(queue, (-prios[job_idx], job_idx))
+        else:
+            rets[job_idx] = (exc is None, val if exc is None else exc)
+            if callback is not None:
+                callback(job_idx, node, *rets[job_idx])
+
+    return _start, _finish, rets
+
+
+def _pick_node(free_dct, failed_nodes):
+    """ the node with the most free slots, other than the ones a job failed
+    on if possible (ties go to the first in order)
+    """
+    free_nodes = [node for node, nfree in free_dct.items() if nfree]
+    new_nodes = [node for node in free_nodes if node not in failed_nodes]
+    return max(new_nodes or free_nodes, key=free_dct.__getitem__)
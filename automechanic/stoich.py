@@ -0,0 +1,132 @@
+""" sparse stoichiometry matrices for whole mechanisms
+
+Matrices have one row per reaction and one column per species, and are kept
+in compressed sparse row (CSR) form as (data, indices, indptr, shape) tuples.
+These are the arguments of `scipy.sparse.csr_matrix((data, indices, indptr),
+shape=shape)`, for when scipy is around, but nothing here needs it.
+"""
+from collections import Counter as _Counter
+import numpy
+from .parse.chemkin import split_reaction_name as _split_reaction_name
+
+
+def matrices(rxns, spcs=()):
+    """ reactant and product stoichiometry matrices for CHEMKIN reaction names
+
+    each reaction name is parsed once and its species are interned to column
+    ids: species in `spcs` keep their positions and any others are appended
+    in the order they are found; returns the full tuple of species along with
+    the reactant and product matrices
+    """
+    col_dct = {}
+    for spc in spcs:
+        col_dct.setdefault(spc, len(col_dct))
+
+    rct_trips = ([], [], [])
+    prd_trips = ([], [], [])
+    for row, rxn in enumerate(rxns):
+        for rgts, (rows, cols, cnts) in zip(_split_reaction_name(rxn),
+                                            (rct_trips, prd_trips)):
+            for rgt, cnt in _Counter(rgts).items():
+                rows.append(row)
+                cols.append(col_dct.setdefault(rgt, len(col_dct)))
+                cnts.append(cnt)
+
+    spcs = tuple(sorted(col_dct, key=col_dct.__getitem__))
+    shape = (len(rxns), len(spcs))
+    rct_mat = from_triples(*rct_trips, shape=shape)
+    prd_mat = from_triples(*prd_trips, shape=shape)
+    return spcs, rct_mat, prd_mat
+
+
+def net(rct_mat, prd_mat):
+    """ net stoichiometry matrix, products minus reactants
+    """
+    assert shape_(rct_mat) == shape_(prd_mat)
+    rct_rows, rct_cols, rct_data = to_triples(rct_mat)
+    prd_rows, prd_cols, prd_data = to_triples(prd_mat)
+    return from_triples(numpy.concatenate([rct_rows, prd_rows]),
+                        numpy.concatenate([rct_cols, prd_cols]),
+                        numpy.concatenate([-rct_data, prd_data]),
+                        shape=shape_(rct_mat), drop_zeros=True)
+
+
+def from_triples(rows, cols, data, shape, drop_zeros=False):
+    """ CSR matrix from (row, col, value) triples, adding up repeated entries
+    """
+    nrows, ncols = shape
+    rows = numpy.asarray(rows, dtype=int)
+    cols = numpy.asarray(cols, dtype=int)
+    data = numpy.asarray(data, dtype=float)
+    assert rows.shape == cols.shape == data.shape
+
+    keys, inv = numpy.unique(rows * ncols + cols, return_inverse=True)
+    data = numpy.bincount(inv, weights=data, minlength=len(keys))
+    if drop_zeros:
+        keys, data = keys[data != 0.], data[data != 0.]
+    rows, cols = numpy.divmod(keys, max(ncols, 1))
+    indptr = numpy.concatenate(
+        [[0], numpy.cumsum(numpy.bincount(rows, minlength=nrows))])
+    return (data, cols, indptr, (nrows, ncols))
+
+
+def to_triples(mat):
+    """ (row, col, value) triples for the entries of a CSR matrix
+    """
+    data, indices, indptr, (nrows, _) = mat
+    rows = numpy.repeat(numpy.arange(nrows), numpy.diff(indptr))
+    return rows, indices, data
+
+
+def to_dense(mat):
+    """ dense array for a CSR matrix
+    """
+    rows, cols, data = to_triples(mat)
+    arr = numpy.zeros(shape_(mat))
+    arr[rows, cols] = data
+    return arr
+
+
+def shape_(mat):
+    """ the shape of a CSR matrix
+    """
+    _, _, _, mat_shape = mat
+    return mat_shape
+
+
+def transpose(mat):
+    """ transpose of a CSR matrix, also in CSR form
+    """
+    rows, cols, data = to_triples(mat)
+    nrows, ncols = shape_(mat)
+    return from_triples(cols, rows, data, shape=(ncols, nrows))
+
+
+def row_entries(mat, idx):
+    """ column indices and values of one row of a CSR matrix
+    """
+    data, indices, indptr, _ = mat
+    start, end = indptr[idx], indptr[idx+1]
+    return indices[start:end], data[start:end]
+
+
+def dot(mat, arr):
+    """ product of a CSR matrix with a dense vector or 2d array
+    """
+    data, indices, indptr, (nrows, ncols) = mat
+    arr = numpy.asarray(arr)
+    assert arr.shape[0] == ncols
+    prods = data.reshape((-1,) + (1,) * (arr.ndim - 1)) * arr[indices]
+    vals = numpy.zeros((nrows,) + arr.shape[1:], dtype=prods.dtype)
+    # add up the products row by row, skipping rows without entries
+    is_full = indptr[:-1] < indptr[1:]
+    if numpy.any(is_full):
+        vals[is_full] = numpy.add.reduceat(prods, indptr[:-1][is_full],
+                                           axis=0)
+    return vals
+
+
+def transpose_dot(mat, arr):
+    """ product of the transpose of a CSR matrix with a dense array
+    """
+    return dot(transpose(mat), arr)
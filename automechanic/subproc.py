@@ -0,0 +1,56 @@
+""" external commands, run from an asyncio event loop
+
+Commands are started with `asyncio.create_subprocess_exec` in their own
+working directories, so the calling process never changes directory and one
+event loop can wait on many commands at once (see `sched.run_async`). Their
+output goes straight from the child process to log files, rather than through
+pipes, so that the logs fill in as the commands run. Each command gets a
+process group of its own, so that a command that is killed takes its child
+processes with it.
+"""
+import os
+import signal
+import asyncio
+import contextlib
+import subprocess
+
+
+async def run(argv, cwd, out_name=None, err_name=None, timeout=None):
+    """ run a command in a directory, like `subprocess.check_call`
+
+    the command is killed if it runs for longer than `timeout` seconds, or if
+    the coroutine is cancelled
+
+    :param out_name: log file for stdout, in `cwd`
+    :param err_name: log file for stderr, in `cwd`
+    :raises subprocess.CalledProcessError: if the command fails
+    :raises subprocess.TimeoutExpired: if the command times out
+    """
+    argv = tuple(argv)
+    with contextlib.ExitStack() as stack:
+        out_obj, err_obj = (
+            stack.enter_context(open(os.path.join(cwd, name), 'wb'))
+            if name is not None else None for name in (out_name, err_name))
+        proc = await asyncio.create_subprocess_exec(
+            *argv, cwd=cwd, stdout=out_obj, stderr=err_obj,
+            start_new_session=True)
+        try:
+            retcode = await asyncio.wait_for(proc.wait(), timeout)
+        except asyncio.TimeoutError as exc:
+            await _kill(proc)
+            raise subprocess.TimeoutExpired(argv, timeout) from exc
+        except asyncio.CancelledError:
+            await _kill(proc)
+            raise
+
+    if retcode:
+        raise subprocess.CalledProcessError(retcode, argv)
+
+
+async def _kill(proc):
+    """ kill a process, along with its process group, and wait for it to go
+    """
+    if proc.returncode is None:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+    await proc.wait()
@@ -1,5 +1,8 @@
 """ interface to pandas for tabular data
 """
+import os
+import json
+import logging
 from collections import OrderedDict as _OrderedDict
 from collections import Sequence as _Sequence
 from itertools import starmap as _starmap
@@ -8,9 +11,12 @@ import numpy
 from pandas import Series as _Series
 from pandas import merge as _merge
 from pandas import read_csv as _read_csv
+from pandas import read_parquet as _read_parquet
 from pandas import DataFrame as _DataFrame
+from pandas import Index as _Index
 from pandas import Int64Index as _Int64Index
 from pandas import RangeIndex as _RangeIndex
+from pandas.api.extensions import take as _take
 from .rere.find import first_capture as _first_capture
 from .rere.pattern import escape as _escape
 from .rere.pattern import capturing as _capturing
@@ -24,6 +30,18 @@ IDX_TYP = numpy.dtype('int64')
 IDX_SAVE_KEY_FORMAT = 'i{:d}_'
 NAN = numpy.nan
 
+CSV_EXT = '.csv'
+FEATHER_EXT = '.feather'
+PARQUET_EXT = '.parquet'
+NPZ_EXT = '.npz'
+FILE_EXTS = (CSV_EXT, FEATHER_EXT, PARQUET_EXT, NPZ_EXT)
+
+_LOGGER = logging.getLogger(__name__)
+
+_NPZ_SCHEMA_KEY = 'schema'
+_NPZ_COL_KEY_FORMAT = 'col{:d}'
+_NPZ_NULL_KEY_FORMAT = 'null{:d}'
+
 
 # table creation
 def from_records(vals, keys, typs=None, idxs=None):
@@ -39,9 +57,8 @@ def from_records(vals, keys, typs=None, idxs=None):
 def from_starmap(tbl, func, arg_keys, keys, typs=None):
     """ starmap columns and create a table from the resulting values
     """
-    idxs_itr, fancy_vals_itr = zip(*enum_(tbl, arg_keys))
-    idxs = list(idxs_itr)
-    vals = list(_starmap(func, fancy_vals_itr))
+    idxs = idxs_(tbl)
+    vals = list(_starmap(func, iter_(tbl, arg_keys)))
     return from_records(vals, keys, typs, idxs)
 
 
@@ -57,15 +74,59 @@ def enforce_schema(tbl, keys, typs=None):
 
 
 # table I/O
+def read(file_pth):
+    """ read table from a file, choosing the format by its extension
+
+    binary formats (Feather, Parquet, NPZ) keep the column types, so they
+    don't have to be re-inferred from text; Feather files are memory-mapped
+    """
+    ext = file_extension(file_pth)
+    if ext == CSV_EXT:
+        tbl = read_csv(file_pth)
+    elif ext == FEATHER_EXT:
+        tbl = read_feather(file_pth)
+    elif ext == PARQUET_EXT:
+        tbl = read_parquet(file_pth)
+    else:
+        assert ext == NPZ_EXT
+        tbl = read_npz(file_pth)
+    return tbl
+
+
+def write(file_pth, tbl, float_format=None):
+    """ write table to a file, choosing the format by its extension
+
+    (`float_format` only applies to CSV files)
+    """
+    ext = file_extension(file_pth)
+    if ext == CSV_EXT:
+        write_csv(file_pth, tbl, float_format=float_format)
+    elif ext == FEATHER_EXT:
+        write_feather(file_pth, tbl)
+    elif ext == PARQUET_EXT:
+        write_parquet(file_pth, tbl)
+    else:
+        assert ext == NPZ_EXT
+        write_npz(file_pth, tbl)
+
+
+def file_extension(file_pth):
+    """ the table file extension, which determines its format
+    """
+    _, ext = os.path.splitext(file_pth)
+    ext = ext.lower()
+    if ext not in FILE_EXTS:
+        raise ValueError("Table file '{:s}' does not have one of the "
+                         "extensions {:s}"
+                         .format(file_pth, ', '.join(FILE_EXTS)))
+    return ext
+
+
 def read_csv(file_pth):
     """ read table from a CSV file
     """
     tbl = _read_csv(file_pth)
-    if IDX_KEY in keys_(tbl):
-        tbl.set_index(IDX_KEY, inplace=True)
-    else:
-        tbl.index.rename(IDX_KEY, inplace=True)
-    return tbl
+    return _set_csv_index(tbl)
 
 
 def write_csv(file_pth, tbl, float_format=None):
@@ -74,6 +135,128 @@ def write_csv(file_pth, tbl, float_format=None):
     tbl.to_csv(file_pth, float_format=float_format)
 
 
+def iter_csv(file_pth, chunk_size, after=None):
+    """ read table from a CSV file in chunks of (at most) `chunk_size` rows
+
+    if `after` is given, rows are skipped up to and including the one with
+    index `after`, which must be in the file
+
+    :raises ValueError: if there is no row with index `after`
+    """
+    skip = after is not None
+    for tbl in _read_csv(file_pth, chunksize=chunk_size):
+        tbl = _set_csv_index(tbl)
+        if skip and after in tbl.index:
+            tbl = tbl.iloc[tbl.index.get_loc(after)+1:]
+            skip = False
+        if not skip and len(tbl):
+            yield tbl
+    if skip:
+        raise ValueError("No row with index {} in {:s}"
+                         .format(after, file_pth))
+
+
+def append_csv(file_pth, tbl, float_format=None):
+    """ append table rows to a CSV file, writing the header if it is new
+
+    (the rows are flushed to disk before returning)
+    """
+    header = not (os.path.isfile(file_pth) and os.path.getsize(file_pth))
+    csv_str = tbl.to_csv(header=header, float_format=float_format)
+    with open(file_pth, mode='a', encoding='utf-8') as file_obj:
+        file_obj.write(csv_str)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+
+
+def read_csv_header(file_pth):
+    """ read an empty table with the keys from a CSV file header
+    """
+    tbl = _read_csv(file_pth, nrows=0)
+    return _set_csv_index(tbl)
+
+
+def last_csv_value(file_pth, key=IDX_KEY):
+    """ the last value of a column in a CSV file, or None if there is none
+
+    (by default, this is the last index written to the file)
+    """
+    val = None
+    if os.path.isfile(file_pth) and os.path.getsize(file_pth):
+        col = _read_csv(file_pth, usecols=[key])[key]
+        val = col.iloc[-1].item() if len(col) else None
+    return val
+
+
+def read_feather(file_pth):
+    """ read table from a Feather file (requires pyarrow)
+    """
+    from pyarrow import feather
+    tbl = feather.read_table(file_pth, memory_map=True).to_pandas()
+    tbl.set_index(IDX_KEY, inplace=True)
+    return tbl
+
+
+def write_feather(file_pth, tbl):
+    """ write table to a Feather file (requires pyarrow)
+    """
+    tbl.reset_index(level=IDX_KEY).to_feather(file_pth)
+
+
+def read_parquet(file_pth):
+    """ read table from a Parquet file (requires pyarrow)
+    """
+    tbl = _read_parquet(file_pth, memory_map=True)
+    tbl.set_index(IDX_KEY, inplace=True)
+    return tbl
+
+
+def write_parquet(file_pth, tbl):
+    """ write table to a Parquet file (requires pyarrow)
+    """
+    tbl.reset_index(level=IDX_KEY).to_parquet(file_pth, index=False)
+
+
+def read_npz(file_pth):
+    """ read table from a numpy NPZ file, as written by `write_npz`
+    """
+    with numpy.load(file_pth, allow_pickle=False) as npz:
+        keys, typs = zip(*json.loads(str(npz[_NPZ_SCHEMA_KEY])))
+        cols = tuple(map(npz.__getitem__,
+                         map(_NPZ_COL_KEY_FORMAT.format, range(len(keys)))))
+        cols = tuple(
+            _npz_object_column(col, npz[_NPZ_NULL_KEY_FORMAT.format(num)])
+            if numpy.dtype(typ) == numpy.dtype('O') else col
+            for num, (col, typ) in enumerate(zip(cols, typs)))
+        idxs = npz[IDX_KEY]
+    return _from_columns(cols, keys, typs, idxs)
+
+
+def write_npz(file_pth, tbl):
+    """ write table to a numpy NPZ file
+
+    (a dependency-free binary format: object columns must hold strings,
+    which are stored as fixed-width unicode arrays with a null mask)
+    """
+    keys = keys_(tbl)
+    typs = typs_(tbl)
+    schema = json.dumps([[key, typ.str] for key, typ in zip(keys, typs)])
+    arrs = {_NPZ_SCHEMA_KEY: numpy.array(schema), IDX_KEY: tbl.index.values}
+    for num, (key, typ) in enumerate(zip(keys, typs)):
+        col = tbl[key]
+        if typ == numpy.dtype('O'):
+            nulls = col.isnull().values
+            vals = col.values[~nulls]
+            assert all(isinstance(val, str) for val in vals), (
+                "Column '{:s}' cannot be written to NPZ".format(key))
+            arrs[_NPZ_NULL_KEY_FORMAT.format(num)] = nulls
+            arrs[_NPZ_COL_KEY_FORMAT.format(num)] = numpy.array(
+                col.where(~nulls, '').tolist(), dtype=str)
+        else:
+            arrs[_NPZ_COL_KEY_FORMAT.format(num)] = col.values
+    numpy.savez(file_pth, **arrs)
+
+
 # table properties
 def idxs_(tbl):
     """ table indices
@@ -93,6 +276,13 @@ def vals_(tbl):
     return numpy.array(tbl.values)
 
 
+def arr_(tbl, keys, typ=None):
+    """ values of one or more columns (fancy) as a 2d array, one row each
+    """
+    arr = numpy.array(tbl[list(_unfancy_keys(keys))].values)
+    return arr if typ is None else arr.astype(typ)
+
+
 def typs_(tbl):
     """ table column types
     """
@@ -130,8 +320,7 @@ def iter_(tbl, keys):
     """ yield records from one or more columns (fancy)
     """
     itrs = map(_iter_vals, _fancy_select(tbl, keys))
-    for fancy_vals in zip(*itrs):
-        yield fancy_vals
+    yield from zip(*itrs)
 
 
 def enum_(tbl, keys):
@@ -159,16 +348,23 @@ def has_keys(tbl, keys):
     return all(ukey in keys_(tbl) for ukey in ukeys)
 
 
-def update(tbl1, tbl2):
+def update(tbl1, tbl2, inplace=False):
     """ write the values in table 2 over those in table 1
 
     indices of table 2 must be a subset of those in table 1, but it may
     contain new columns to be added to table 1
+
+    The indices are aligned once and each column is written in a single
+    vectorized assignment. If `inplace` is set, table 1 itself is updated;
+    otherwise table 1 is left untouched and only the updated columns are
+    copied into the returned table (copy-on-write).
     """
-    assert set(idxs_(tbl1)) >= set(idxs_(tbl2))
-    tbl = tbl1.copy(deep=True)
-    for key in tbl2:
-        tbl.loc[list(idxs_(tbl2)), key] = tbl2[key]
+    pos = _positions(tbl1, idxs=idxs_(tbl2))
+    cols = _OrderedDict((key, _updated_column(tbl1, tbl2[key], pos))
+                        for key in keys_(tbl2))
+    tbl = tbl1 if inplace else _DataFrame.copy(tbl1, deep=False)
+    for key, col in cols.items():
+        tbl[key] = col
     return tbl
 
 
@@ -189,10 +385,121 @@ def right_join(tbl1, tbl2, key=None):
 
 
 def _join(tbl1, tbl2, key=None, right=False):
+    """ join two tables, aligning their rows directly if the key is the
+    index or a saved index, and falling back on a general merge otherwise
+    """
     key = IDX_KEY if key is None else key
     how = 'right' if right else 'left'
-    tbl = _merge(tbl1, tbl2, how=how, left_on=key, right_on=key)
-    tbl.index.rename(IDX_KEY, inplace=True)
+    drv_tbl, oth_tbl = (tbl2, tbl1) if right else (tbl1, tbl2)
+    poss = _join_positions(drv_tbl, oth_tbl, key=key)
+    if poss is not None:
+        drv_pos, oth_pos = poss
+        pos1, pos2 = (oth_pos, drv_pos) if right else (drv_pos, oth_pos)
+        tbl = _take_join(tbl1, tbl2, pos1, pos2, key=key,
+                         key_tbl=drv_tbl, key_pos=drv_pos)
+    else:
+        tbl = _merge(tbl1, tbl2, how=how, left_on=key, right_on=key)
+        tbl.index.rename(IDX_KEY, inplace=True)
+    _LOGGER.info("{:s} join on '{:s}': {:d} and {:d} rows -> {:d} rows"
+                 .format(how, key, len(tbl1), len(tbl2), len(tbl)))
+    return tbl
+
+
+def _join_positions(drv_tbl, oth_tbl, key):
+    """ row positions for joining two tables on the index or a saved index
+
+    Each row of the driving table is matched to the rows of the other table
+    with the same key, in order; unmatched rows get a position of -1.
+    Returns None if neither table has unique keys, or if the key is not an
+    index.
+    """
+    if not (key == IDX_KEY or _is_index_save_key(key)):
+        return None
+    if set(keys_(drv_tbl)) & set(keys_(oth_tbl)) - {key}:
+        return None
+
+    drv_idxs = _key_index(drv_tbl, key)
+    oth_idxs = _key_index(oth_tbl, key)
+    nrows = len(drv_idxs)
+    if oth_idxs.is_unique:
+        # one or zero matches per row: a single take
+        drv_pos = numpy.arange(nrows)
+        oth_pos = oth_idxs.get_indexer(drv_idxs)
+    elif drv_idxs.is_unique:
+        # several matches per row: repeat the driving rows to fit them
+        grps = drv_idxs.get_indexer(oth_idxs)
+        mtch_pos = numpy.flatnonzero(grps >= 0)
+        order = numpy.argsort(grps[mtch_pos], kind='mergesort')
+        mtch_pos = mtch_pos[order]
+        grps = grps[mtch_pos]
+        cnts = numpy.bincount(grps, minlength=nrows)
+        reps = numpy.maximum(cnts, 1)
+        drv_pos = numpy.repeat(numpy.arange(nrows), reps)
+        oth_pos = numpy.full(len(drv_pos), -1)
+        slots = ((numpy.cumsum(reps) - reps)[grps] +
+                 numpy.arange(len(grps)) - (numpy.cumsum(cnts) - cnts)[grps])
+        oth_pos[slots] = mtch_pos
+    else:
+        return None
+    return drv_pos, oth_pos
+
+
+def _take_join(tbl1, tbl2, pos1, pos2, key, key_tbl, key_pos):
+    """ assemble a joined table by taking rows from each table
+
+    (-1 positions are filled with NaN; the key values are taken from
+    `key_tbl` at `key_pos`)
+    """
+    if key == IDX_KEY:
+        idxs = _Int64Index(_take(key_tbl.index.values, key_pos),
+                           name=IDX_KEY)
+    else:
+        idxs = _RangeIndex(stop=len(key_pos), name=IDX_KEY)
+
+    data = _OrderedDict()
+    for col_key in keys_(tbl1):
+        data[col_key] = (_take(key_tbl[key].values, key_pos)
+                         if col_key == key else
+                         _take(tbl1[col_key].values, pos1, allow_fill=True))
+    for col_key in keys_(tbl2):
+        if col_key != key:
+            data[col_key] = _take(tbl2[col_key].values, pos2,
+                                  allow_fill=True)
+    return _DataFrame(data=data, index=idxs)
+
+
+def expand(tbl, key, vals_lst, typ=None):
+    """ expand each row into one row per value in a list of values
+
+    The values go in column `key`, which is moved to the end of the table.
+    Rows with an empty list of values are kept, with a null value. The
+    expanded table is numbered consecutively.
+    """
+    vals_lst = tuple(map(tuple, vals_lst))
+    assert len(vals_lst) == len(tbl)
+    cnts = numpy.array(tuple(map(len, vals_lst)), dtype=int)
+    pos = numpy.repeat(numpy.arange(len(tbl)), numpy.maximum(cnts, 1))
+    vals = tuple(_chain(*(vals if vals else (NAN,) for vals in vals_lst)))
+    typ = dt_(object if typ is None else typ)
+
+    data = _OrderedDict((col_key, _take(tbl[col_key].values, pos))
+                        for col_key in keys_(tbl) if col_key != key)
+    data[key] = _typed_array(vals, typ)
+    idxs = _RangeIndex(stop=len(pos), name=IDX_KEY)
+    return _DataFrame(data=data, index=idxs)
+
+
+def take(tbl, pos):
+    """ the rows at these positions, keeping their indices
+    """
+    return tbl.iloc[list(pos)]
+
+
+def renumber(tbl, start=0):
+    """ number the table indices consecutively, starting from `start`
+    """
+    tbl = _DataFrame.copy(tbl, deep=False)
+    tbl.index = _RangeIndex(start=start, stop=start+len(tbl), name=IDX_KEY)
     return tbl
 
 
@@ -214,6 +521,20 @@ def next_index_save_key(tbl):
     return idx_save_key
 
 
+def _is_index_save_key(key):
+    """ is this a saved index key?
+    """
+    _pattern = (_STRING_START + 'i' + _capturing(_UNSIGNED_INTEGER) +
+                _escape('_') + _STRING_END)
+    return _first_capture(_pattern, key) is not None
+
+
+def _key_index(tbl, key):
+    """ the index or a saved index of a table, as a pandas index
+    """
+    return tbl.index if key == IDX_KEY else _Index(tbl[key].values)
+
+
 def _index_save_ids(tbl):
     """ get the values of previously saved index keys
     """
@@ -226,54 +547,145 @@ def _index_save_ids(tbl):
 
 
 # helpers
+def _set_csv_index(tbl):
+    """ set the table index from the CSV index column, if there is one
+    """
+    if IDX_KEY in keys_(tbl):
+        tbl.set_index(IDX_KEY, inplace=True)
+    else:
+        tbl.index.rename(IDX_KEY, inplace=True)
+    return tbl
+
+
+def _npz_object_column(col, nulls):
+    """ restore an object column from an NPZ string array and null mask
+    """
+    col = col.astype(object)
+    col[nulls] = NAN
+    return col
+
+
+def _positions(tbl, idxs):
+    """ integer positions of a set of indices in a table
+    """
+    assert tbl.index.is_unique
+    pos = tbl.index.get_indexer(idxs)
+    assert not numpy.any(pos < 0)
+    return pos
+
+
+def _updated_column(tbl, col, pos):
+    """ the values of a column in `tbl`, overwritten by `col` at `pos`
+    """
+    key = col.name
+    nrows = len(tbl)
+    col_vals = col.values
+    if key in tbl.columns:
+        vals = tbl[key].values
+        typ = numpy.result_type(vals.dtype, col_vals.dtype)
+        vals = numpy.array(vals, dtype=typ)
+    else:
+        typ = col_vals.dtype
+        if len(pos) < nrows and typ.kind not in 'fcO':
+            # rows missing from `col` are filled with NaN
+            typ = numpy.dtype('float64' if typ.kind in 'biu' else 'O')
+        vals = (numpy.full(nrows, NAN, dtype=typ) if typ.kind in 'fcO' else
+                numpy.empty(nrows, dtype=typ))
+    vals[pos] = col_vals
+    return vals
+
+
 def _iter_vals(tbl):
     """ iterate over values in a table or series
+
+    (values are drawn from the typed column arrays, one column at a time)
     """
-    if hasattr(tbl, 'itertuples'):
-        for vals in tbl.itertuples(index=False, name=None):
-            yield vals
-    elif hasattr(tbl, 'iteritems'):
-        for _, val in tbl.iteritems():
-            yield val
+    if hasattr(tbl, 'columns'):
+        cols = tuple(_column_values(tbl[key]) for key in tbl.columns)
+        yield from zip(*cols)
+    else:
+        yield from _column_values(tbl)
 
 
 def _iter_idxs(tbl):
     """ iterate over indices in a table or series
     """
-    if hasattr(tbl, 'itertuples'):
-        for vals in tbl.itertuples(index=True, name=None):
-            idx = vals[0]
-            yield idx
-    elif hasattr(tbl, 'iteritems'):
-        for idx, _ in tbl.iteritems():
-            yield idx
+    yield from tbl.index.tolist()
+
+
+def _column_values(col):
+    """ the values of a single column, as native python objects
+    """
+    return col.values.tolist()
 
 
 def _from_records(vals, keys, typs=None, idxs=None):
     """ create a table from a series of records
     """
-    if numpy.size(vals):
-        assert numpy.ndim(vals) in (1, 2)
-        vals = (numpy.array(vals) if numpy.ndim(vals) == 2 else
-                numpy.reshape(vals, (-1, 1)))
-    else:
-        vals = numpy.reshape([], (0, len(keys)))
-    nrows, ncols = numpy.shape(vals)
+    cols = _record_columns(vals, ncols=len(keys))
+    return _from_columns(cols, keys, typs, idxs)
+
+
+def _from_columns(cols, keys, typs=None, idxs=None):
+    """ create a table from a series of columns
+
+    each column is converted to its own typed array, so that mixed-type
+    records are never coerced into a single object array
+    """
+    ncols = len(keys)
+    cols = tuple(cols) if len(cols) else ((),) * ncols
+    nrows = len(cols[0]) if ncols else 0
 
     idxs = (_RangeIndex(stop=nrows, name=IDX_KEY) if idxs is None
             else _Int64Index(idxs, name=IDX_KEY))
     typs = (object,) * ncols if typs is None else typs
     typs = tuple(map(dt_, typs))
-    assert len(keys) == len(typs) == ncols and len(idxs) == nrows
+    assert len(cols) == len(typs) == ncols and len(idxs) == nrows
+    assert all(len(col) == nrows for col in cols)
     assert IDX_KEY not in keys
 
-    cols = numpy.transpose(vals)
-    data = _OrderedDict((key, _Series(data=col, dtype=typ, index=idxs))
+    data = _OrderedDict((key, _Series(data=_typed_array(col, typ),
+                                      dtype=typ, index=idxs))
                         for col, key, typ in zip(cols, keys, typs))
 
     return _DataFrame(data=data, index=idxs)
 
 
+def _record_columns(vals, ncols):
+    """ split a series of records into columns
+    """
+    if isinstance(vals, numpy.ndarray):
+        assert vals.ndim in (1, 2)
+        cols = (tuple(numpy.transpose(vals)) if vals.ndim == 2 else
+                (vals,))
+    else:
+        vals = list(vals)
+        if not vals:
+            cols = ((),) * ncols
+        elif _is_record(vals[0]):
+            cols = tuple(zip(*vals))
+        else:
+            cols = (vals,)
+    return cols
+
+
+def _is_record(val):
+    return (isinstance(val, (_Sequence, numpy.ndarray))
+            and not isinstance(val, (str, bytes, bytearray)))
+
+
+def _typed_array(col, typ):
+    """ convert a column to a typed array
+    """
+    if typ == numpy.dtype('O'):
+        arr = numpy.empty(len(col), dtype=typ)
+        for num, val in enumerate(col):
+            arr[num] = val
+    else:
+        arr = numpy.asarray(col, dtype=typ)
+    return arr
+
+
 # fancy helpers
 def _is_fancy(key):
     assert isinstance(key, _Sequence)
@@ -298,8 +710,7 @@ def _from_fancy_records(fancy_vals, fancy_keys, group_typs=None, idxs=None):
     keys = _unfancy_keys(fancy_keys)
     typs = _unfancy_group_types(group_typs, fancy_keys)
     cols = _unfancy_columns(fancy_cols, fancy_keys) if fancy_cols else ()
-    vals = numpy.transpose(cols)
-    return _from_records(vals, keys, typs, idxs)
+    return _from_columns(cols, keys, typs, idxs)
 
 
 def _unfancy_keys(fancy_keys):
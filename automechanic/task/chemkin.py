@@ -2,38 +2,122 @@
 """
 from .. import params as par
 from .. import tab
-from ..iohelp import read_string
+from .. import mechgraph
+from ..timing import timer
+from ..iohelp import find_lines
+from ..iohelp import find_offsets
+from ..iohelp import read_offsets
+from ..iohelp import cached_index
 from ..iohelp import timestamp_if_exists
+from ..parse.chemkin import SPECIES_BLOCK_START_LINE
+from ..parse.chemkin import REACTIONS_BLOCK_START_LINE
+from ..parse.chemkin import THERMO_BLOCK_START_LINE
+from ..parse.chemkin import BLOCK_END_LINE
+from ..parse.chemkin import THERMO_HEADLINE
 from ..parse.chemkin import species_names
-from ..parse.chemkin import thermo_data
+from ..parse.chemkin import thermo_data_string
+from ..parse.chemkin import thermo_data_from_strings
 from ..parse.chemkin import reaction_data
 
+THERMO_INDEX_SUFFIX = '.thermo.idx'
+
+
+class DEFS():
+    """ function argument defaults"""
+    class SUBSET():
+        """_"""
+        DEPTH = 1
+        EXCLUDE_SPECIES = ()
+
 
 def to_csv(mech_txt_lst, rxn_csv_out, spc_csv_out, logger):
     """ parse CHEMKIN information to CSV
+
+    thermo data is looked up for the species in the SPECIES block only, so it
+    may come from a larger thermo library; the first entry found for each
+    species is used, through an index of each file's thermo entries which is
+    cached next to it
     """
     logger.info("Reading in mechanism file(s)")
-    mech_str = '\n'.join(map(read_string, mech_txt_lst))
+    with timer('read', logger):
+        spc_str = _read_block(mech_txt_lst, SPECIES_BLOCK_START_LINE,
+                              'SPECIES')
+        rxn_str = _read_block(mech_txt_lst, REACTIONS_BLOCK_START_LINE,
+                              'REACTIONS')
 
     logger.info("Finding species data")
-    spc_tbl = _species_table(mech_str)
+    with timer('species', logger):
+        spc_tbl = _species_table(spc_str, mech_txt_lst, logger)
 
     logger.info("Writing species data to {:s}".format(spc_csv_out))
-    timestamp_if_exists(spc_csv_out)
-    tab.write_csv(spc_csv_out, spc_tbl, float_format='%.8f')
+    with timer('write', logger):
+        timestamp_if_exists(spc_csv_out)
+        tab.write(spc_csv_out, spc_tbl, float_format='%.8f')
 
     logger.info("Finding reactions data")
-    rxn_tbl = _reactions_table(mech_str)
+    with timer('reactions', logger):
+        rxn_tbl = _reactions_table(rxn_str)
 
     logger.info("Writing reaction data to {:s}".format(spc_csv_out))
-    timestamp_if_exists(rxn_csv_out)
-    tab.write_csv(rxn_csv_out, rxn_tbl, float_format='%.8f')
+    with timer('write', logger):
+        timestamp_if_exists(rxn_csv_out)
+        tab.write(rxn_csv_out, rxn_tbl, float_format='%.8f')
+
+
+def subset(rxn_csv, spcs, depth, exclude_spcs, rxn_csv_out, logger):
+    """ select the reactions within some number of steps of some species
+
+    the reactions of the species are one step away, the reactions of the
+    species in those are two steps away, and so on; excluded species (such as
+    small radicals) aren't stepped through
+    """
+    logger.info("Reading in {:s}".format(rxn_csv))
+    with timer('read', logger):
+        rxn_tbl = tab.read(rxn_csv)
+
+    logger.info("Building the mechanism graph")
+    with timer('graph', logger):
+        mgr = mechgraph.from_reactions(tuple(rxn_tbl[par.RXN.TAB.NAME_KEY]))
+
+    missing_spcs = [spc for spc in spcs if spc not in mechgraph.species(mgr)]
+    if missing_spcs:
+        raise ValueError("Species not in {:s}: {:s}"
+                         .format(rxn_csv, ' '.join(missing_spcs)))
+
+    logger.info("Finding reactions within {:d} step(s) of {:s}"
+                .format(depth, ' '.join(spcs)))
+    with timer('subset', logger):
+        rxn_idxs = mechgraph.neighborhood(mgr, spcs, depth=depth,
+                                          exclude=exclude_spcs)
+    logger.info("Found {:d} of {:d} reactions"
+                .format(len(rxn_idxs), len(rxn_tbl)))
 
+    logger.info("Writing reaction data to {:s}".format(rxn_csv_out))
+    with timer('write', logger):
+        timestamp_if_exists(rxn_csv_out)
+        tab.write(rxn_csv_out, tab.take(rxn_tbl, rxn_idxs),
+                  float_format='%.8f')
 
-def _species_table(mech_str):
-    spcs = species_names(mech_str)
-    thm_dat_lst = thermo_data(mech_str)
-    assert len(thm_dat_lst) == len(spcs)
+
+def _read_block(mech_txt_lst, start_line, name):
+    """ read in the first block of the files opening with `start_line`
+
+    (only the block is decoded, and the files aren't joined, so that large
+    thermo libraries aren't copied around)
+    """
+    for mech_txt in mech_txt_lst:
+        offsets = find_offsets(mech_txt, start_line, BLOCK_END_LINE)
+        if offsets:
+            blk_strs = read_offsets(mech_txt, offsets[:1])
+            return blk_strs[0]
+    raise ValueError("No {:s} block in {:s}"
+                     .format(name, ', '.join(mech_txt_lst)))
+
+
+def _species_table(spc_str, mech_txt_lst, logger):
+    spcs = species_names(spc_str)
+    thm_dstr_lst = _thermo_data_strings(spcs, mech_txt_lst, logger)
+    thm_dat_lst = thermo_data_from_strings(thm_dstr_lst)
     keys = (par.SPC.TAB.NAME_KEY, par.SPC.TAB.NASA_C_LO_KEYS,
             par.SPC.TAB.NASA_C_HI_KEYS, par.SPC.TAB.NASA_T_KEYS)
     typs = (par.SPC.TAB.NAME_TYP, par.SPC.TAB.NASA_C_TYP,
@@ -42,8 +126,66 @@ def _species_table(mech_str):
     return spc_tbl
 
 
-def _reactions_table(mech_str):
-    rxn_dat_lst = reaction_data(mech_str)
+def _thermo_data_strings(spcs, mech_txt_lst, logger):
+    """ read in the thermo data strings of these species from the files
+    """
+    spc_offset_dct = {}
+    for mech_txt in mech_txt_lst:
+        thm_idx = cached_index(mech_txt, _thermo_index,
+                               suffix=THERMO_INDEX_SUFFIX)
+        if thm_idx['duplicates']:
+            logger.info("Ignoring later thermo entries for {:d} species in "
+                        "{:s}".format(len(thm_idx['duplicates']), mech_txt))
+        for spc in spcs:
+            if spc not in spc_offset_dct and spc in thm_idx['offsets']:
+                spc_offset_dct[spc] = (mech_txt, thm_idx['offsets'][spc])
+
+    missing_spcs = [spc for spc in spcs if spc not in spc_offset_dct]
+    if missing_spcs:
+        raise ValueError("No thermo data for species: {:s}"
+                         .format(' '.join(missing_spcs)))
+
+    thm_dstr_dct = {}
+    for mech_txt in mech_txt_lst:
+        mech_spcs = [spc for spc in spcs
+                     if spc_offset_dct[spc][0] == mech_txt]
+        offsets = [spc_offset_dct[spc][1] for spc in mech_spcs]
+        thm_strs = read_offsets(mech_txt, offsets)
+        thm_dstr_dct.update(zip(mech_spcs, map(thermo_data_string,
+                                               thm_strs)))
+    return [thm_dstr_dct[spc] for spc in spcs]
+
+
+def _thermo_index(mech_txt):
+    """ byte offsets of the thermo entry for each species in a file
+
+    only the first thermo block and the first entry for each species count;
+    species with more than one entry are listed as duplicates
+    """
+    offset_dct = {}
+    dup_spcs = []
+
+    blk_offsets = find_offsets(mech_txt, THERMO_BLOCK_START_LINE,
+                               BLOCK_END_LINE)
+    if blk_offsets:
+        blk_start, blk_end = blk_offsets[0]
+        end_lines = find_lines(mech_txt, BLOCK_END_LINE, blk_start, blk_end)
+        blk_end = end_lines[-1][0] if end_lines else blk_end
+        headlines = find_lines(mech_txt, THERMO_HEADLINE, blk_start, blk_end)
+        starts = [start for start, _ in headlines]
+        for start, end, (_, headline) in zip(starts, starts[1:] + [blk_end],
+                                             headlines):
+            spc = headline.split()[0]
+            if spc in offset_dct:
+                dup_spcs.append(spc)
+            else:
+                offset_dct[spc] = (start, end)
+
+    return {'offsets': offset_dct, 'duplicates': sorted(set(dup_spcs))}
+
+
+def _reactions_table(rxn_str):
+    rxn_dat_lst = reaction_data(rxn_str)
     keys = (par.RXN.TAB.NAME_KEY, par.RXN.TAB.ARRH_KEYS)
     typs = (par.RXN.TAB.NAME_TYP, par.RXN.TAB.ARRH_TYP)
     rxn_tbl = tab.from_records(vals=rxn_dat_lst, keys=keys, typs=typs)
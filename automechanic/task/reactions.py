@@ -0,0 +1,454 @@
+""" tasks that operate on CSVs with reaction information
+"""
+import os
+import time
+import collections
+from .. import params as par
+from .. import tab
+from .. import sched
+from .. import journal
+from .. import subproc
+from .. import jobdir
+from .. import formula
+from .. import mol
+from .. import rxnclass
+from .. import rxnmap
+from ..iohelp import read_string
+from ..iohelp import timestamp_if_exists
+from ..timing import timer
+
+
+class VALS():
+    """ function argument values """
+    class MAPxINDICES():
+        """_"""
+        REACTION_CLASS = rxnclass.CLASSES
+
+    class SETUP():
+        """_"""
+        REACTION_CLASS = rxnclass.CLASSES
+
+    class RUN():
+        """_"""
+        REACTION_CLASS = rxnclass.CLASSES
+
+
+class DEFS():
+    """ function argument defaults"""
+    class SETUP():
+        """_"""
+        RUN_DIR = 'runs'
+        NODES = ('localhost',)
+        NTHREADS = 8
+
+    class RUN():
+        """_"""
+        NODES = ('localhost',)
+        NODE_LIMIT = 1
+        RETRIES = 0
+        TIMEOUT = None
+
+
+def map_indices(cls, rxn_csv, spc_csv, rxn_csv_out, unm_csv_out, logger):
+    """ map the candidates for a reaction class onto atom indices, for
+    `setup`
+
+    the mapped reactions are written with their species and indices in class
+    order (`q1h`, ..., `q1h_idx`, ...), and the candidates that couldn't be
+    mapped are written to a separate table, with their errors
+    """
+    assert cls in VALS.MAPxINDICES.REACTION_CLASS
+
+    logger.info("Reading in {:s}".format(rxn_csv))
+    with timer('read', logger):
+        rxn_tbl = tab.read(rxn_csv)
+        spc_tbl = tab.read(spc_csv)
+
+    logger.info("Mapping {:s} candidates in {:d} reaction(s)"
+                .format(cls, len(rxn_tbl)))
+    with timer('map', logger):
+        map_tbl, unm_tbl = rxnmap.table(rxn_tbl, spc_tbl, cls)
+    logger.info("Mapped {:d} reaction(s); {:d} candidate(s) couldn't be "
+                "mapped".format(len(map_tbl), len(unm_tbl)))
+
+    logger.info("Writing mapped reactions to {:s}".format(rxn_csv_out))
+    logger.info("Writing unmapped candidates to {:s}".format(unm_csv_out))
+    with timer('write', logger):
+        timestamp_if_exists(rxn_csv_out)
+        tab.write(rxn_csv_out, map_tbl)
+        timestamp_if_exists(unm_csv_out)
+        tab.write(unm_csv_out, unm_tbl)
+
+
+def setup(cls, rxn_csv, spc_csv, tpl_txt, run_dir, nodes, nthreads, logger):
+    """ write a job directory for each mapped reaction
+
+    each directory gets an .xyz file for each species, named by its part in
+    the reaction (`q1h.xyz`, `q2.xyz`, etc.) and with the reacting atoms
+    first, in the order of the index columns, and an input file from the
+    template, filled in as for `run` with all of the nodes; the reactions are
+    given their paths and marked as created
+
+    a directory that was last written from the same input file, InChI
+    strings and atom orderings is current and is left alone, along with its
+    status; for the rest, species geometries are generated once per species
+    (from the InChI strings in the species table) and .xyz strings once per
+    atom ordering, and the directories are written on `nthreads` threads
+
+    the geometries come from RDKit alone, since their atoms have to line up
+    with the index columns; a reaction with a species that RDKit can't handle
+    is given an error instead
+    """
+    assert cls in VALS.SETUP.REACTION_CLASS
+    jnl_pth = journal.path_(rxn_csv)
+
+    _compact(rxn_csv, logger)
+
+    logger.info("Reading in {:s}".format(rxn_csv))
+    with timer('read', logger):
+        rxn_tbl = tab.read(rxn_csv)
+        spc_tbl = tab.read(spc_csv)
+    assert tab.has_keys(rxn_tbl, rxnmap.SPECIES_KEYS[cls] +
+                        rxnmap.INDEX_KEYS[cls])
+    ich_dct = dict(zip(spc_tbl[par.SPC.TAB.NAME_KEY],
+                       spc_tbl[par.SPC.ID_ICH_KEY]))
+
+    logger.info("Reading template file from {:s}".format(tpl_txt))
+    tpl = _template(tpl_txt, rxnmap.SPECIES_KEYS[cls])
+
+    logger.info("Rendering input files for {:d} reaction(s)".format(
+        len(rxn_tbl)))
+    with timer('render', logger):
+        jobs, errs = _setup_jobs(cls, rxn_tbl, ich_dct, tpl, ', '.join(nodes))
+    idxs = tab.idxs_(rxn_tbl)
+    paths = [os.path.join(run_dir, str(idxs[job['row']])) for job in jobs]
+
+    logger.info("Checking job directories in {:s} on {:d} thread(s)"
+                .format(run_dir, nthreads))
+    with timer('check', logger):
+        currents = jobdir.current_all(
+            paths, [job['digest'] for job in jobs], nthreads=nthreads)
+    poss = [pos for pos, current in enumerate(currents) if not current]
+    logger.info("{:d} job directories are current"
+                .format(len(jobs) - len(poss)))
+
+    logger.info("Generating .xyz files for {:d} job directories"
+                .format(len(poss)))
+    with timer('geometries', logger):
+        file_rets = _setup_job_files(cls, [jobs[pos] for pos in poss],
+                                     ich_dct, logger)
+    errs += [(jobs[pos]['row'], sched.error_string(val))
+             for pos, (ok, val) in zip(poss, file_rets) if not ok]
+    new_poss = [pos for pos, (ok, _) in zip(poss, file_rets) if ok]
+    file_dcts = [val for ok, val in file_rets if ok]
+
+    logger.info("Writing job directories to {:s} on {:d} thread(s)"
+                .format(run_dir, nthreads))
+    logger.info("Recording job statuses in {:s}".format(jnl_pth))
+    try:
+        with journal.writer(jnl_pth) as append, timer('write', logger):
+            _record_setup_errors(append, idxs, errs, logger)
+            _record_current_jobs(
+                append, rxn_tbl, [(job['row'], path) for job, path, current
+                                  in zip(jobs, paths, currents) if current])
+            wrt_rets = jobdir.write_all(
+                [paths[pos] for pos in new_poss], file_dcts,
+                [jobs[pos]['digest'] for pos in new_poss], nthreads=nthreads,
+                callback=_written_job_recorder(
+                    append, idxs, [(jobs[pos]['row'], paths[pos])
+                                   for pos in new_poss], logger))
+        nwrites = sum(ok for ok, _ in wrt_rets)
+        logger.info("Wrote {:d} job directories".format(nwrites))
+        nfails = len(errs) + len(new_poss) - nwrites
+        if nfails:
+            logger.warning("{:d} reaction(s) failed to set up"
+                           .format(nfails))
+    finally:
+        _compact(rxn_csv, logger)
+
+
+def _setup_jobs(cls, rxn_tbl, ich_dct, tpl, nodes_str):
+    """ the input file, .xyz file orderings and digest for each reaction
+
+    :returns: a list of jobs, as dicts with the table row (`row`), input
+        string (`input`), species and atom orderings for the .xyz files
+        (`xyz_keys`) and digest (`digest`), and a list of (row, error) for the
+        reactions that couldn't be set up
+    """
+    spc_keys = rxnmap.SPECIES_KEYS[cls]
+    idx_keys_lst = _species_index_keys(cls)
+    keys = spc_keys + rxnmap.INDEX_KEYS[cls]
+
+    jobs = []
+    errs = []
+    for row, vals in enumerate(tab.iter_(rxn_tbl, keys)):
+        val_dct = dict(zip(keys, vals))
+        try:
+            xyz_keys = tuple(
+                (val_dct[spc_key],
+                 tuple(int(val_dct[key]) for key in idx_keys))
+                for spc_key, idx_keys in zip(spc_keys, idx_keys_lst))
+            # the geometries are hashed by what they are generated from, so
+            # that current directories don't need them
+            recipe_dct = {
+                '{:s}.xyz'.format(spc_key): '{:s} {!r}'.format(
+                    ich_dct[spc], atm_keys)
+                for spc_key, (spc, atm_keys) in zip(spc_keys, xyz_keys)}
+        except Exception as exc:  # pylint: disable=broad-except
+            errs.append((row, sched.error_string(exc)))
+            continue
+        inp_str = jobdir.render(
+            tpl, dict(zip(spc_keys, map(val_dct.get, spc_keys)),
+                      nodes=nodes_str))
+        recipe_dct[par.RXN.JOB_INPUT_NAME] = inp_str
+        jobs.append({'row': row, 'input': inp_str, 'xyz_keys': xyz_keys,
+                     'digest': jobdir.digest(recipe_dct)})
+    return jobs, errs
+
+
+def _setup_job_files(cls, jobs, ich_dct, logger):
+    """ the files for each job directory, generating each species geometry
+    and .xyz string only once
+
+    :returns: (ok, file dict or exception) for each job
+    """
+    spc_keys = rxnmap.SPECIES_KEYS[cls]
+    geo_dct = {}
+    xyz_dct = {}
+
+    def _xyz_string(spc, atm_keys):
+        if (spc, atm_keys) not in xyz_dct:
+            if spc not in geo_dct:
+                # the index columns are graph indices, which only RDKit
+                # geometries share
+                geo_dct[spc] = mol.inchi.geometry(ich_dct[spc],
+                                                  fallback=False)
+            xyz_dct[(spc, atm_keys)] = mol.geom.xyz_string(
+                geo_dct[spc], first_keys=atm_keys, comment=spc)
+        return xyz_dct[(spc, atm_keys)]
+
+    def _files(job):
+        file_dct = {'{:s}.xyz'.format(spc_key): _xyz_string(spc, atm_keys)
+                    for spc_key, (spc, atm_keys)
+                    in zip(spc_keys, job['xyz_keys'])}
+        file_dct[par.RXN.JOB_INPUT_NAME] = job['input']
+        return file_dct
+
+    rets = []
+    for job in jobs:
+        try:
+            rets.append((True, _files(job)))
+        except Exception as exc:  # pylint: disable=broad-except
+            rets.append((False, exc))
+    logger.info("Generated {:d} species geometries for {:d} .xyz strings"
+                .format(len(geo_dct), len(xyz_dct)))
+    return rets
+
+
+def _record_setup_errors(append, idxs, errs, logger):
+    """ journal the reactions that couldn't be set up
+    """
+    for row, err in errs:
+        logger.info("reaction {:d}: failed to set up: {:s}"
+                    .format(idxs[row], err))
+        append(idxs[row], **{par.RXN.TAB.FILESYSTEM_PATH_KEY: None,
+                             par.RXN.TAB.STATUS_KEY: None,
+                             par.RXN.TAB.ERROR_KEY: err})
+
+
+def _record_current_jobs(append, rxn_tbl, row_paths):
+    """ journal the reactions with current job directories
+
+    they keep their statuses, if they have them
+    """
+    stat_key = par.RXN.TAB.STATUS_KEY
+    idxs = tab.idxs_(rxn_tbl)
+    stats = (list(rxn_tbl[stat_key]) if stat_key in tab.keys_(rxn_tbl) else
+             [None] * len(rxn_tbl))
+    for row, path in row_paths:
+        if not isinstance(stats[row], str):
+            append(idxs[row], **{par.RXN.TAB.FILESYSTEM_PATH_KEY: path,
+                                 stat_key: par.RXN.CREATED,
+                                 par.RXN.TAB.ERROR_KEY: None})
+
+
+def _written_job_recorder(append, idxs, row_paths, logger):
+    """ a `jobdir.write_all` callback that journals the reactions as their
+    job directories are written
+    """
+
+    def _record(pos, ok, exc):
+        row, path = row_paths[pos]
+        if ok:
+            append(idxs[row], **{par.RXN.TAB.FILESYSTEM_PATH_KEY: path,
+                                 par.RXN.TAB.STATUS_KEY: par.RXN.CREATED,
+                                 par.RXN.TAB.ERROR_KEY: None})
+        else:
+            err = sched.error_string(exc)
+            logger.info("reaction {:d}: failed to write {:s}: {:s}"
+                        .format(idxs[row], path, err))
+            append(idxs[row], **{par.RXN.TAB.FILESYSTEM_PATH_KEY: None,
+                                 par.RXN.TAB.STATUS_KEY: None,
+                                 par.RXN.TAB.ERROR_KEY: err})
+
+    return _record
+
+
+def run(cls, rxn_csv, tpl_txt, job_argv, nodes, spc_csv, node_limit, retries,
+        timeout, logger):
+    """ run a job for each created reaction, on a set of nodes
+
+    each job writes its input file from the template, filling in the node
+    (`{nodes}`) and the reaction's species in class order (`{q1h}`, `{q2}`,
+    etc.), and runs the job command in the reaction's directory, with its
+    output going to log files there; jobs that fail or run longer than
+    `timeout` seconds are rerun up to `retries` times
+
+    the jobs are all run from one event loop, so that many of them can run
+    at once; statuses are appended to the table's journal as jobs finish (see
+    `status`) and folded into the table at the end, or at the start of the
+    next run if this one doesn't get to the end
+
+    if a species table is given, the reactions with the largest species (by
+    heavy-atom count) are run first, so that the longest jobs don't hold up
+    the end of the run
+    """
+    assert cls in VALS.RUN.REACTION_CLASS
+    spc_keys = rxnmap.SPECIES_KEYS[cls]
+    path_key = par.RXN.TAB.FILESYSTEM_PATH_KEY
+    stat_key = par.RXN.TAB.STATUS_KEY
+    err_key = par.RXN.TAB.ERROR_KEY
+    node_key = par.RXN.TAB.NODE_KEY
+    jnl_pth = journal.path_(rxn_csv)
+
+    _compact(rxn_csv, logger)
+
+    logger.info("Reading in {:s}".format(rxn_csv))
+    with timer('read', logger):
+        rxn_tbl = tab.read(rxn_csv)
+    assert tab.has_keys(rxn_tbl, spc_keys + (path_key, stat_key))
+
+    logger.info("Reading template file from {:s}".format(tpl_txt))
+    tpl = _template(tpl_txt, spc_keys)
+
+    idxs = tab.idxs_(rxn_tbl)
+    stats = list(rxn_tbl[stat_key])
+    rows = [row for row, stat in enumerate(stats) if stat == par.RXN.CREATED]
+    paths = [rxn_tbl[path_key].iloc[row] for row in rows]
+    spcs_lst = [tuple(rxn_tbl[key].iloc[row] for key in spc_keys)
+                for row in rows]
+
+    prios = None
+    if spc_csv is not None:
+        logger.info("Reading in species sizes from {:s}".format(spc_csv))
+        spc_tbl = tab.read(spc_csv)
+        size_dct = dict(zip(spc_tbl[par.SPC.TAB.NAME_KEY],
+                            map(_heavy_atom_count,
+                                spc_tbl[par.SPC.ID_ICH_KEY])))
+        prios = [max(size_dct.get(spc, 0) for spc in spcs)
+                 for spcs in spcs_lst]
+
+    async def _job(path, spcs, node):
+        inp_str = jobdir.render(tpl, dict(zip(spc_keys, spcs), nodes=node))
+        inp_pth = os.path.join(path, par.RXN.JOB_INPUT_NAME)
+        with open(inp_pth, 'w', encoding='utf-8') as file_obj:
+            file_obj.write(inp_str)
+        await subproc.run(job_argv, cwd=path, out_name=par.RXN.JOB_OUT_NAME,
+                          err_name=par.RXN.JOB_ERR_NAME, timeout=timeout)
+
+    def _finish(job_idx, node, ok, val):
+        row = rows[job_idx]
+        if ok:
+            logger.info("reaction {:d}: ran on node {:s}"
+                        .format(idxs[row], node))
+            append(idxs[row], **{stat_key: par.RXN.RAN, err_key: None,
+                                 node_key: node})
+        else:
+            err = sched.error_string(val)
+            logger.info("reaction {:d}: failed on node {:s}: {:s}"
+                        .format(idxs[row], node, err))
+            append(idxs[row], **{stat_key: par.RXN.FAILED, err_key: err,
+                                 node_key: node})
+
+    logger.info("Running {:d} job(s) on node(s) {:s}, {:d} at a time per "
+                "node".format(len(rows), ', '.join(nodes), node_limit))
+    logger.info("Recording job statuses in {:s}".format(jnl_pth))
+    try:
+        with journal.writer(jnl_pth) as append, timer('run', logger):
+            rets = sched.run_async(
+                _job, zip(paths, spcs_lst), nodes, node_limit=node_limit,
+                priorities=prios, retries=retries, callback=_finish,
+                logger=logger)
+        nfails = sum(not ok for ok, _ in rets)
+        if nfails:
+            logger.warning("{:d} reaction(s) failed".format(nfails))
+    finally:
+        _compact(rxn_csv, logger)
+
+
+def status(rxn_csv, logger):
+    """ report on the job statuses recorded since the table was last
+    updated, from its journal alone
+
+    this is quick however large the table is, so it can be used to watch a
+    run as it goes
+    """
+    stat_key = par.RXN.TAB.STATUS_KEY
+    jnl_pth = journal.path_(rxn_csv)
+
+    val_dct = journal.latest(jnl_pth)
+    if not val_dct:
+        logger.info("No job statuses in {:s}; the table is up to date"
+                    .format(jnl_pth))
+        return
+
+    logger.info("Job statuses in {:s}, last updated {:s}".format(
+        jnl_pth, time.ctime(max(vals[journal.TIME_KEY]
+                                for vals in val_dct.values()))))
+    cnts = collections.Counter(vals[stat_key] for vals in val_dct.values())
+    for stat, cnt in sorted(cnts.items()):
+        logger.info("  {:s}: {:d}".format(stat, cnt))
+
+    for idx, vals in val_dct.items():
+        if vals[stat_key] == par.RXN.FAILED:
+            logger.info("reaction {:d} failed on node {:s}: {:s}"
+                        .format(idx, vals[par.RXN.TAB.NODE_KEY],
+                                vals[par.RXN.TAB.ERROR_KEY]))
+
+
+def _heavy_atom_count(ich):
+    """ the number of non-hydrogen atoms in an InChI string
+    """
+    fml = formula.from_inchi(ich)
+    return sum(cnt for sym, cnt in fml.items()
+               if sym not in ('H', formula.ELECTRON))
+
+
+def _template(tpl_txt, spc_keys):
+    """ read in a job input template and check its fields
+    """
+    tpl = jobdir.template(read_string(tpl_txt))
+    unknown_flds = jobdir.template_fields(tpl) - set(spc_keys + ('nodes',))
+    if unknown_flds:
+        raise ValueError("Unknown template field(s): {:s}"
+                         .format(', '.join(sorted(unknown_flds))))
+    return tpl
+
+
+def _species_index_keys(cls):
+    """ the index columns for each species of a reaction class
+    """
+    return tuple(tuple(idx_key for idx_key in rxnmap.INDEX_KEYS[cls]
+                       if idx_key.startswith(spc_key + '_'))
+                 for spc_key in rxnmap.SPECIES_KEYS[cls])
+
+
+def _compact(rxn_csv, logger):
+    """ fold the statuses in the journal of a reaction table into it
+    """
+    jnl_pth = journal.path_(rxn_csv)
+    if os.path.exists(jnl_pth):
+        logger.info("Updating {:s} from {:s}".format(rxn_csv, jnl_pth))
+        with timer('write', logger):
+            nrows = journal.compact(rxn_csv, jnl_pth)
+        logger.info("Updated {:d} reaction(s)".format(nrows))
@@ -1,11 +1,18 @@
 """ tasks that operate on CSVs with species information
 """
+import os
+import functools
+import contextlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from .. import params as par
 from .. import tab
 from .. import mol
 from .. import fslib
 from .. import fs
+from .. import sched
 from ..iohelp import timestamp_if_exists
+from ..timing import timer
 
 
 class VALS():
@@ -21,69 +28,243 @@ class VALS():
 
 class DEFS():
     """ function argument defaults"""
+    class TOxINCHI():
+        """_"""
+        NPROCS = 1
+        BATCH_SIZE = 20
+
     class FILESYSTEM():
         """_"""
         STEREO_HANDLING = par.SPC.PICK_STEREO
+        NPROCS = 1
+        BATCH_SIZE = 1
+        MAX_STEREOISOMERS = None
 
 
-def to_inchi(spc_id_key, spc_csv, spc_csv_out, logger):
+def to_inchi(spc_id_key, spc_csv, spc_csv_out, chunk_size, resume, nprocs,
+             batch_size, logger):
     """ convert species identifiers to InChI
-    """
-    assert spc_id_key in VALS.TOxINCHI.SPC_ID_KEY
-
-    logger.info("Reading in {:s}".format(spc_csv))
-    tbl = tab.read_csv(spc_csv)
 
-    logger.info("Converting to InChI")
-    tbl = _to_inchi(tbl, spc_id_key)
+    if `chunk_size` is set, the table is streamed through in chunks and the
+    converted rows are appended to the output as they are completed; if
+    `resume` is also set, rows up to the last one written are skipped
 
-    logger.info("Writing to {:s}".format(spc_csv_out))
-    timestamp_if_exists(spc_csv_out)
-    tab.write_csv(spc_csv_out, tbl)
+    the conversions run on `nprocs` worker processes, which are sent
+    `batch_size` species at a time; species that fail to convert are given
+    an error message instead of an InChI string
+    """
+    assert spc_id_key in VALS.TOxINCHI.SPC_ID_KEY
+    assert chunk_size is not None or not resume
+
+    with _process_pool(nprocs) as pool:
+
+        def _convert(tbl):
+            with timer('inchi', logger):
+                tbl = _to_inchi(tbl, spc_id_key, pool=pool,
+                                batch_size=batch_size)
+            nerrs = tbl[par.SPC.TAB.ERROR_KEY].count()
+            if nerrs:
+                logger.warning("{:d} species failed to convert to InChI"
+                               .format(nerrs))
+            return tbl
+
+        logger.info("Converting to InChI on {:d} process(es)".format(nprocs))
+        if chunk_size is not None:
+            logger.info("Converting {:s} in chunks of {:d} rows"
+                        .format(spc_csv, chunk_size))
+            _map_chunks(_convert, spc_csv, spc_csv_out,
+                        chunk_size=chunk_size, resume=resume, logger=logger)
+        else:
+            logger.info("Reading in {:s}".format(spc_csv))
+            with timer('read', logger):
+                tbl = tab.read(spc_csv)
+
+            logger.info("Converting {:d} species".format(len(tbl)))
+            tbl = _convert(tbl)
+
+            logger.info("Writing to {:s}".format(spc_csv_out))
+            with timer('write', logger):
+                timestamp_if_exists(spc_csv_out)
+                tab.write(spc_csv_out, tbl)
 
 
 def filesystem(spc_csv, spc_csv_out, stereo_handling, filesystem_prefix,
+               chunk_size, resume, nprocs, batch_size, max_stereoisomers,
                logger):
     """ chart the species filesystem structure
+
+    if `chunk_size` is set, the table is streamed through in chunks and the
+    charted rows are appended to the output as they are completed; if
+    `resume` is also set, rows up to the last one written are skipped
+
+    stereo expansion runs on `nprocs` worker processes, which are sent
+    `batch_size` species at a time, and is capped at `max_stereoisomers`
+    per species
     """
     assert stereo_handling in VALS.FILESYSTEM.STEREO_HANDLING
+    assert chunk_size is not None or not resume
+
+    with _process_pool(nprocs) as pool:
+
+        def _chart(tbl):
+            with timer('stereo', logger):
+                tbl = _handle_stereo(tbl, mode=stereo_handling, pool=pool,
+                                     batch_size=batch_size,
+                                     max_count=max_stereoisomers,
+                                     logger=logger)
+            with timer('filesystem', logger):
+                tbl = _create_filesystem(tbl, fs_root_pth=filesystem_prefix)
+            return tbl
+
+        logger.info("Handling stereo in mode '{:s}'".format(stereo_handling))
+        logger.info("Creating filesystem at '{:s}'"
+                    .format(filesystem_prefix))
+        if chunk_size is not None:
+            logger.info("Charting {:s} in chunks of {:d} rows"
+                        .format(spc_csv, chunk_size))
+            # expanding stereo renumbers the rows, saving the input index
+            src_key = (
+                tab.next_index_save_key(tab.read_csv_header(spc_csv))
+                if stereo_handling == par.SPC.EXPAND_STEREO else None)
+            _map_chunks(_chart, spc_csv, spc_csv_out, chunk_size=chunk_size,
+                        resume=resume, logger=logger, src_key=src_key)
+        else:
+            logger.info("Reading in {:s}".format(spc_csv))
+            with timer('read', logger):
+                tbl = tab.read(spc_csv)
+
+            tbl = _chart(tbl)
+
+            logger.info("Writing to {:s}".format(spc_csv_out))
+            with timer('write', logger):
+                timestamp_if_exists(spc_csv_out)
+                tab.write(spc_csv_out, tbl)
 
-    logger.info("Reading in {:s}".format(spc_csv))
-    tbl = tab.read_csv(spc_csv)
-
-    logger.info("Handling stereo in mode '{:s}'".format(stereo_handling))
-    tbl = _handle_stereo(tbl, mode=stereo_handling)
+    logger.info(filesystem_prefix)
 
-    logger.info("Creating filesystem at '{:s}'".format(filesystem_prefix))
-    tbl = _create_filesystem(tbl, fs_root_pth=filesystem_prefix)
 
-    logger.info("Writing to {:s}".format(spc_csv_out))
-    timestamp_if_exists(spc_csv_out)
-    tab.write_csv(spc_csv_out, tbl)
+def _map_chunks(func, tbl_csv, tbl_csv_out, chunk_size, resume, logger,
+                src_key=None):
+    """ stream a CSV table through `func` in chunks, appending the results
 
-    logger.info(filesystem_prefix)
+    The next chunk is read and the previous one is written in background
+    threads while the current one is being converted.
 
+    If `src_key` is given, the output rows are renumbered consecutively and
+    this column holds the index of their input row. Otherwise, the output
+    index is the input index.
 
-def _to_inchi(tbl, spc_id_key):
+    Only CSV tables can be streamed.
+    """
+    for pth in (tbl_csv, tbl_csv_out):
+        if tab.file_extension(pth) != tab.CSV_EXT:
+            raise ValueError("Only CSV tables can be read or written in "
+                             "chunks, not '{:s}'".format(pth))
+
+    # absolute paths, since the filesystem tasks change directories
+    tbl_csv = os.path.abspath(tbl_csv)
+    tbl_csv_out = os.path.abspath(tbl_csv_out)
+
+    after = start = None
+    if resume:
+        after = tab.last_csv_value(tbl_csv_out,
+                                   key=(tab.IDX_KEY if src_key is None else
+                                        src_key))
+        start = tab.last_csv_value(tbl_csv_out)
+        logger.info("Resuming {:s} after index {}".format(tbl_csv, after))
+    else:
+        timestamp_if_exists(tbl_csv_out)
+    start = 0 if start is None else start + 1
+
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        wrt = None
+        for tbl in _prefetch(tab.iter_csv(tbl_csv, chunk_size, after=after)):
+            idxs = tab.idxs_(tbl)
+            tbl = func(tbl)
+            if src_key is not None:
+                tbl = tab.renumber(tbl, start=start)
+                start += len(tbl)
+
+            if wrt is not None:
+                with timer('write', logger):
+                    wrt.result()
+            wrt = writer.submit(tab.append_csv, tbl_csv_out, tbl)
+            logger.info("Converted rows {} to {} of {:s}"
+                        .format(idxs[0], idxs[-1], tbl_csv))
+
+        if wrt is not None:
+            with timer('write', logger):
+                wrt.result()
+
+    logger.info("Wrote to {:s}".format(tbl_csv_out))
+
+
+def _prefetch(itr):
+    """ iterate in a background thread, reading one value ahead
+    """
+    end = object()
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        nxt = reader.submit(next, itr, end)
+        while True:
+            val = nxt.result()
+            if val is end:
+                break
+            nxt = reader.submit(next, itr, end)
+            yield val
+
+
+def _to_inchi(tbl, spc_id_key, pool=None, batch_size=1):
     assert spc_id_key in (par.SPC.ID_SMI_KEY, par.SPC.ID_ICH_KEY)
     tbl = tab.enforce_schema(tbl,
                              keys=(spc_id_key,),
                              typs=(par.SPC.TAB.ID_TYP,))
 
-    conv_ = (mol.inchi.recalculate if spc_id_key == par.SPC.ID_ICH_KEY else
-             mol.smiles.inchi)
+    conv_ = functools.partial(_species_inchi, spc_id_key)
 
-    sids = tbl[spc_id_key]
-    ichs = list(map(conv_, sids))
-    tbl = tbl[[key for key in tab.keys_(tbl) if key != spc_id_key]]
+    sids = list(tbl[spc_id_key])
+    rets = (pool.imap(conv_, sids, chunksize=batch_size) if pool is not None
+            else map(conv_, sids))
+    ichs, errs = zip(*rets) if sids else ((), ())
+    tbl = tbl[[key for key in tab.keys_(tbl) if key != spc_id_key]].copy()
     tbl[par.SPC.ID_ICH_KEY] = ichs
+    tbl[par.SPC.TAB.ERROR_KEY] = errs
     return tbl
 
 
-def _handle_stereo(tbl, mode):
+def _species_inchi(spc_id_key, sid):
+    """ InChI string for a species identifier, or an error message
+    """
+    conv_ = (mol.inchi.recalculate if spc_id_key == par.SPC.ID_ICH_KEY else
+             mol.smiles.inchi)
+    try:
+        ich, err = conv_(sid), None
+    except Exception as exc:  # pylint: disable=broad-except
+        ich, err = None, sched.error_string(exc)
+    return ich, err
+
+
+@contextlib.contextmanager
+def _process_pool(nprocs):
+    """ a pool of worker processes, or None for a single process
+    """
+    if nprocs > 1:
+        pool = multiprocessing.Pool(nprocs)
+        try:
+            yield pool
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        yield None
+
+
+def _handle_stereo(tbl, mode, pool=None, batch_size=1, max_count=None,
+                   logger=None):
     assert mode in (par.SPC.EXPAND_STEREO, par.SPC.PICK_STEREO)
-    return (_handle_stereo_by_expanding(tbl) if mode == par.SPC.EXPAND_STEREO
-            else _handle_stereo_by_picking(tbl))
+    return (_handle_stereo_by_expanding(tbl, pool=pool, batch_size=batch_size,
+                                        max_count=max_count, logger=logger)
+            if mode == par.SPC.EXPAND_STEREO else
+            _handle_stereo_by_picking(tbl))
 
 
 def _handle_stereo_by_picking(tbl):
@@ -106,26 +287,37 @@ def _handle_stereo_by_picking(tbl):
     return tbl
 
 
-def _handle_stereo_by_expanding(tbl):
+def _handle_stereo_by_expanding(tbl, pool=None, batch_size=1, max_count=None,
+                                logger=None):
     tbl = tab.enforce_schema(tbl,
                              keys=(par.SPC.ID_ICH_KEY,),
                              typs=(par.SPC.TAB.ID_TYP,))
 
-    ichs = tbl[par.SPC.ID_ICH_KEY]
-    ichsts_lst = list(map(mol.inchi.compatible_stereoisomers, ichs))
+    # expand each distinct species once, identifying them by InChIKey
+    ichs = tuple(tbl[par.SPC.ID_ICH_KEY])
+    icks = tuple(map(mol.inchi.inchi_key, ichs))
+    uniq_ich_dct = dict(zip(icks, ichs))
+
+    # ask for one extra stereoisomer to find out which ones were capped
+    expand_ = functools.partial(
+        mol.inchi.compatible_stereoisomers,
+        max_count=(None if max_count is None else max_count + 1))
+    uniq_ichs = tuple(uniq_ich_dct.values())
+    rets = (pool.imap(expand_, uniq_ichs, chunksize=batch_size)
+            if pool is not None else map(expand_, uniq_ichs))
+    ichsts_dct = dict(zip(uniq_ich_dct.keys(), rets))
+
+    for ick, ichsts in ichsts_dct.items():
+        if max_count is not None and len(ichsts) > max_count:
+            ichsts_dct[ick] = ichsts[:max_count]
+            if logger is not None:
+                logger.warning("Keeping only {:d} stereoisomers of {:s}"
+                               .format(max_count, uniq_ich_dct[ick]))
 
-    idx_save_key = tab.next_index_save_key(tbl)
     tbl = tab.save_index(tbl)
-
-    tbl_idxs = tab.idxs_(tbl)
-    vals = [[idx, ichst]
-            for idx, ichsts in zip(tbl_idxs, ichsts_lst) for ichst in ichsts]
-    ste_tbl = tab.from_records(vals,
-                               keys=(idx_save_key, par.SPC.ID_ICH_KEY),
-                               typs=(tab.IDX_TYP, par.SPC.TAB.ID_TYP))
-
-    keys = [key for key in tab.keys_(tbl) if key != par.SPC.ID_ICH_KEY]
-    tbl = tab.left_join(tbl[keys], ste_tbl, key=idx_save_key)
+    tbl = tab.expand(tbl, key=par.SPC.ID_ICH_KEY,
+                     vals_lst=map(ichsts_dct.__getitem__, icks),
+                     typ=par.SPC.TAB.ID_TYP)
     return tbl
 
 
@@ -142,6 +334,6 @@ def _create_filesystem(tbl, fs_root_pth):
         pth_tbl = tab.from_starmap(tbl, __create_branch, id_keys,
                                    keys=(par.SPC.TAB.FILESYSTEM_PATH_KEY,),
                                    typs=(par.SPC.TAB.FILESYSTEM_PATH_TYP,))
-        tbl = tab.left_join(tbl, pth_tbl)
+        tbl = tab.update(tbl, pth_tbl)
 
     return tbl
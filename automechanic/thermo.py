@@ -0,0 +1,103 @@
+""" NASA polynomial thermochemistry, vectorized over species tables
+
+Values are returned as 2d arrays with one row per species and one column per
+temperature. Each species uses its low-temperature coefficients at or below
+its common temperature and its high-temperature coefficients above it.
+"""
+import numpy
+from . import tab
+from .params import SPC as _SPC
+
+GAS_CONSTANT_CAL = 1.9872036    # cal mol-1 K-1
+
+# weights on a1-a5 of the polynomial part, then on a1*ln(T), a6/T and a7
+_HEAT_CAPACITY_WEIGHTS = ((1., 1., 1., 1., 1.), 0., 0., 0.)
+_ENTHALPY_WEIGHTS = ((1., 1./2., 1./3., 1./4., 1./5.), 0., 1., 0.)
+_ENTROPY_WEIGHTS = ((0., 1., 1./2., 1./3., 1./4.), 1., 0., 1.)
+_GIBBS_WEIGHTS = ((1., -1./2., -1./6., -1./12., -1./20.), -1., 1., -1.)
+
+
+def nasa_coefficients(spc_tbl):
+    """ low and high coefficients and temperatures from a species table
+
+    returned as (nspc, 7), (nspc, 7) and (nspc, 3) arrays; the temperatures
+    are ordered as in `params.SPC.TAB.NASA_T_KEYS`
+    """
+    cfts_lo = tab.arr_(spc_tbl, _SPC.TAB.NASA_C_LO_KEYS, typ=float)
+    cfts_hi = tab.arr_(spc_tbl, _SPC.TAB.NASA_C_HI_KEYS, typ=float)
+    tmps = tab.arr_(spc_tbl, _SPC.TAB.NASA_T_KEYS, typ=float)
+    return cfts_lo, cfts_hi, tmps
+
+
+def heat_capacity_over_r(spc_tbl, temps):
+    """ Cp/R for each species at each temperature
+    """
+    return _evaluate(spc_tbl, temps, _HEAT_CAPACITY_WEIGHTS)
+
+
+def enthalpy_over_rt(spc_tbl, temps):
+    """ H/RT for each species at each temperature
+    """
+    return _evaluate(spc_tbl, temps, _ENTHALPY_WEIGHTS)
+
+
+def entropy_over_r(spc_tbl, temps):
+    """ S/R for each species at each temperature
+    """
+    return _evaluate(spc_tbl, temps, _ENTROPY_WEIGHTS)
+
+
+def gibbs_over_rt(spc_tbl, temps):
+    """ G/RT for each species at each temperature
+    """
+    return _evaluate(spc_tbl, temps, _GIBBS_WEIGHTS)
+
+
+def out_of_range(spc_tbl, temps):
+    """ which temperatures are outside of each species' fitted range
+    """
+    temps = _temperatures(temps)
+    _, _, tmps = nasa_coefficients(spc_tbl)
+    t_lo_idx = _SPC.TAB.NASA_T_KEYS.index('t_lo')
+    t_hi_idx = _SPC.TAB.NASA_T_KEYS.index('t_hi')
+    return ((temps < tmps[:, t_lo_idx:t_lo_idx+1]) |
+            (temps > tmps[:, t_hi_idx:t_hi_idx+1]))
+
+
+def _evaluate(spc_tbl, temps, weights):
+    """ evaluate a weighted NASA polynomial, with masked low/high selection
+
+    the coefficients are selected one at a time, so memory use stays at a few
+    (nspc, ntmp) arrays
+    """
+    poly_wts, log_wt, inv_wt, const_wt = weights
+    temps = _temperatures(temps)
+    cfts_lo, cfts_hi, tmps = nasa_coefficients(spc_tbl)
+    t_c_idx = _SPC.TAB.NASA_T_KEYS.index('t_c')
+    is_lo = temps <= tmps[:, t_c_idx:t_c_idx+1]
+
+    def _coefficient(idx, weight=1.):
+        return numpy.where(is_lo, cfts_lo[:, idx:idx+1] * weight,
+                           cfts_hi[:, idx:idx+1] * weight)
+
+    # Horner's rule over a1-a5
+    vals = _coefficient(4, poly_wts[4])
+    for idx in (3, 2, 1, 0):
+        vals *= temps
+        vals += _coefficient(idx, poly_wts[idx])
+
+    if log_wt:
+        vals += _coefficient(0, log_wt) * numpy.log(temps)
+    if inv_wt:
+        vals += _coefficient(5, inv_wt) / temps
+    if const_wt:
+        vals += _coefficient(6, const_wt)
+    return vals
+
+
+def _temperatures(temps):
+    """ temperatures as a (1, ntmp) row, to broadcast against species
+    """
+    temps = numpy.atleast_1d(numpy.asarray(temps, dtype=float))
+    assert temps.ndim == 1
+    return temps[numpy.newaxis, :]
@@ -0,0 +1,99 @@
+""" stage timers and call counters for instrumenting tasks
+
+Timings and counts accumulate in this process until `reset()` is called,
+which `cli.clihelp.call_task` does at the start of each task. Work done on
+worker processes is timed by its caller, but isn't counted.
+"""
+import time
+import json
+import contextlib
+import collections
+
+RDKIT_CALLS_KEY = 'rdkit_calls'
+
+_TIMES = collections.OrderedDict()
+_COUNTS = collections.Counter()
+_CACHES = collections.OrderedDict()
+_CACHE_STARTS = {}
+
+
+def reset():
+    """ clear the timings and counts, and start counting cache hits anew
+    """
+    _TIMES.clear()
+    _COUNTS.clear()
+    _CACHE_STARTS.clear()
+    _CACHE_STARTS.update(
+        (name, _cache_info(func)) for name, func in _CACHES.items())
+
+
+@contextlib.contextmanager
+def timer(stage, logger=None):
+    """ time a stage of a task, adding to its total if it is repeated
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _TIMES[stage] = _TIMES.get(stage, 0.) + elapsed
+        if logger is not None:
+            logger.debug("Stage '{:s}' took {:.3f} s".format(stage, elapsed))
+
+
+def count(key, num=1):
+    """ increment a counter
+    """
+    _COUNTS[key] += num
+
+
+def register_cache(name, func):
+    """ report hits and misses for a `functools.lru_cache` function
+    """
+    _CACHES[name] = func
+    _CACHE_STARTS[name] = _cache_info(func)
+
+
+def timings():
+    """ total time spent in each stage, in seconds
+    """
+    return dict(_TIMES)
+
+
+def counts():
+    """ current values of the counters
+    """
+    return dict(_COUNTS)
+
+
+def cache_counts():
+    """ hits and misses for each registered cache since the last reset
+    """
+    cnts = {}
+    for name, func in _CACHES.items():
+        hits, misses = _cache_info(func)
+        hits0, misses0 = _CACHE_STARTS.get(name, (0, 0))
+        cnts[name] = {'hits': hits - hits0, 'misses': misses - misses0}
+    return cnts
+
+
+def summary(**extra):
+    """ timings and counts in a JSON-serializable dictionary
+    """
+    summ = dict(extra)
+    summ['stages'] = timings()
+    summ['counts'] = counts()
+    summ['caches'] = cache_counts()
+    return summ
+
+
+def write_summary(file_pth, summ):
+    """ write a summary to a JSON file
+    """
+    with open(file_pth, mode='w', encoding='utf-8') as file_obj:
+        json.dump(summ, file_obj, indent=2, sort_keys=True)
+
+
+def _cache_info(func):
+    info = func.cache_info()
+    return info.hits, info.misses
@@ -0,0 +1,188 @@
+""" benchmarks for CHEMKIN parsing and table construction
+
+run with `python benchmarks/bench_chemkin.py` (`-h` for options), with
+automechanic installed or on the PYTHONPATH
+
+The bundled mechanisms are parsed as they are and scaled up by repeating the
+contents of their species, reactions and thermo blocks. Throughput (records
+per second) and peak memory are reported for each size, and the run fails if
+they are past the limits in `thresholds/chemkin.json`.
+"""
+import os
+import re
+import sys
+import shutil
+import fnmatch
+import logging
+import tempfile
+from harness import argument_parser
+from harness import finish
+from harness import best_time
+from harness import peak_memory
+from harness import scaling_exponent
+from harness import load_thresholds
+from harness import save_thresholds
+from harness import check_thresholds
+from automechanic.iohelp import read_string
+from automechanic.parse import chemkin
+from automechanic.task.chemkin import to_csv
+
+SUITE = 'chemkin'
+EXAMPLES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+MECHANISMS = (
+    ('heptane', ('heptane/mechanism.txt', 'heptane/thermo_data.txt')),
+    ('natgas', ('natgas/mechanism.txt',)),
+    ('aramco', ('old/aramco/mechanism.txt',)),
+)
+COPIES = (1, 10, 100)
+
+# new thresholds allow for this much slow-down and memory growth
+RATE_MARGIN = 3.
+MEMORY_MARGIN = 1.5
+
+_BLOCK_START = re.compile(r'\s*(SPEC|REAC|THER)', re.IGNORECASE)
+_BLOCK_END = re.compile(r'\s*END\b', re.IGNORECASE)
+_THERMO_TEMPS = re.compile(r'\s*[\d.]+\s+[\d.]+\s+[\d.]+\s*$')
+
+
+def mechanism_string(name):
+    """ the text of a bundled mechanism, with its thermo data
+    """
+    pths = dict(MECHANISMS)[name]
+    return '\n'.join(read_string(os.path.join(EXAMPLES_DIR, pth))
+                     for pth in pths)
+
+
+def synthetic_mechanism(mech_str, copies):
+    """ a mechanism with the contents of each block repeated `copies` times
+    """
+    lines = []
+    block_lines = None
+    for line in mech_str.splitlines(True):
+        if block_lines is None:
+            lines.append(line)
+            if _BLOCK_START.match(line):
+                block_lines = []
+        elif _BLOCK_END.match(line):
+            lines.extend(block_lines * copies)
+            lines.append(line)
+            block_lines = None
+        elif _THERMO_TEMPS.match(line):
+            # the thermo block's default temperatures
+            lines.append(line)
+        else:
+            block_lines.append(line)
+    return ''.join(lines)
+
+
+def benchmarks(mech_name, mech_str, tmp_dir):
+    """ (name, function, args, record count) for each benchmark
+    """
+    mech_pth = os.path.join(tmp_dir, 'mechanism.txt')
+    with open(mech_pth, 'w', encoding='utf-8') as file_obj:
+        file_obj.write(mech_str)
+
+    nspcs = len(chemkin.species_names(mech_str))
+    nrxns = len(chemkin.reaction_data_strings(mech_str))
+    return (
+        ('species_names[{:s}]'.format(mech_name), chemkin.species_names,
+         (mech_str,), nspcs),
+        ('thermo_data[{:s}]'.format(mech_name), chemkin.thermo_data,
+         (mech_str,), nspcs),
+        ('reaction_data[{:s}]'.format(mech_name), chemkin.reaction_data,
+         (mech_str,), nrxns),
+        ('to_csv[{:s}]'.format(mech_name), _to_csv,
+         (mech_pth, tmp_dir), nspcs + nrxns),
+    )
+
+
+def run_suite(copies_lst=COPIES, repeat=3, pattern='*', stream=sys.stdout):
+    """ time the benchmarks and measure their peak memory, at each size
+    """
+    res_dct = {}
+    for mech_name, _ in MECHANISMS:
+        mech_str = mechanism_string(mech_name)
+        for copies in copies_lst:
+            tmp_dir = tempfile.mkdtemp()
+            try:
+                bchs = benchmarks(mech_name,
+                                  synthetic_mechanism(mech_str, copies),
+                                  tmp_dir)
+                for name, func, args, nrecs in bchs:
+                    if not fnmatch.fnmatch(name, pattern):
+                        continue
+                    secs = best_time(func, args, repeat=repeat)
+                    peak = peak_memory(func, args)
+                    res = res_dct.setdefault(
+                        name, {'curve': [], 'records': [],
+                               'records_per_s': [], 'peak_mb': []})
+                    res['curve'].append((copies, secs))
+                    res['records'].append(nrecs)
+                    res['records_per_s'].append(nrecs / secs)
+                    res['peak_mb'].append(peak)
+                    stream.write("{:<28s} x{:<4d} {:8d} records {:10.1f}/s "
+                                 "{:9.1f} MB\n"
+                                 .format(name, copies, nrecs, nrecs / secs,
+                                         peak))
+                    stream.flush()
+            finally:
+                shutil.rmtree(tmp_dir)
+
+    for res in res_dct.values():
+        res['exponent'] = scaling_exponent(res['curve'])
+    return res_dct
+
+
+def thresholds(res_dct):
+    """ limits that allow for some slow-down from these results
+    """
+    thr_dct = {}
+    for name, res in res_dct.items():
+        thr_dct[name] = {
+            str(copies): {'min_records_per_s': _round(rate / RATE_MARGIN),
+                          'max_peak_mb': _round(peak * MEMORY_MARGIN)}
+            for (copies, _), rate, peak in zip(
+                res['curve'], res['records_per_s'], res['peak_mb'])}
+    return thr_dct
+
+
+def main(argv=None):
+    """ command-line entry point
+    """
+    par = argument_parser(SUITE)
+    par.add_argument('-x', '--copies', type=int, nargs='+', default=COPIES,
+                     help="sizes of the synthetic mechanisms, as multiples "
+                          "of the bundled ones")
+    par.add_argument('-u', '--update-thresholds', action='store_true',
+                     help="store new limits based on this run")
+    args = par.parse_args(argv)
+
+    res_dct = run_suite(copies_lst=args.copies, repeat=args.repeat,
+                        pattern=args.pattern)
+    finish(SUITE, args, res_dct)
+
+    if args.update_thresholds:
+        thr_dct = load_thresholds(SUITE)
+        thr_dct.update(thresholds(res_dct))
+        save_thresholds(SUITE, thr_dct)
+        return 0
+
+    nfails = check_thresholds(res_dct, load_thresholds(SUITE))
+    return 1 if nfails else 0
+
+
+def _round(val):
+    return float('{:.3g}'.format(val))
+
+
+def _to_csv(mech_pth, tmp_dir):
+    rxn_csv = os.path.join(tmp_dir, 'reactions.csv')
+    spc_csv = os.path.join(tmp_dir, 'species.csv')
+    to_csv([mech_pth], rxn_csv, spc_csv, logger=logging.getLogger(SUITE))
+    os.remove(rxn_csv)
+    os.remove(spc_csv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
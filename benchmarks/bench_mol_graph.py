@@ -0,0 +1,119 @@
+""" benchmarks for the mol.graph hot paths
+
+run with `python benchmarks/bench_mol_graph.py` (`-h` for options), with
+automechanic installed or on the PYTHONPATH; the test molecules are
+straight-chain alkanes, alkenes, radicals and secondary alcohols (for
+atom stereo) of increasing size
+"""
+import random
+from harness import main
+from automechanic.mol import graph
+
+SUITE = 'mol_graph'
+SIZES = (2, 4, 8, 16, 32)
+STEREO_SIZES = (4, 8, 16, 32)
+
+
+def alkane(nc):
+    """ connectivity graph of n-CnH2n+2
+    """
+    atm_sym_dct = {key: 'C' for key in range(nc)}
+    atm_imp_hyd_vlc_dct = {key: 2 for key in range(nc)}
+    atm_imp_hyd_vlc_dct[0] += 1
+    atm_imp_hyd_vlc_dct[nc-1] += 1
+    bnd_keys = tuple(frozenset({key, key+1}) for key in range(nc-1))
+    return graph.from_data(atm_sym_dct, bnd_keys,
+                           atm_imp_hyd_vlc_dct=atm_imp_hyd_vlc_dct)
+
+
+def alkene(nc):
+    """ connectivity graph of CnH2n, with the double bond in the middle
+    """
+    assert nc >= 2
+    key = (nc - 1) // 2
+    xgr = alkane(nc)
+    atm_imp_hyd_vlc_dct = graph.atom_implicit_hydrogen_valences(xgr)
+    atm_imp_hyd_vlc_dct[key] -= 1
+    atm_imp_hyd_vlc_dct[key+1] -= 1
+    return graph.set_atom_implicit_hydrogen_valences(xgr,
+                                                     atm_imp_hyd_vlc_dct)
+
+
+def stereo_alcohol(nc):
+    """ stereo graph of (R)- or (S)-CnH2n+1OH with the OH on the second
+    carbon, with explicit stereo sites
+    """
+    assert nc >= 4
+    xgr = alkane(nc)
+    atm_sym_dct = graph.atom_symbols(xgr)
+    atm_sym_dct[nc] = 'O'
+    atm_imp_hyd_vlc_dct = graph.atom_implicit_hydrogen_valences(xgr)
+    atm_imp_hyd_vlc_dct[1] -= 1
+    atm_imp_hyd_vlc_dct[nc] = 1
+    bnd_keys = tuple(graph.bond_keys(xgr)) + (frozenset({1, nc}),)
+    xgr = graph.from_data(atm_sym_dct, bnd_keys,
+                          atm_imp_hyd_vlc_dct=atm_imp_hyd_vlc_dct)
+    sgr = graph.set_atom_stereo_parities(xgr, {1: True})
+    return graph.explicit_stereo_sites(sgr)
+
+
+def radical(nc):
+    """ connectivity graph of the primary CnH2n+1 radical
+    """
+    xgr = alkane(nc)
+    atm_imp_hyd_vlc_dct = graph.atom_implicit_hydrogen_valences(xgr)
+    atm_imp_hyd_vlc_dct[0] -= 1
+    return graph.set_atom_implicit_hydrogen_valences(xgr,
+                                                     atm_imp_hyd_vlc_dct)
+
+
+def shuffled(xgr, seed=0):
+    """ the same graph with its atom keys shuffled
+    """
+    atm_keys = graph.atom_keys(xgr)
+    new_atm_keys = list(atm_keys)
+    random.Random(seed).shuffle(new_atm_keys)
+    return graph.relabel(xgr, dict(zip(atm_keys, new_atm_keys)))
+
+
+def _construct(nc):
+    atm_sym_dct = {key: 'C' for key in range(nc)}
+    bnd_keys = tuple(frozenset({key, key+1}) for key in range(nc-1))
+    return graph.from_data(atm_sym_dct, bnd_keys)
+
+
+def benchmarks():
+    """ (name, function, [(size, args), ...]) for each benchmark
+    """
+    mols = (('alkane', alkane), ('alkene', alkene), ('radical', radical))
+
+    def _args(*makers, sizes=SIZES):
+        return tuple((nc, tuple(maker(nc) for maker in makers))
+                     for nc in sizes)
+
+    bchs = [('from_data', _construct, tuple((nc, (nc,)) for nc in SIZES))]
+    for mol_name, mol_ in mols:
+        bchs += [
+            ('explicit[{:s}]'.format(mol_name), graph.explicit,
+             _args(mol_)),
+            ('implicit[{:s}]'.format(mol_name), graph.implicit,
+             _args(lambda nc, m=mol_: graph.explicit(m(nc)))),
+            ('atom_neighborhoods[{:s}]'.format(mol_name),
+             graph.atom_neighborhoods, _args(mol_)),
+            ('subresonances[{:s}]'.format(mol_name), graph.subresonances,
+             _args(mol_)),
+            ('backbone_isomorphism[{:s}]'.format(mol_name),
+             graph.backbone_isomorphism,
+             _args(mol_, lambda nc, m=mol_: shuffled(m(nc)))),
+            ('with_atom_inchi_numbers[{:s}]'.format(mol_name),
+             graph.to_inchi.with_atom_inchi_numbers,
+             _args(mol_)),
+        ]
+    bchs.append(
+        ('atom_stereo_coordinates[alcohol]', graph.atom_stereo_coordinates,
+         _args(stereo_alcohol, sizes=STEREO_SIZES)))
+    return bchs
+
+
+if __name__ == '__main__':
+    main(SUITE, benchmarks())
@@ -0,0 +1,126 @@
+""" benchmarks for building and iterating over tables
+
+run with `python benchmarks/bench_tab.py` (`-h` for options), with
+automechanic installed or on the PYTHONPATH
+
+The records are species-like (a name, two sets of seven NASA coefficients
+and three temperatures). `tab.from_records` and `tab.iter_` are measured
+against the row-wise path they replaced, which packed the records into one
+2-D array and transposed it, and iterated with `itertuples`. Time and peak
+memory are reported for both at each size, along with the speed-up.
+"""
+import sys
+import random
+import fnmatch
+from collections import OrderedDict
+import numpy
+from pandas import Series
+from pandas import DataFrame
+from pandas import RangeIndex
+from harness import argument_parser
+from harness import finish
+from harness import best_time
+from harness import peak_memory
+from harness import scaling_exponent
+from automechanic import tab
+
+SUITE = 'tab'
+SIZES = (1000, 3000, 10000, 30000)
+KEYS = (('name',) + tuple('c_lo{:d}'.format(num) for num in range(7)) +
+        tuple('c_hi{:d}'.format(num) for num in range(7)) +
+        ('t_lo', 't_hi', 't_com'))
+TYPS = (str,) + (float,) * 17
+
+
+def species_records(nrecs, seed=0):
+    """ species-like records, as a table would be built from
+    """
+    rng = random.Random(seed)
+    return [('S{:d}'.format(num),) + tuple(rng.uniform(-1e5, 1e5)
+                                           for _ in range(14)) +
+            (300., 5000., 1000.) for num in range(nrecs)]
+
+
+def rowwise_from_records(vals, keys, typs):
+    """ the row-wise path `tab.from_records` replaced
+    """
+    vals = numpy.array(vals)
+    nrows, _ = numpy.shape(vals)
+    idxs = RangeIndex(stop=nrows, name=tab.IDX_KEY)
+    cols = numpy.transpose(vals)
+    data = OrderedDict((key, Series(data=col, dtype=tab.dt_(typ), index=idxs))
+                       for col, key, typ in zip(cols, keys, typs))
+    return DataFrame(data=data, index=idxs)
+
+
+def rowwise_iter(tbl):
+    """ the row-wise path `tab.iter_` replaced
+    """
+    for _ in tbl.itertuples(index=False, name=None):
+        pass
+
+
+def _iter(tbl):
+    for _ in tab.iter_(tbl, KEYS):
+        pass
+
+
+def benchmarks(nrecs):
+    """ (name, new function, old function, args) for each benchmark
+    """
+    recs = species_records(nrecs)
+    tbl = tab.from_records(recs, KEYS, TYPS)
+    return (
+        ('from_records', tab.from_records, rowwise_from_records,
+         (recs, KEYS, TYPS)),
+        ('iter_', _iter, rowwise_iter, (tbl,)),
+    )
+
+
+def run_suite(sizes=SIZES, repeat=3, pattern='*', stream=sys.stdout):
+    """ time both paths and measure their peak memory, at each size
+    """
+    res_dct = {}
+    for nrecs in sizes:
+        for name, func, old_func, args in benchmarks(nrecs):
+            if not fnmatch.fnmatch(name, pattern):
+                continue
+            for label, func_ in (('', func), ('[rowwise]', old_func)):
+                secs = best_time(func_, args, repeat=repeat)
+                peak = peak_memory(func_, args)
+                res = res_dct.setdefault(name + label,
+                                         {'curve': [], 'peak_mb': []})
+                res['curve'].append((nrecs, secs))
+                res['peak_mb'].append(peak)
+            new_res, old_res = res_dct[name], res_dct[name + '[rowwise]']
+            stream.write("{:<14s} {:8d} records {:10.3e} s {:8.1f} MB | "
+                         "rowwise {:10.3e} s {:8.1f} MB | {:6.1f}x faster\n"
+                         .format(name, nrecs, new_res['curve'][-1][1],
+                                 new_res['peak_mb'][-1],
+                                 old_res['curve'][-1][1],
+                                 old_res['peak_mb'][-1],
+                                 old_res['curve'][-1][1] /
+                                 new_res['curve'][-1][1]))
+            stream.flush()
+
+    for res in res_dct.values():
+        res['exponent'] = scaling_exponent(res['curve'])
+    return res_dct
+
+
+def main(argv=None):
+    """ command-line entry point
+    """
+    par = argument_parser(SUITE)
+    par.add_argument('-n', '--sizes', type=int, nargs='+', default=SIZES,
+                     help="numbers of records")
+    args = par.parse_args(argv)
+
+    res_dct = run_suite(sizes=args.sizes, repeat=args.repeat,
+                        pattern=args.pattern)
+    finish(SUITE, args, res_dct)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+""" a small benchmark harness
+
+Each benchmark is timed on inputs of increasing size, giving a scaling curve
+(best time per call against size) and the exponent of a power law fitted to
+it. Runs are appended to `results/<suite>.jsonl`, tagged with the git commit,
+so that runs on different commits can be compared. Suites may also check
+their results against the limits stored in `thresholds/<suite>.json`.
+"""
+import os
+import sys
+import json
+import time
+import timeit
+import fnmatch
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import numpy
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+THRESHOLDS_DIR = os.path.join(BENCH_DIR, 'thresholds')
+SLOWDOWN_FLAG = 1.2
+
+
+def best_time(func, args=(), repeat=3):
+    """ best time per call, in seconds, out of `repeat` timing loops
+    """
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def peak_memory(func, args=()):
+    """ peak memory allocated by python during a call, in MB
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def scaling_curve(func, args_by_size, repeat=3):
+    """ best times per call for a sequence of (size, args) pairs
+    """
+    return tuple((size, best_time(func, args, repeat=repeat))
+                 for size, args in args_by_size)
+
+
+def scaling_exponent(curve):
+    """ exponent of the power law fitted to a scaling curve
+    """
+    if len(curve) < 2:
+        return None
+    sizes, times = zip(*curve)
+    slope, _ = numpy.polyfit(numpy.log(sizes), numpy.log(times), 1)
+    return float(slope)
+
+
+def run_suite(benchmarks, repeat=3, pattern='*', stream=sys.stdout):
+    """ run (name, func, args_by_size) benchmarks, reporting as they finish
+    """
+    res_dct = {}
+    for name, func, args_by_size in benchmarks:
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        curve = scaling_curve(func, args_by_size, repeat=repeat)
+        expt = scaling_exponent(curve)
+        res_dct[name] = {'curve': curve, 'exponent': expt}
+        stream.write(_curve_report(name, curve, expt))
+        stream.flush()
+    return res_dct
+
+
+def metadata():
+    """ the commit, time and machine of this run
+    """
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.node()}
+
+
+def save(suite, res_dct):
+    """ append a run to the suite's results file
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    run = dict(metadata(), results=res_dct)
+    with open(_results_path(suite), mode='a', encoding='utf-8') as file_obj:
+        file_obj.write(json.dumps(run) + '\n')
+    return run
+
+
+def load(suite):
+    """ the stored runs of a suite, oldest first
+    """
+    pth = _results_path(suite)
+    if not os.path.exists(pth):
+        return ()
+    with open(pth, encoding='utf-8') as file_obj:
+        return tuple(map(json.loads, filter(None, map(str.strip, file_obj))))
+
+
+def compare(old_res_dct, new_res_dct, stream=sys.stdout):
+    """ report the ratio of new to old times at each size
+    """
+    for name in sorted(set(old_res_dct) & set(new_res_dct)):
+        old, new = old_res_dct[name], new_res_dct[name]
+        old_time_dct = dict(map(tuple, old['curve']))
+        stream.write("{:s}: exponent {} -> {}\n".format(
+            name, _fmt_expt(old['exponent']), _fmt_expt(new['exponent'])))
+        for size, new_time in new['curve']:
+            if size in old_time_dct:
+                ratio = new_time / old_time_dct[size]
+                flag = '  SLOWER' if ratio > SLOWDOWN_FLAG else ''
+                stream.write("  {:>8} {:8.2f}x{:s}\n".format(size, ratio,
+                                                             flag))
+
+
+def load_thresholds(suite):
+    """ the stored limits for a suite, by benchmark name and size
+    """
+    pth = _thresholds_path(suite)
+    if not os.path.exists(pth):
+        return {}
+    with open(pth, encoding='utf-8') as file_obj:
+        return json.load(file_obj)
+
+
+def save_thresholds(suite, thr_dct):
+    """ store the limits for a suite
+    """
+    os.makedirs(THRESHOLDS_DIR, exist_ok=True)
+    with open(_thresholds_path(suite), mode='w', encoding='utf-8') as file_obj:
+        json.dump(thr_dct, file_obj, indent=2, sort_keys=True)
+        file_obj.write('\n')
+
+
+def check_thresholds(res_dct, thr_dct, stream=sys.stdout):
+    """ report values past their limits; returns the number of failures
+
+    a limit `min_<key>` or `max_<key>` applies to the result values `<key>`,
+    which are listed in the same order as the sizes of the curve
+    """
+    nfails = 0
+    for name, size_thr_dct in sorted(thr_dct.items()):
+        if name not in res_dct:
+            continue
+        res = res_dct[name]
+        sizes = [size for size, _ in res['curve']]
+        for size, lim_dct in sorted(size_thr_dct.items()):
+            if int(size) not in sizes:
+                continue
+            pos = sizes.index(int(size))
+            for lim_key, lim in sorted(lim_dct.items()):
+                bound, key = lim_key.split('_', 1)
+                val = res[key][pos]
+                if (val < lim) if bound == 'min' else (val > lim):
+                    nfails += 1
+                    stream.write("FAILED {:s} at size {}: {:s} = {:.4g}, "
+                                 "limit {:.4g}\n"
+                                 .format(name, size, key, val, lim))
+    return nfails
+
+
+def argument_parser(suite):
+    """ command-line parser with the options common to all suites
+    """
+    par = argparse.ArgumentParser(description="run the {:s} benchmarks"
+                                  .format(suite))
+    par.add_argument('-k', '--pattern', default='*',
+                     help="only run benchmarks matching this glob")
+    par.add_argument('-r', '--repeat', type=int, default=3,
+                     help="number of timing loops per size")
+    par.add_argument('-s', '--save', action='store_true',
+                     help="append the results to {:s}"
+                     .format(_results_path(suite)))
+    par.add_argument('-c', '--compare', nargs='?', const='', default=None,
+                     metavar='COMMIT',
+                     help="compare with the last stored run, or the last "
+                          "one on COMMIT")
+    return par
+
+
+def finish(suite, args, res_dct):
+    """ compare and save the results, as requested on the command line
+    """
+    if args.compare is not None:
+        runs = [run for run in load(suite)
+                if not args.compare or run['commit'] == args.compare]
+        if runs:
+            sys.stdout.write("\ncompared with {:s} ({:s}):\n"
+                             .format(str(runs[-1]['commit']),
+                                     runs[-1]['time']))
+            compare(runs[-1]['results'], res_dct)
+        else:
+            sys.stdout.write("\nno stored runs to compare with\n")
+
+    if args.save:
+        save(suite, res_dct)
+
+
+def main(suite, benchmarks, argv=None):
+    """ command-line entry point for a benchmark suite
+    """
+    args = argument_parser(suite).parse_args(argv)
+    res_dct = run_suite(benchmarks, repeat=args.repeat, pattern=args.pattern)
+    finish(suite, args, res_dct)
+    return res_dct
+
+
+def _results_path(suite):
+    return os.path.join(RESULTS_DIR, '{:s}.jsonl'.format(suite))
+
+
+def _thresholds_path(suite):
+    return os.path.join(THRESHOLDS_DIR, '{:s}.json'.format(suite))
+
+
+def _curve_report(name, curve, expt):
+    lines = ["{:s} (time ~ size^{:s})".format(name, _fmt_expt(expt))]
+    lines.extend("  {:>8} {:12.3e} s".format(size, secs)
+                 for size, secs in curve)
+    return '\n'.join(lines) + '\n'
+
+
+def _fmt_expt(expt):
+    return '?' if expt is None else '{:.2f}'.format(expt)
@@ -1,6 +1,9 @@
 """ Test the automech CLI
 """
 import os
+import sys
+import json
+import time
 import tempfile
 import subprocess
 from automechanic import fs
@@ -9,6 +12,14 @@ AUTOMECH_CMD = 'automech'
 PATH = os.path.dirname(os.path.realpath(__file__))
 HEPTANE_PATH = os.path.join(PATH, '../examples/heptane')
 
+STARTUP_BUDGET = 3.  # seconds
+SUBCOMMANDS = (('batch',),
+               ('chemkin', 'to_csv'), ('chemkin', 'subset'),
+               ('species', 'to_inchi'), ('species', 'filesystem'),
+               ('reactions', 'map_indices'), ('reactions', 'setup'),
+               ('reactions', 'run'), ('reactions', 'status'))
+TOOLKIT_MODULES = ('rdkit', 'pybel', 'openbabel', 'networkx')
+
 
 def test__help():
     """ test `automech -h`
@@ -16,6 +27,35 @@ def test__help():
     subprocess.check_call([AUTOMECH_CMD, '-h'])
 
 
+def test__startup():
+    """ test the start-up time of each subcommand
+
+    the chemistry toolkits should only be imported by tasks that use them
+    """
+    for subcmds in SUBCOMMANDS:
+        start = time.time()
+        subprocess.check_call([AUTOMECH_CMD] + list(subcmds) + ['-h'])
+        duration = time.time() - start
+        print('{:s}: {:.2f} s'.format(' '.join(subcmds), duration))
+        assert duration < STARTUP_BUDGET
+
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        mech_txt = os.path.join(HEPTANE_PATH, 'mechanism.txt')
+        ther_txt = os.path.join(HEPTANE_PATH, 'thermo_data.txt')
+        script = (
+            'import sys\n'
+            'import automechanic.cli\n'
+            'automechanic.cli.main(["automech", "chemkin", "to_csv", '
+            '"{:s}", "{:s}"])\n'
+            'print(" ".join(sys.modules))\n'.format(mech_txt, ther_txt))
+        mods = subprocess.check_output([sys.executable, '-c', script])
+        mods = mods.decode().split()
+        assert not any(mod.split('.')[0] in TOOLKIT_MODULES for mod in mods)
+
+
 def test__chemkin__help():
     """ test `automech chemkin -h`
     """
@@ -37,6 +77,271 @@ def test__chemkin__to_csv():
                                mech_txt, ther_txt, '-p'])
 
 
+def test__chemkin__to_csv__thermo_library():
+    """ test `automech chemkin to_csv` with a thermo library
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        with open('mechanism.txt', 'w') as file_obj:
+            file_obj.write("SPECIES\nO2 H H2\nEND\n"
+                           "REACTIONS\nH+O2=O+OH  1.0E14  0.0  0.0\nEND\n")
+
+        # a library with every heptane species listed twice
+        ther_txt = os.path.join(HEPTANE_PATH, 'thermo_data.txt')
+        with open(ther_txt, 'rb') as file_obj:
+            ther_bytes = file_obj.read()
+        with open('library.txt', 'wb') as file_obj:
+            file_obj.write(ther_bytes + b'\n' + ther_bytes)
+
+        for _ in range(2):
+            subprocess.check_call([AUTOMECH_CMD, 'chemkin', 'to_csv',
+                                   'mechanism.txt', 'library.txt'])
+            assert os.path.isfile('library.txt.thermo.idx')
+            assert not os.path.exists('library.txt.thermo.tmp.idx')
+            with open('species.csv') as file_obj:
+                rows = file_obj.read().splitlines()
+            assert [row.split(',')[1] for row in rows[1:]] == [
+                'O2', 'H', 'H2']
+
+
+def test__chemkin__to_csv__thermo_headlines():
+    """ test `automech chemkin to_csv` with padded and commented thermo
+    headlines
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        with open('mechanism.txt', 'w') as file_obj:
+            file_obj.write("SPECIES\nO2 H H2\nEND\n"
+                           "REACTIONS\nH+O2=O+OH  1.0E14  0.0  0.0\nEND\n")
+
+        ther_txt = os.path.join(HEPTANE_PATH, 'thermo_data.txt')
+        with open(ther_txt, 'rb') as file_obj:
+            lines = file_obj.read().split(b'\n')
+        # alternately pad the headlines and comment them
+        headline_poss = [pos for pos, line in enumerate(lines)
+                         if line.rstrip().endswith(b'1')
+                         and line[:1].isalpha()]
+        for num, pos in enumerate(headline_poss):
+            line = lines[pos].rstrip(b'\r')
+            lines[pos] = line + (b'   \r' if num % 2 else b'  ! note 2\r')
+        with open('thermo.txt', 'wb') as file_obj:
+            file_obj.write(b'\n'.join(lines))
+
+        subprocess.check_call([AUTOMECH_CMD, 'chemkin', 'to_csv',
+                               'mechanism.txt', 'thermo.txt'])
+        with open('species.csv') as file_obj:
+            rows = file_obj.read().splitlines()
+        assert [row.split(',')[1] for row in rows[1:]] == ['O2', 'H', 'H2']
+
+
+def test__chemkin__to_csv__missing_block():
+    """ test `automech chemkin to_csv` without a REACTIONS block
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        with open('mechanism.txt', 'w') as file_obj:
+            file_obj.write("SPECIES\nO2 H H2\nEND\n")
+        ther_txt = os.path.join(HEPTANE_PATH, 'thermo_data.txt')
+        proc = subprocess.run([AUTOMECH_CMD, 'chemkin', 'to_csv',
+                               'mechanism.txt', ther_txt],
+                              stderr=subprocess.PIPE, check=False)
+        assert proc.returncode != 0
+        assert b'ValueError: No REACTIONS block' in proc.stderr
+
+
+def test__chemkin__subset():
+    """ test `automech chemkin subset`
+    """
+    subprocess.check_call([AUTOMECH_CMD, 'chemkin', 'subset', '-h'])
+
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        mech_txt = os.path.join(HEPTANE_PATH, 'mechanism.txt')
+        ther_txt = os.path.join(HEPTANE_PATH, 'thermo_data.txt')
+        subprocess.check_call([AUTOMECH_CMD, 'chemkin', 'to_csv',
+                               mech_txt, ther_txt])
+        subprocess.check_call([AUTOMECH_CMD, 'chemkin', 'subset',
+                               'reactions.csv', 'NC7H16', '-d', '1',
+                               '-R', 'subset.csv', '-p'])
+        with open('subset.csv') as file_obj:
+            rows = file_obj.read().splitlines()
+        assert len(rows) > 1
+        assert all('NC7H16' in row.split(',')[1] for row in rows[1:])
+
+
+def test__reactions__map_indices():
+    """ test `automech reactions map_indices`, through to `setup`
+    """
+    subprocess.check_call([AUTOMECH_CMD, 'reactions', 'map_indices', '-h'])
+
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        with open('species.csv', 'w') as file_obj:
+            file_obj.write('name,inchi\n'
+                           'H2,InChI=1S/H2/h1H\n'
+                           'O,InChI=1S/O\n'
+                           'H,InChI=1S/H\n'
+                           'OH,InChI=1S/HO/h1H\n'
+                           'O2,InChI=1S/O2/c1-2\n'
+                           'HO2,InChI=1S/HO2/c1-2/h1H\n')
+        with open('reactions.csv', 'w') as file_obj:
+            file_obj.write('i_,name\n'
+                           '0,H2+O<=>H+OH\n'
+                           '1,H+O2(+M)<=>HO2(+M)\n'
+                           '2,HO2+H<=>H2+O2\n')
+        with open('template.txt', 'w') as file_obj:
+            file_obj.write('{q1h} + {q2}\n')
+
+        subprocess.check_call([AUTOMECH_CMD, 'reactions', 'map_indices',
+                               'abstraction', 'reactions.csv',
+                               'species.csv'])
+        with open('reactions_mapped.csv') as file_obj:
+            rows = file_obj.read().splitlines()
+        assert rows == ['i_,name,q1h,q2,q1,q2h,'
+                        'q1h_idx,q2_idx,q1_idx,q2h_idx',
+                        '0,H2+O<=>H+OH,H2,O,H,OH,1,0,0,1',
+                        '2,HO2+H<=>H2+O2,HO2,H,O2,H2,2,0,0,1']
+        assert os.path.isfile('reactions_unmapped.csv')
+
+        subprocess.check_call([AUTOMECH_CMD, 'reactions', 'setup',
+                               'abstraction', 'reactions_mapped.csv',
+                               'species.csv', 'template.txt'])
+        assert sorted(os.listdir('runs')) == ['0', '2']
+        assert open('runs/2/input.dat').read() == 'HO2 + H\n'
+        assert os.path.isfile('runs/2/q2h.xyz')
+
+
+def test__reactions__setup():
+    """ test `automech reactions setup`
+    """
+    subprocess.check_call([AUTOMECH_CMD, 'reactions', 'setup', '-h'])
+
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        with open('species.csv', 'w') as file_obj:
+            file_obj.write('name,inchi\n'
+                           'H2,InChI=1S/H2/h1H\n'
+                           'O,InChI=1S/O\n'
+                           'H,InChI=1S/H\n'
+                           'OH,InChI=1S/HO/h1H\n')
+        with open('reactions.csv', 'w') as file_obj:
+            file_obj.write('i_,name,q1h,q2,q1,q2h,'
+                           'q1h_idx,q2_idx,q1_idx,q2h_idx\n'
+                           '0,H2+O<=>H+OH,H2,O,H,OH,1,0,0,1\n'
+                           '1,H2+X<=>H+XH,H2,X,H,XH,1,0,0,1\n')
+        with open('template.txt', 'w') as file_obj:
+            file_obj.write('{q1h} + {q2} on {nodes}\n')
+
+        argv = [AUTOMECH_CMD, 'reactions', 'setup', 'abstraction',
+                'reactions.csv', 'species.csv', 'template.txt',
+                '-n', 'node1', 'node2', '-j', '2']
+        subprocess.check_call(argv + ['-L', 'setup1.log'])
+        assert (sorted(os.listdir('runs/0')) ==
+                ['.digest', 'input.dat', 'q1.xyz', 'q1h.xyz', 'q2.xyz',
+                 'q2h.xyz'])
+        assert open('runs/0/input.dat').read() == 'H2 + O on node1, node2\n'
+        # the abstracted hydrogen comes first
+        assert open('runs/0/q1h.xyz').read().splitlines()[2].startswith('H')
+        assert not os.path.exists('runs/1')
+
+        with open('reactions.csv') as file_obj:
+            rows = file_obj.read().splitlines()
+        assert rows[0].endswith('path,status,error')
+        assert rows[1].endswith('runs/0,created,')
+        assert "KeyError: 'X'" in rows[2]
+
+        # nothing has changed, so nothing is written
+        subprocess.check_call(argv + ['-L', 'setup2.log'])
+        assert 'Wrote 0 job directories' in open('setup2.log').read()
+
+        # a changed template means new input files
+        with open('template.txt', 'w') as file_obj:
+            file_obj.write('{q1h} + {q2}\n')
+        subprocess.check_call(argv + ['-L', 'setup3.log'])
+        assert 'Wrote 1 job directories' in open('setup3.log').read()
+        assert open('runs/0/input.dat').read() == 'H2 + O\n'
+
+
+def test__reactions__run():
+    """ test `automech reactions run`
+    """
+    subprocess.check_call([AUTOMECH_CMD, 'reactions', 'run', '-h'])
+
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        for name in ('r0', 'r1', 'r2'):
+            os.mkdir(name)
+        with open('reactions.csv', 'w') as file_obj:
+            file_obj.write('i_,name,q1h,q2,q1,q2h,path,status\n'
+                           '0,H2+O<=>H+OH,H2,O,H,OH,r0,created\n'
+                           '1,CH4+OH<=>CH3+H2O,CH4,OH,CH3,H2O,r1,created\n'
+                           '2,H2+OH<=>H+H2O,H2,OH,H,H2O,r2,ran\n'
+                           '3,CH4+O<=>CH3+OH,CH4,O,CH3,OH,r3,created\n')
+        with open('template.txt', 'w') as file_obj:
+            file_obj.write('{q1h} + {q2} on {nodes}\n')
+
+        # the job copies its input to output.dat
+        job_argv = [sys.executable, '-c',
+                    'import shutil; shutil.copy("input.dat", "output.dat")']
+        subprocess.check_call([AUTOMECH_CMD, 'reactions', 'run',
+                               'abstraction', 'reactions.csv',
+                               'template.txt', '-n', 'node1', 'node2',
+                               '-l', '2', '-y', '1', '-p', '--'] + job_argv)
+        assert open('r0/output.dat').read() in ('H2 + O on node1\n',
+                                                'H2 + O on node2\n')
+        assert open('r1/output.dat').read().startswith('CH4 + OH on ')
+        assert not os.path.exists('r2/output.dat')
+        assert os.path.exists('r0/job.out') and os.path.exists('r0/job.err')
+
+        with open('reactions.csv') as file_obj:
+            rows = file_obj.read().splitlines()
+        assert rows[0].split(',')[7:] == ['status', 'error', 'node']
+        assert [row.split(',')[7] for row in rows[1:]] == [
+            'ran', 'ran', 'ran', 'failed']
+        assert rows[1].split(',')[-1] in ('node1', 'node2')
+        assert not os.path.exists('reactions.csv.journal')
+
+        # the status command reads the journal a run leaves behind
+        with open('reactions.csv.journal', 'w') as file_obj:
+            file_obj.write(json.dumps({'i_': 3, 'time': time.time(),
+                                       'status': 'failed', 'error': 'oops',
+                                       'node': 'node1'}) + '\n')
+        subprocess.check_call([AUTOMECH_CMD, 'reactions', 'status',
+                               'reactions.csv', '-L', 'status.log'])
+        status_str = open('status.log').read()
+        assert 'failed: 1' in status_str and 'oops' in status_str
+        os.remove('reactions.csv.journal')
+
+        # jobs that run too long are killed
+        with open('reactions.csv', 'w') as file_obj:
+            file_obj.write('i_,name,q1h,q2,q1,q2h,path,status\n'
+                           '0,H2+O<=>H+OH,H2,O,H,OH,r0,created\n')
+        job_argv = [sys.executable, '-c', 'import time; time.sleep(10)']
+        start = time.time()
+        subprocess.check_call([AUTOMECH_CMD, 'reactions', 'run',
+                               'abstraction', 'reactions.csv',
+                               'template.txt', '-t', '0.5', '--'] + job_argv)
+        assert time.time() - start < 5.
+        with open('reactions.csv') as file_obj:
+            rows = file_obj.read().splitlines()
+        assert rows[1].split(',')[7] == 'failed'
+        assert 'TimeoutExpired' in rows[1]
+
+
 def test__species__help():
     """ test `automech species -h`
     """
@@ -55,6 +360,120 @@ def test__species__to_inchi():
         spc_csv = os.path.join(HEPTANE_PATH, 'smiles.csv')
         subprocess.check_call([AUTOMECH_CMD, 'species', 'to_inchi',
                                'smiles', spc_csv, '-S', 'inchi.csv', '-p'])
+        subprocess.check_call([AUTOMECH_CMD, 'species', 'to_inchi',
+                               'smiles', spc_csv, '-S', 'inchi_chunked.csv',
+                               '-c', '50', '-p'])
+        subprocess.check_call([AUTOMECH_CMD, 'species', 'to_inchi',
+                               'smiles', spc_csv, '-S', 'inchi_chunked.csv',
+                               '-c', '50', '-r', '-p'])
+        assert (open('inchi.csv').read() ==
+                open('inchi_chunked.csv').read())
+
+        # resuming from a different input, which doesn't have the last row
+        # written, fails rather than skipping every row
+        with open(spc_csv) as file_obj:
+            lines = file_obj.readlines()
+        with open('smiles_head.csv', 'w') as file_obj:
+            file_obj.writelines(lines[:11])
+        proc = subprocess.run([AUTOMECH_CMD, 'species', 'to_inchi',
+                               'smiles', 'smiles_head.csv', '-S',
+                               'inchi_chunked.csv', '-c', '50', '-r'],
+                              stderr=subprocess.PIPE, check=False)
+        assert proc.returncode != 0
+        assert b'ValueError: No row with index' in proc.stderr
+
+        # only CSV tables can be streamed in chunks
+        proc = subprocess.run([AUTOMECH_CMD, 'species', 'to_inchi',
+                               'smiles', spc_csv, '-S', 'inchi.parquet',
+                               '-c', '50'],
+                              stderr=subprocess.PIPE, check=False)
+        assert proc.returncode != 0
+        assert b"chunks, not '" in proc.stderr
+        assert not os.path.exists('inchi.parquet')
+
+
+def test__species__to_inchi__parallel():
+    """ benchmark `automech species to_inchi` on one vs. several processes
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        spc_csv = os.path.join(HEPTANE_PATH, 'smiles.csv')
+        nspcs = sum(1 for _ in open(spc_csv)) - 1
+        for nprocs in (1, 4):
+            start = time.time()
+            subprocess.check_call([AUTOMECH_CMD, 'species', 'to_inchi',
+                                   'smiles', spc_csv,
+                                   '-S', 'inchi_{:d}.csv'.format(nprocs),
+                                   '-n', str(nprocs), '-b', '20'])
+            rate = nspcs / (time.time() - start)
+            print('{:d} process(es): {:.1f} species/s'.format(nprocs, rate))
+        assert open('inchi_1.csv').read() == open('inchi_4.csv').read()
+
+
+def test__profile():
+    """ test `automech species to_inchi --profile`
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        spc_csv = os.path.join(HEPTANE_PATH, 'smiles.csv')
+        subprocess.check_call([AUTOMECH_CMD, 'species', 'to_inchi',
+                               'smiles', spc_csv, '-S', 'inchi.csv',
+                               '--profile'])
+        assert os.path.exists('species_to_inchi.prof')
+        summ = json.load(open('species_to_inchi.json'))
+        assert summ['error'] is None
+        assert set(summ['stages']) == {'read', 'inchi', 'write'}
+        assert summ['counts']['rdkit_calls'] > 0
+
+
+def test__batch():
+    """ test `automech batch`
+    """
+    subprocess.check_call([AUTOMECH_CMD, 'batch', '-h'])
+
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+
+    with fs.enter(tmp_dir):
+        spc_csv = os.path.join(HEPTANE_PATH, 'smiles.csv')
+        with open('batch.txt', 'w') as file_obj:
+            file_obj.write(json.dumps(['species', 'to_inchi', 'smiles',
+                                       spc_csv, '-S', 'inchi1.csv']) + '\n')
+            file_obj.write(json.dumps('species to_inchi smiles {:s} '
+                                      '-S inchi2.csv -L inchi2.log'
+                                      .format(spc_csv)) + '\n')
+        subprocess.check_call([AUTOMECH_CMD, 'batch', 'batch.txt'])
+        assert open('inchi1.csv').read() == open('inchi2.csv').read()
+        assert os.path.exists('species_to_inchi.log')
+        assert os.path.exists('inchi2.log')
+
+        # a failing command is reported without stopping the batch
+        with open('batch.txt', 'w') as file_obj:
+            file_obj.write(json.dumps(['species', 'to_inchi', 'smiles',
+                                       'missing.csv']) + '\n')
+            file_obj.write(json.dumps(['species', 'to_inchi', 'smiles',
+                                       spc_csv, '-S', 'inchi3.csv']) + '\n')
+        assert subprocess.call([AUTOMECH_CMD, 'batch', 'batch.txt']) != 0
+        assert open('inchi1.csv').read() == open('inchi3.csv').read()
+
+        # so is a line that can't be parsed, with its line number
+        with open('batch.txt', 'w') as file_obj:
+            file_obj.write(json.dumps(['species', 'to_inchi', 'smiles',
+                                       spc_csv, '-S', 'inchi4.csv']) + '\n')
+            file_obj.write('\n["species", "to_inchi",\n')
+            file_obj.write(json.dumps(['species', 'to_inchi', 'smiles',
+                                       spc_csv, '-S', 'inchi5.csv']) + '\n')
+        proc = subprocess.run([AUTOMECH_CMD, 'batch', 'batch.txt'],
+                              stderr=subprocess.PIPE, check=False)
+        assert proc.returncode != 0
+        assert b'Failed: line 3: ["species", "to_inchi",' in proc.stderr
+        assert b'JSONDecodeError' in proc.stderr
+        assert open('inchi1.csv').read() == open('inchi4.csv').read()
+        assert open('inchi1.csv').read() == open('inchi5.csv').read()
 
 
 def test__species__filesystem():
@@ -80,6 +499,10 @@ if __name__ == '__main__':
     # test__help()
     # test__chemkin__help()
     # test__chemkin__to_csv()
+    # test__chemkin__to_csv__thermo_library()
+    # test__chemkin__subset()
     # test__species__help()
     # test__species__to_inchi()
+    # test__profile()
+    # test__batch()
     test__species__filesystem()
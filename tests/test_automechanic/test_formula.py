@@ -0,0 +1,108 @@
+""" test the automechanic.formula module
+"""
+import os
+import time
+import numpy
+from automechanic import stoich
+from automechanic import formula
+from automechanic.iohelp import read_string
+from automechanic.parse import chemkin
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+HEPTANE_PATH = os.path.join(PATH, '../../examples/heptane')
+
+
+def _heptane_matrices():
+    mech_str = read_string(os.path.join(HEPTANE_PATH, 'mechanism.txt'))
+    ther_str = read_string(os.path.join(HEPTANE_PATH, 'thermo_data.txt'))
+    fml_dct = {chemkin.thermo_data_species_name(thm_dstr):
+               chemkin.thermo_data_elements(thm_dstr)
+               for thm_dstr in chemkin.thermo_data_strings(ther_str)}
+    rxns = [rxn for rxn, _ in chemkin.reaction_data(mech_str)]
+    spcs, rct_mat, prd_mat = stoich.matrices(
+        rxns, chemkin.species_names(mech_str))
+    elems, cmp_arr = formula.composition_matrix(
+        [fml_dct[spc] for spc in spcs])
+    return rxns, spcs, rct_mat, prd_mat, elems, cmp_arr
+
+
+def test__from_string():
+    """ test formula.from_string
+    """
+    assert formula.from_string('C2H6O') == {'C': 2, 'H': 6, 'O': 1}
+    assert formula.from_string('Ar') == {'Ar': 1}
+    assert formula.from_string('2CH4.H2O') == {'C': 2, 'H': 10, 'O': 1}
+
+
+def test__from_inchi():
+    """ test formula.from_inchi
+    """
+    assert (formula.from_inchi('InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3') ==
+            {'C': 2, 'H': 6, 'O': 1})
+    assert (formula.from_inchi('InChI=1S/CH3O/c1-2/h1H3/q-1') ==
+            {'C': 1, 'H': 3, 'O': 1, 'E': 1})
+    assert (formula.from_inchi('InChI=1S/H2O/h1H2/p+1') ==
+            {'H': 3, 'O': 1, 'E': -1})
+
+
+def test__composition_matrix():
+    """ test formula.composition_matrix
+    """
+    elems, cmp_arr = formula.composition_matrix(
+        [{'C': 1, 'H': 4}, {'H': 2, 'O': 1}])
+    assert elems == ('C', 'H', 'O')
+    assert numpy.array_equal(cmp_arr, [[1, 4, 0], [0, 2, 1]])
+    elems, cmp_arr = formula.composition_matrix([{'H': 2}, None])
+    assert elems == ('H',)
+    assert cmp_arr[0, 0] == 2. and numpy.all(numpy.isnan(cmp_arr[1]))
+
+
+def test__imbalances():
+    """ test formula.imbalances and formula.unbalanced_reactions
+    """
+    rxns = ('H+O2<=>O+OH', 'CH3+H<=>CH4', 'H2O+H<=>OH+H2+H',
+            'OH+E<=>OH-')
+    spcs, rct_mat, prd_mat = stoich.matrices(rxns)
+    fml_dct = {'H': {'H': 1}, 'O2': {'O': 2}, 'O': {'O': 1},
+               'OH': {'O': 1, 'H': 1}, 'CH3': {'C': 1, 'H': 3},
+               'CH4': {'C': 1, 'H': 4}, 'H2O': {'H': 2, 'O': 1},
+               'H2': {'H': 2}, 'E': {'E': 1}, 'OH-': {'O': 1, 'H': 1}}
+    elems, cmp_arr = formula.composition_matrix(
+        [fml_dct[spc] for spc in spcs])
+    imb_arr = formula.imbalances(rct_mat, prd_mat, cmp_arr)
+    assert imb_arr.shape == (len(rxns), len(elems))
+    assert formula.unbalanced_reactions(rxns, elems, imb_arr) == (
+        (2, 'H2O+H<=>OH+H2+H', {'H': 1}),
+        (3, 'OH+E<=>OH-', {'E': -1}))
+
+
+def test__imbalances__heptane():
+    """ test formula.imbalances on the heptane mechanism, and on 10 copies
+    """
+    rxns, _, rct_mat, prd_mat, elems, cmp_arr = _heptane_matrices()
+    imb_arr = formula.imbalances(rct_mat, prd_mat, cmp_arr)
+    assert not formula.unbalanced_reactions(rxns, elems, imb_arr)
+
+    rows, cols, data = stoich.to_triples(rct_mat)
+    nrxns, nspcs = stoich.shape_(rct_mat)
+    rct_mat = stoich.from_triples(
+        numpy.concatenate([rows + idx * nrxns for idx in range(10)]),
+        numpy.tile(cols, 10), numpy.tile(data, 10), shape=(10*nrxns, nspcs))
+    rows, cols, data = stoich.to_triples(prd_mat)
+    prd_mat = stoich.from_triples(
+        numpy.concatenate([rows + idx * nrxns for idx in range(10)]),
+        numpy.tile(cols, 10), numpy.tile(data, 10), shape=(10*nrxns, nspcs))
+
+    start = time.perf_counter()
+    imb_arr = formula.imbalances(rct_mat, prd_mat, cmp_arr)
+    print("{:d} reactions in {:.3f} s"
+          .format(10*nrxns, time.perf_counter() - start))
+    assert not numpy.any(imb_arr)
+
+
+if __name__ == '__main__':
+    test__from_string()
+    test__from_inchi()
+    test__composition_matrix()
+    test__imbalances()
+    test__imbalances__heptane()
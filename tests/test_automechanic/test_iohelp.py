@@ -0,0 +1,48 @@
+""" test the automechanic.iohelp module
+"""
+from __future__ import unicode_literals
+from builtins import open
+import os
+import tempfile
+from automechanic import iohelp
+from automechanic.parse import chemkin
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+ARAMCO_PATH = os.path.join(PATH, '../../examples/old/aramco')
+
+
+def test__read_string():
+    """ test iohelp.read_string
+    """
+    mech_txt = os.path.join(ARAMCO_PATH, 'mechanism.txt')
+    mech_str = open(mech_txt, encoding='utf8', errors='ignore').read()
+    assert iohelp.read_string(mech_txt) == mech_str
+
+    empty_txt = os.path.join(tempfile.mkdtemp(), 'empty.txt')
+    open(empty_txt, 'w').close()
+    assert iohelp.read_string(empty_txt) == ''
+
+
+def test__read_offsets():
+    """ test iohelp.find_offsets and iohelp.read_offsets
+    """
+    mech_txt = os.path.join(ARAMCO_PATH, 'mechanism.txt')
+    start_lines = (chemkin.SPECIES_BLOCK_START_LINE,
+                   chemkin.REACTIONS_BLOCK_START_LINE,
+                   chemkin.THERMO_BLOCK_START_LINE)
+    offsets = [iohelp.find_offsets(mech_txt, start_line,
+                                   chemkin.BLOCK_END_LINE)[0]
+               for start_line in start_lines]
+    blk_strs = iohelp.read_offsets(mech_txt, offsets)
+    assert [blk_str.split()[0] for blk_str in blk_strs] == [
+        'SPECIES', 'REACTIONS', 'THERMO']
+    assert all(blk_str.rstrip().endswith('END') for blk_str in blk_strs)
+
+    mech_str = iohelp.read_string(mech_txt)
+    assert (chemkin.species_names(blk_strs[0]) ==
+            chemkin.species_names(mech_str))
+
+
+if __name__ == '__main__':
+    test__read_string()
+    test__read_offsets()
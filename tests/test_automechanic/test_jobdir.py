@@ -0,0 +1,69 @@
+""" test the automechanic.jobdir module
+"""
+import os
+import tempfile
+from automechanic import jobdir
+
+TPL_STR = ('{{ {q1h} + {q2:>4s} }}\n'
+           'nodes: {nodes!r}\n'
+           'first node: {node_lst[0]}\n')
+
+
+def test__render():
+    """ test jobdir.template, jobdir.template_fields and jobdir.render
+    """
+    tpl = jobdir.template(TPL_STR)
+    assert jobdir.template_fields(tpl) == {'q1h', 'q2', 'nodes', 'node_lst'}
+    val_dct = {'q1h': 'CH4', 'q2': 'OH', 'nodes': 'node1, node2',
+               'node_lst': ['node1', 'node2']}
+    assert jobdir.render(tpl, val_dct) == TPL_STR.format(**val_dct)
+    assert jobdir.render(jobdir.template(''), {}) == ''
+
+
+def test__write():
+    """ test jobdir.write, jobdir.is_current and jobdir.current_all
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+    dir_pth = os.path.join(tmp_dir, 'runs', '0')
+    file_dct = {'input.dat': 'H2 + O\n', 'q1h.xyz': '2\nH2\n'}
+    dgst = jobdir.digest(file_dct)
+    assert dgst != jobdir.digest({'input.dat': 'H2 + O\n'})
+
+    assert not jobdir.is_current(dir_pth, dgst)
+    jobdir.write(dir_pth, file_dct)
+    assert jobdir.is_current(dir_pth, dgst)
+    assert open(os.path.join(dir_pth, 'input.dat')).read() == 'H2 + O\n'
+
+    jobdir.write(dir_pth, {'input.dat': 'H2 + OH\n'}, dgst='abc')
+    assert not jobdir.is_current(dir_pth, dgst)
+    assert jobdir.current_all([dir_pth, tmp_dir], ['abc', 'abc'],
+                              nthreads=2) == (True, False)
+
+
+def test__write_all():
+    """ test jobdir.write_all
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+    # a file where a directory should be
+    blk_pth = os.path.join(tmp_dir, 'blocked')
+    open(blk_pth, 'w').close()
+
+    dir_pths = [os.path.join(tmp_dir, str(idx)) for idx in range(50)]
+    dir_pths[7] = os.path.join(blk_pth, '7')
+    file_dcts = [{'input.dat': '{:d}\n'.format(idx)} for idx in range(50)]
+    poss = []
+    rets = jobdir.write_all(dir_pths, file_dcts, nthreads=4,
+                            callback=lambda pos, ok, val: poss.append(pos))
+    assert poss == list(range(50))
+    assert [ok for ok, _ in rets] == [idx != 7 for idx in range(50)]
+    assert isinstance(rets[7][1], OSError)
+    assert all(open(os.path.join(dir_pths[idx], 'input.dat')).read() ==
+               '{:d}\n'.format(idx) for idx in range(50) if idx != 7)
+
+
+if __name__ == '__main__':
+    test__render()
+    test__write()
+    test__write_all()
@@ -0,0 +1,85 @@
+""" test the automechanic.journal module
+"""
+import os
+import tempfile
+from automechanic import journal
+from automechanic import tab
+
+TBL_CSV_STR = ('i_,name,status\n'
+               '3,H2+O<=>H+OH,created\n'
+               '5,CH4+OH<=>CH3+H2O,created\n'
+               '8,H2+OH<=>H+H2O,created\n')
+
+
+def test__writer():
+    """ test journal.writer, journal.read and journal.latest
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+    jnl_pth = journal.path_(os.path.join(tmp_dir, 'table.csv'))
+    assert jnl_pth.endswith('table.csv.journal')
+    assert journal.read(jnl_pth) == []
+
+    with journal.writer(jnl_pth) as append:
+        append(5, status='failed', error='oops')
+        # updates are on disk as soon as they are appended
+        assert len(journal.read(jnl_pth)) == 1
+    with journal.writer(jnl_pth) as append:
+        append(3, status='ran')
+        append(5, status='ran', error=None)
+
+    recs = journal.read(jnl_pth)
+    assert [rec['i_'] for rec in recs] == [5, 3, 5]
+    assert all(journal.TIME_KEY in rec for rec in recs)
+    val_dct = journal.latest(jnl_pth)
+    assert list(val_dct) == [5, 3]
+    assert val_dct[5]['status'] == 'ran' and val_dct[5]['error'] is None
+
+    # a partial last line, from a crash, is ignored
+    with open(jnl_pth, 'a') as file_obj:
+        file_obj.write('{"i_": 8, "sta')
+    assert len(journal.read(jnl_pth)) == 3
+
+
+def test__compact():
+    """ test journal.compact
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+    tbl_pth = os.path.join(tmp_dir, 'table.csv')
+    with open(tbl_pth, 'w') as file_obj:
+        file_obj.write(TBL_CSV_STR)
+    jnl_pth = journal.path_(tbl_pth)
+
+    assert journal.compact(tbl_pth) == 0
+
+    with journal.writer(jnl_pth) as append:
+        append(8, status='failed', error='oops')
+        append(3, status='ran', error=None)
+    assert journal.compact(tbl_pth, keys=('status',)) == 2
+    assert not os.path.exists(jnl_pth)
+    tbl = tab.read(tbl_pth)
+    assert list(tab.idxs_(tbl)) == [3, 5, 8]
+    assert list(tbl['status']) == ['ran', 'created', 'failed']
+    assert 'error' not in tab.keys_(tbl)
+
+    with journal.writer(jnl_pth) as append:
+        append(8, status='ran', error=None)
+        append(5, status='failed', error='oops')
+    assert journal.compact(tbl_pth) == 2
+    tbl = tab.read(tbl_pth)
+    assert list(tbl['status']) == ['ran', 'failed', 'ran']
+    assert list(tbl['error'].fillna('')) == ['', 'oops', '']
+
+    # columns that aren't in the table yet are added
+    with journal.writer(jnl_pth) as append:
+        append(5, status='ran', error=None, node='node1')
+    assert journal.compact(tbl_pth) == 1
+    tbl = tab.read(tbl_pth)
+    assert list(tbl['status']) == ['ran', 'ran', 'ran']
+    assert list(tbl['node'].fillna('')) == ['', 'node1', '']
+
+
+if __name__ == '__main__':
+    test__writer()
+    test__compact()
@@ -0,0 +1,124 @@
+""" test the automechanic.kinetics module
+"""
+import os
+import numpy
+from automechanic import tab
+from automechanic import stoich
+from automechanic import kinetics
+from automechanic import params as par
+from automechanic.iohelp import read_string
+from automechanic.parse.chemkin import thermo_data
+from automechanic.parse.chemkin import reaction_data
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+HEPTANE_PATH = os.path.join(PATH, '../../examples/heptane')
+TEMPS = numpy.linspace(500., 2500., 5)
+
+
+def _species_table():
+    ther_txt = os.path.join(HEPTANE_PATH, 'thermo_data.txt')
+    thm_dat_lst = thermo_data(read_string(ther_txt))
+    keys = (par.SPC.TAB.NAME_KEY, par.SPC.TAB.NASA_C_LO_KEYS,
+            par.SPC.TAB.NASA_C_HI_KEYS, par.SPC.TAB.NASA_T_KEYS)
+    typs = (par.SPC.TAB.NAME_TYP, par.SPC.TAB.NASA_C_TYP,
+            par.SPC.TAB.NASA_C_TYP, par.SPC.TAB.NASA_T_TYP)
+    return tab.from_records(vals=thm_dat_lst, keys=keys, typs=typs)
+
+
+def _reactions_table(rxn_dat_lst=None):
+    if rxn_dat_lst is None:
+        mech_txt = os.path.join(HEPTANE_PATH, 'mechanism.txt')
+        rxn_dat_lst = reaction_data(read_string(mech_txt))
+    keys = (par.RXN.TAB.NAME_KEY, par.RXN.TAB.ARRH_KEYS)
+    typs = (par.RXN.TAB.NAME_TYP, par.RXN.TAB.ARRH_TYP)
+    return tab.from_records(vals=rxn_dat_lst, keys=keys, typs=typs)
+
+
+def test__rate_constants():
+    """ test kinetics.rate_constants
+    """
+    rxn_tbl = _reactions_table()
+    rate_cfts = kinetics.rate_constants(rxn_tbl, TEMPS)
+    assert rate_cfts.shape == (len(rxn_tbl), len(TEMPS))
+
+    for row, (arrh_a, arrh_b, arrh_e) in enumerate(
+            tab.iter_(rxn_tbl, par.RXN.TAB.ARRH_KEYS)):
+        if row % 100:
+            continue
+        for col, temp in enumerate(TEMPS):
+            rate_cft = arrh_a * temp ** arrh_b * numpy.exp(
+                -arrh_e / kinetics.GAS_CONSTANT_CAL / temp)
+            assert numpy.isclose(rate_cfts[row, col], rate_cft)
+
+
+def test__stoichiometry():
+    """ test kinetics.stoichiometry
+    """
+    spc_tbl = _species_table()
+    spcs = list(spc_tbl[par.SPC.TAB.NAME_KEY])
+    rxn_tbl = _reactions_table([('H+O2<=>O+OH', (1., 0., 0.)),
+                                ('2OH(+M)<=>H2O2(+M)', (1., 0., 0.))])
+    rct_mat, prd_mat = kinetics.stoichiometry(rxn_tbl, spc_tbl)
+    assert stoich.shape_(rct_mat) == (2, len(spcs))
+    rct_cols, rct_cnts = stoich.row_entries(rct_mat, 1)
+    prd_cols, prd_cnts = stoich.row_entries(prd_mat, 1)
+    assert [spcs[col] for col in rct_cols] == ['OH']
+    assert [spcs[col] for col in prd_cols] == ['H2O2']
+    assert tuple(rct_cnts) == (2.,)
+    assert tuple(prd_cnts) == (1.,)
+
+    rxn_tbl = _reactions_table([('H+XYZ<=>HXYZ', (1., 0., 0.))])
+    try:
+        kinetics.stoichiometry(rxn_tbl, spc_tbl)
+    except ValueError as err:
+        assert 'XYZ' in str(err)
+    else:
+        assert False
+
+
+def test__reverse_rate_constants():
+    """ test kinetics.equilibrium_constants and .reverse_rate_constants
+    """
+    spc_tbl = _species_table()
+    rxn_tbl = _reactions_table([('H+O2<=>O+OH', (3.5e15, -0.41, 16600.)),
+                                ('O+OH<=>H+O2', (2.0e13, 0., 0.)),
+                                ('H+O2=>O+OH', (3.5e15, -0.41, 16600.)),
+                                ('H+OH+M<=>H2O+M', (3.5e22, -2., 0.))])
+    eq_cfts = kinetics.equilibrium_constants(rxn_tbl, spc_tbl, TEMPS)
+    rate_cfts = kinetics.rate_constants(rxn_tbl, TEMPS)
+    rev_rate_cfts = kinetics.reverse_rate_constants(rxn_tbl, spc_tbl, TEMPS)
+
+    assert numpy.allclose(eq_cfts[0] * eq_cfts[1], 1.)
+    assert numpy.allclose(rate_cfts[[0, 1, 3]],
+                          eq_cfts[[0, 1, 3]] * rev_rate_cfts[[0, 1, 3]])
+    assert not rev_rate_cfts[2].any()
+
+    # the recombination is exothermic
+    assert numpy.all(eq_cfts[3] > 1.)
+    assert numpy.all(numpy.diff(eq_cfts[3]) < 0.)
+
+
+def test__rate_violations():
+    """ test kinetics.rate_violations
+    """
+    spc_tbl = _species_table()
+    rxn_tbl = _reactions_table()
+    viol_dct = kinetics.rate_violations(rxn_tbl, spc_tbl, TEMPS)
+    for key in ('negative', 'nonfinite', 'over_limit'):
+        for prefix in ('', 'rev_'):
+            assert viol_dct[prefix + key].shape == (len(rxn_tbl), len(TEMPS))
+    assert not viol_dct['nonfinite'].any()
+
+    rxn_tbl = _reactions_table([('H+O2<=>O+OH', (-1e10, 0., 0.)),
+                                ('H+O2<=>O+OH', (1e20, 0., 0.)),
+                                ('H+OH+M<=>H2O+M', (1e20, 0., 0.))])
+    viol_dct = kinetics.rate_violations(rxn_tbl, spc_tbl, TEMPS)
+    assert tuple(viol_dct['negative'].all(axis=1)) == (True, False, False)
+    assert tuple(viol_dct['over_limit'].all(axis=1)) == (False, True, False)
+
+
+if __name__ == '__main__':
+    test__rate_constants()
+    test__stoichiometry()
+    test__reverse_rate_constants()
+    test__rate_violations()
@@ -0,0 +1,113 @@
+""" test the automechanic.mechgraph module
+"""
+import os
+from automechanic import mechgraph
+from automechanic.iohelp import read_string
+from automechanic.parse.chemkin import species_names
+from automechanic.parse.chemkin import reaction_data
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+HEPTANE_PATH = os.path.join(PATH, '../../examples/heptane')
+
+RXNS = ('A+B<=>C',         # 0
+        'C<=>D+E',         # 1
+        'D+OH<=>F+H2O',    # 2
+        'F<=>G',           # 3
+        'X+OH<=>G+H2O',    # 4
+        '2A<=>A2')         # 5
+MGR = mechgraph.from_reactions(RXNS)
+
+
+def test__from_reactions():
+    """ test mechgraph.from_reactions
+    """
+    assert mechgraph.reactions(MGR) == RXNS
+    assert mechgraph.species(MGR) == ('A', 'B', 'C', 'D', 'E', 'OH', 'F',
+                                      'H2O', 'G', 'X', 'A2')
+    mgr = mechgraph.from_reactions(RXNS, spcs=('G', 'A'))
+    assert mechgraph.species(mgr)[:3] == ('G', 'A', 'B')
+
+
+def test__consuming_reactions__producing_reactions():
+    """ test mechgraph.consuming_reactions and .producing_reactions
+    """
+    assert mechgraph.consuming_reactions(MGR, 'A') == (0, 5)
+    assert mechgraph.consuming_reactions(MGR, 'OH') == (2, 4)
+    assert mechgraph.producing_reactions(MGR, 'G') == (3, 4)
+    assert mechgraph.producing_reactions(MGR, 'A') == ()
+
+
+def test__reactants__products():
+    """ test mechgraph.reactants and .products
+    """
+    assert mechgraph.reactants(MGR, 5) == {'A': 2}
+    assert mechgraph.products(MGR, 2) == {'F': 1, 'H2O': 1}
+
+
+def test__shortest_path():
+    """ test mechgraph.shortest_path
+    """
+    assert (mechgraph.shortest_path(MGR, 'A', 'G') ==
+            ('A', 0, 'C', 1, 'D', 2, 'F', 3, 'G'))
+    assert mechgraph.shortest_path(MGR, 'G', 'A') is None
+    assert (mechgraph.shortest_path(MGR, 'G', 'X', both_ways=True) ==
+            ('G', 4, 'X'))
+    assert mechgraph.shortest_path(MGR, 'A', 'G', exclude=('F',)) is None
+
+
+def test__neighborhood():
+    """ test mechgraph.neighborhood
+    """
+    assert mechgraph.neighborhood(MGR, ['A']) == (0, 5)
+    assert mechgraph.neighborhood(MGR, ['A'], depth=2) == (0, 1, 5)
+    assert mechgraph.neighborhood(MGR, ['G'], depth=2) == (2, 3, 4)
+    assert (mechgraph.neighborhood(MGR, ['G'], depth=2, exclude=['OH']) ==
+            (2, 3, 4))
+    assert (mechgraph.neighborhood(MGR, ['D'], depth=2) ==
+            (0, 1, 2, 3, 4))
+    assert (mechgraph.neighborhood(MGR, ['D'], depth=2,
+                                   exclude=['OH', 'H2O']) ==
+            (0, 1, 2, 3))
+
+
+def test__subgraph():
+    """ test mechgraph.subgraph
+    """
+    mgr = mechgraph.subgraph(MGR, (1, 3, 5))
+    assert mechgraph.reactions(mgr) == ('C<=>D+E', 'F<=>G', '2A<=>A2')
+    assert mechgraph.species(mgr) == ('A', 'C', 'D', 'E', 'F', 'G', 'A2')
+    assert mechgraph.consuming_reactions(mgr, 'A') == (2,)
+    assert mechgraph.products(mgr, 0) == {'D': 1, 'E': 1}
+
+
+def test__heptane():
+    """ test mechgraph on the heptane mechanism
+    """
+    mech_str = read_string(os.path.join(HEPTANE_PATH, 'mechanism.txt'))
+    rxns = [rxn for rxn, _ in reaction_data(mech_str)]
+    mgr = mechgraph.from_reactions(rxns, species_names(mech_str))
+
+    rxn_idxs = mechgraph.consuming_reactions(mgr, 'NC7H16')
+    assert rxn_idxs
+    assert all('NC7H16' in mechgraph.reactants(mgr, idx) for idx in rxn_idxs)
+
+    small_spcs = ('H', 'O', 'OH', 'HO2', 'H2', 'O2', 'H2O', 'H2O2')
+    path = mechgraph.shortest_path(mgr, 'NC7H16', 'CO2', exclude=small_spcs)
+    assert path[0] == 'NC7H16' and path[-1] == 'CO2'
+
+    rxn_idxs = mechgraph.neighborhood(mgr, ['NC7H16'], depth=2,
+                                      exclude=small_spcs)
+    sub_mgr = mechgraph.subgraph(mgr, rxn_idxs)
+    assert (mechgraph.consuming_reactions(sub_mgr, 'NC7H16') ==
+            tuple(rxn_idxs.index(idx) for idx
+                  in mechgraph.consuming_reactions(mgr, 'NC7H16')))
+
+
+if __name__ == '__main__':
+    test__from_reactions()
+    test__consuming_reactions__producing_reactions()
+    test__reactants__products()
+    test__shortest_path()
+    test__neighborhood()
+    test__subgraph()
+    test__heptane()
@@ -1,6 +1,7 @@
 """ test the automechanic.mol module
 """
 import os
+import time
 import numpy
 from automechanic import mol
 
@@ -289,6 +290,20 @@ def test__geom__inchi():
     assert mol.geom.inchi(C2H2F2_GEO) == C2H2F2_ICH
 
 
+def test__geom__xyz_string():
+    """ test mol.geom.xyz_string
+    """
+    xyz_str = mol.geom.xyz_string(C2H2F2_GEO, first_keys=(4, 1),
+                                  comment='C2H2F2')
+    lines = xyz_str.splitlines()
+    assert lines[:2] == ['6', 'C2H2F2']
+    assert [line.split()[0] for line in lines[2:]] == [
+        'H', 'C', 'F', 'C', 'F', 'H']
+    assert numpy.allclose(tuple(map(float, lines[2].split()[1:])),
+                          C2H2F2_GEO[4][1])
+    assert xyz_str.endswith('\n')
+
+
 def test__smiles__inchi():
     """ test mol.smiles.inchi
     """
@@ -427,6 +442,18 @@ def test__inchi__compatible_stereoisomers():
     assert (mol.inchi.compatible_stereoisomers(C8H13O_ICH_NO_STEREO)
             == C8H13O_ICHS)
     assert mol.inchi.compatible_stereoisomers(C8H13O_ICH) == (C8H13O_ICH,)
+    assert (mol.inchi.compatible_stereoisomers(C8H13O_ICH_NO_STEREO,
+                                               max_count=3)
+            == C8H13O_ICHS[:3])
+
+    # with 30 stereo centers there are 2^29 candidates, so the first one
+    # must be found without building the rest
+    ich = mol.smiles.inchi('CC' + 'C(O)' * 30 + 'CC')
+    start = time.perf_counter()
+    ste_ichs = mol.inchi.compatible_stereoisomers(ich, max_count=1)
+    assert time.perf_counter() - start < 1.
+    assert len(ste_ichs) == 1
+    assert len(mol.inchi.atom_stereo_elements(ste_ichs[0])) == 30
 
 
 def test__inchi__inchi_key():
@@ -482,6 +509,13 @@ def test__inchi__geometry():
     for ich in PYBEL_FAIL_ICHS:
         mol.inchi.geometry(ich)
 
+    # without the fallback, the atoms are in connectivity graph order
+    for ich in C8H13O_ICHS:
+        geo = mol.inchi.geometry(ich, fallback=False)
+        atms, _ = mol.inchi.connectivity_graph(ich)
+        assert ([sym for sym, _ in geo] ==
+                [atms[key][0] for key in sorted(atms)])
+
 
 def test__inchi__connectivity_graph():
     """ test mol.inchi.connectivity_graph
@@ -562,6 +596,7 @@ if __name__ == '__main__':
     # test__inchi__key__is_standard_neutral()
     # test__geom__connectivity_graph()
     # test__geom__inchi()
+    # test__geom__xyz_string()
     # test__inchi__geometry()
     # test__inchi__connectivity_graph()
     test__inchi__stereo_graph()
@@ -579,6 +579,89 @@ def test__backbone_isomorphism():
         assert graph.backbone_isomorphism(cgr, cgr_pmt) == pmt_dct
 
 
+# test reactions
+def _explicit_graph(atm_syms, bnd_keys):
+    return graph.from_data(dict(enumerate(atm_syms)), map(frozenset, bnd_keys))
+
+
+CH4_CGR = _explicit_graph('CHHHH', [(0, 1), (0, 2), (0, 3), (0, 4)])
+CH3_CGR = _explicit_graph('CHHH', [(0, 1), (0, 2), (0, 3)])
+OH_CGR = _explicit_graph('OH', [(0, 1)])
+H2O_CGR = _explicit_graph('OHH', [(0, 1), (0, 2)])
+H_CGR = _explicit_graph('H', [])
+C2H4_CGR = _explicit_graph('CCHHHH', [(0, 1), (0, 2), (0, 3), (1, 4), (1, 5)])
+C2H5_CGR = _explicit_graph('HCCHHHH', [(1, 2), (0, 1), (1, 3), (1, 4),
+                                       (2, 5), (2, 6)])
+CH3O_CGR = _explicit_graph('COHHH', [(0, 1), (0, 2), (0, 3), (0, 4)])
+CH2OH_CGR = _explicit_graph('HCOHH', [(1, 2), (0, 2), (1, 3), (1, 4)])
+
+
+def test__atom_invariants():
+    """ test graph.atom_invariants and graph.invariant
+    """
+    atm_inv_dct = graph.atom_invariants(CH4_CGR)
+    assert len(set(atm_inv_dct.values())) == 2
+    assert len(set(graph.atom_invariants(C2H5_CGR).values())) == 4
+
+    cgr = C8H13O_CGR
+    natms = len(graph.atoms(cgr))
+    for _ in range(10):
+        pmt_dct = dict(enumerate(numpy.random.permutation(natms)))
+        cgr_pmt = graph.relabel(cgr, pmt_dct)
+        atm_inv_dct_pmt = graph.atom_invariants(cgr_pmt)
+        assert all(atm_inv_dct_pmt[pmt_dct[key]] == inv
+                   for key, inv in graph.atom_invariants(cgr).items())
+        assert graph.invariant(cgr_pmt) == graph.invariant(cgr)
+    assert graph.invariant(CH3O_CGR) != graph.invariant(CH2OH_CGR)
+
+
+def test__atom_unsaturated_valences():
+    """ test graph.atom_unsaturated_valences
+    """
+    assert graph.atom_unsaturated_valences(CH4_CGR) == {}
+    assert graph.atom_unsaturated_valences(C2H4_CGR) == {0: 1, 1: 1}
+    assert graph.atom_unsaturated_valences(C8H13O_RGR) == {8: 1}
+    assert graph.atom_unsaturated_valences(C8H13O_CGR) == {
+        2: 1, 3: 1, 4: 1, 5: 1, 8: 1}
+
+
+def test__abstraction_indices():
+    """ test graph.forward_abstraction_indices and graph.abstraction_indices
+    """
+    assert graph.forward_abstraction_indices(CH4_CGR, CH3_CGR) in (
+        (1, 0), (2, 0), (3, 0), (4, 0))
+    assert graph.forward_abstraction_indices(CH4_CGR, OH_CGR) is None
+    q1h_idx, q2_idx, q1_idx, q2h_idx = graph.abstraction_indices(
+        CH4_CGR, OH_CGR, CH3_CGR, H2O_CGR)
+    assert q1h_idx in (1, 2, 3, 4)
+    assert (q2_idx, q1_idx) == (0, 0)
+    assert q2h_idx in (1, 2)
+
+
+def test__addition_indices():
+    """ test graph.addition_indices
+    """
+    x_idx, y_idx, xy_idx_x, xy_idx_y = graph.addition_indices(
+        H_CGR, C2H4_CGR, C2H5_CGR)
+    assert (x_idx, y_idx) in ((0, 0), (0, 1))
+    assert graph.atom_symbols(C2H5_CGR)[xy_idx_x] == 'H'
+    assert xy_idx_y == 1
+    assert graph.addition_indices(H_CGR, CH3_CGR, C2H5_CGR) is None
+    h2o2_cgr = _explicit_graph('OOHH', [(0, 1), (0, 2), (1, 3)])
+    assert graph.addition_indices(OH_CGR, OH_CGR, h2o2_cgr) in (
+        (0, 0, 0, 1), (0, 0, 1, 0))
+
+
+def test__migration_indices():
+    """ test graph.migration_indices
+    """
+    r_idx_h, r_idx_a, p_idx_h, p_idx_a = graph.migration_indices(
+        CH3O_CGR, CH2OH_CGR)
+    assert r_idx_h in (2, 3, 4) and r_idx_a == 1
+    assert p_idx_h == 0 and p_idx_a == 1
+    assert graph.migration_indices(CH3O_CGR, CH3O_CGR) is None
+
+
 if __name__ == '__main__':
     # test constructors and value getters
     test__from_data()
@@ -623,3 +706,9 @@ if __name__ == '__main__':
     # test comparisons
     test__backbone_isomorphic()
     test__backbone_isomorphism()
+    # test reactions
+    test__atom_invariants()
+    test__atom_unsaturated_valences()
+    test__abstraction_indices()
+    test__addition_indices()
+    test__migration_indices()
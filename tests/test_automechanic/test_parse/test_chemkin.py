@@ -28,6 +28,19 @@ def test__thermo_data():
     assert len(thm_dat_lst) == 1268
 
 
+def test__thermo_data_elements():
+    """ test chemkin.thermo_data_elements
+    """
+    ther_txt = os.path.join(HEPTANE_PATH, 'thermo_data.txt')
+    ther_str = open(ther_txt, encoding='utf8', errors='ignore').read()
+    fml_dct = {chemkin.thermo_data_species_name(thm_dstr):
+               chemkin.thermo_data_elements(thm_dstr)
+               for thm_dstr in chemkin.thermo_data_strings(ther_str)}
+    assert fml_dct['AR'] == {'Ar': 1}
+    assert fml_dct['H2O2'] == {'H': 2, 'O': 2}
+    assert fml_dct['NC7H16'] == {'C': 7, 'H': 16}
+
+
 def test__reaction_unit_names():
     """ test chemkin.reaction_unit_names()
     """
@@ -56,8 +69,47 @@ def test__thermo_t_common_default():
     assert tmp_com_def == 1000.
 
 
+def test__split_reaction_name():
+    """ test chemkin.split_reaction_name()
+    """
+    assert (chemkin.split_reaction_name('H+O2 + M<=>HO2+M') ==
+            (('H', 'O2'), ('HO2',)))
+    assert (chemkin.split_reaction_name('2OH(+M)<=>H2O2(+M)') ==
+            (('OH', 'OH'), ('H2O2',)))
+    assert (chemkin.split_reaction_name('H+O2(+AR)<=>HO2(+AR)') ==
+            (('H', 'O2'), ('HO2',)))
+    assert (chemkin.split_reaction_name('H + O2 (+HE) <=> HO2 (+HE)') ==
+            (('H', 'O2'), ('HO2',)))
+    assert (chemkin.split_reaction_name('H+MB<=>HMB') ==
+            (('H', 'MB'), ('HMB',)))
+    assert (chemkin.split_reaction_name('1-C4H8+H<=>P-C4H9') ==
+            (('1-C4H8', 'H'), ('P-C4H9',)))
+
+
+def test__reaction_is_reversible():
+    """ test chemkin.reaction_is_reversible()
+    """
+    assert chemkin.reaction_is_reversible('H+O2<=>O+OH')
+    assert chemkin.reaction_is_reversible('H+O2=O+OH')
+    assert not chemkin.reaction_is_reversible('H+O2=>O+OH')
+
+
+def test__reaction_has_third_body():
+    """ test chemkin.reaction_has_third_body()
+    """
+    assert chemkin.reaction_has_third_body('H+OH+M<=>H2O+M')
+    assert chemkin.reaction_has_third_body('H + O2 + M = HO2 + M')
+    assert not chemkin.reaction_has_third_body('C2H+H(+M)<=>C2H2(+M)')
+    assert not chemkin.reaction_has_third_body('H+O2(+AR)<=>HO2(+AR)')
+    assert not chemkin.reaction_has_third_body('H+MB<=>HMB')
+
+
 if __name__ == '__main__':
     test__thermo_t_common_default()
     test__thermo_data()
+    test__thermo_data_elements()
     test__reaction_unit_names()
     test__reaction_data()
+    test__split_reaction_name()
+    test__reaction_is_reversible()
+    test__reaction_has_third_body()
@@ -0,0 +1,123 @@
+""" test the automechanic.rxnclass module
+"""
+import os
+import time
+import numpy
+from automechanic import rxnclass
+from automechanic import formula
+from automechanic import stoich
+from automechanic import tab
+from automechanic.mol import smiles
+from automechanic.iohelp import read_string
+from automechanic.parse.chemkin import reaction_data
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+ARAMCO_PATH = os.path.join(PATH, '../../examples/old/aramco')
+
+RXNS = ('H2+O<=>H+OH',         # 0: abstraction
+        'OH+CH4<=>CH3+H2O',    # 1: abstraction
+        'CH3+H(+M)<=>CH4(+M)',  # 2: addition
+        'CH3O<=>CH2OH',        # 3: migration
+        'H2O2(+M)<=>2OH(+M)',  # 4: addition
+        'H+O2<=>O+OH',         # 5: none
+        'CH3+X<=>CH4',         # 6: none (unknown species)
+        'CH3+CH3<=>C2H6')      # 7: addition
+FML_DCT = {'H': {'H': 1}, 'H2': {'H': 2}, 'O': {'O': 1}, 'O2': {'O': 2},
+           'OH': {'O': 1, 'H': 1}, 'H2O': {'H': 2, 'O': 1},
+           'H2O2': {'H': 2, 'O': 2}, 'CH3': {'C': 1, 'H': 3},
+           'CH4': {'C': 1, 'H': 4}, 'CH3O': {'C': 1, 'H': 3, 'O': 1},
+           'CH2OH': {'C': 1, 'H': 3, 'O': 1}, 'C2H6': {'C': 2, 'H': 6}}
+MULT_DCT = {'H': 2, 'H2': 1, 'O': 3, 'O2': 3, 'OH': 2, 'H2O': 1, 'H2O2': 1,
+            'CH3': 2, 'CH4': 1, 'CH3O': 2, 'CH2OH': 2, 'C2H6': 1, 'X': 1}
+
+
+def test__from_reactions():
+    """ test rxnclass.from_reactions
+    """
+    scr = rxnclass.from_reactions(RXNS, FML_DCT, MULT_DCT)
+    assert tuple(rxnclass.classes(scr)) == (
+        'abstraction', 'abstraction', 'addition', 'migration', 'addition',
+        '', '', 'addition')
+    assert numpy.array_equal(rxnclass.is_radical_radical(scr),
+                             [True, False, True, False, True, True, False,
+                              True])
+    assert numpy.array_equal(rxnclass.is_spin_balanced(scr),
+                             [True, True, False, True, False, True, False,
+                              False])
+
+    scr = rxnclass.from_reactions(RXNS, FML_DCT)
+    assert numpy.all(rxnclass.is_spin_balanced(scr))
+
+
+def test__candidates():
+    """ test rxnclass.candidates and rxnclass.candidate_species
+    """
+    scr = rxnclass.from_reactions(RXNS, FML_DCT, MULT_DCT)
+    spcs, _, _ = stoich.matrices(RXNS)
+    assert rxnclass.candidates(scr, 'abstraction') == (0, 1)
+    assert rxnclass.candidates(scr, 'addition') == (2, 4, 7)
+    assert rxnclass.candidates(scr, 'migration') == (3,)
+
+    assert (rxnclass.candidate_species(scr, 0, spcs) ==
+            ('H2', 'O', 'H', 'OH'))
+    assert (rxnclass.candidate_species(scr, 1, spcs) ==
+            ('CH4', 'OH', 'CH3', 'H2O'))
+    assert (rxnclass.candidate_species(scr, 4, spcs) ==
+            ('OH', 'OH', 'H2O2'))
+    assert (rxnclass.candidate_species(scr, 3, spcs) ==
+            ('CH3O', 'CH2OH'))
+    assert rxnclass.candidate_species(scr, 5, spcs) == ()
+
+
+def test__map_candidates():
+    """ test rxnclass.map_candidates
+    """
+    scr = rxnclass.from_reactions(RXNS, FML_DCT, MULT_DCT)
+    spcs, _, _ = stoich.matrices(RXNS)
+    calls = []
+
+    def _find(*args):
+        calls.append(args)
+        return len(calls)
+
+    assert (rxnclass.map_candidates(_find, scr, 'addition', spcs) ==
+            {2: 1, 4: 2, 7: 3})
+    assert calls == [('H', 'CH3', 'CH4'), ('OH', 'OH', 'H2O2'),
+                     ('CH3', 'CH3', 'C2H6')]
+
+
+def test__aramco():
+    """ test rxnclass on the aramco example
+    """
+    mech_str = read_string(os.path.join(ARAMCO_PATH, 'mechanism.txt'))
+    spc_tbl = tab.read_csv(os.path.join(ARAMCO_PATH, 'species.csv'))
+    rxns = [rxn for rxn, _ in reaction_data(mech_str)]
+
+    start = time.perf_counter()
+    fml_dct = {}
+    mult_dct = {}
+    for spc, sid in zip(spc_tbl['species'], spc_tbl['species_id']):
+        smi, mult = sid.rsplit('_m', 1)
+        fml_dct[spc] = formula.from_inchi(smiles.inchi(smi))
+        mult_dct[spc] = int(mult)
+    scr = rxnclass.from_reactions(rxns, fml_dct, mult_dct)
+    print("{:d} reactions in {:.3f} s"
+          .format(len(rxns), time.perf_counter() - start))
+
+    spcs, _, _ = stoich.matrices(rxns)
+    abs_idxs = rxnclass.candidates(scr, 'abstraction')
+    assert abs_idxs
+    for idx in abs_idxs:
+        q1h, q2, q1, q2h = map(fml_dct.__getitem__,
+                               rxnclass.candidate_species(scr, idx, spcs))
+        assert q1h['H'] - q1.get('H', 0) == 1
+        assert q2h['H'] - q2.get('H', 0) == 1
+    assert rxnclass.candidates(scr, 'addition')
+    assert rxnclass.candidates(scr, 'migration')
+
+
+if __name__ == '__main__':
+    test__from_reactions()
+    test__candidates()
+    test__map_candidates()
+    test__aramco()
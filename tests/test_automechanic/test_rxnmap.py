@@ -0,0 +1,110 @@
+""" test the automechanic.rxnmap module
+"""
+import os
+import time
+from automechanic import rxnmap
+from automechanic import tab
+from automechanic import params as par
+from automechanic.mol import smiles
+from automechanic.mol import graph
+from automechanic.iohelp import read_string
+from automechanic.parse.chemkin import reaction_data
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+ARAMCO_PATH = os.path.join(PATH, '../../examples/old/aramco')
+
+ICH_DCT = {'H': 'InChI=1S/H', 'O': 'InChI=1S/O', 'H2': 'InChI=1S/H2/h1H',
+           'OH': 'InChI=1S/HO/h1H', 'H2O': 'InChI=1S/H2O/h1H2',
+           'CH3': 'InChI=1S/CH3/h1H3', 'CH4': 'InChI=1S/CH4/h1H4',
+           'C2H4': 'InChI=1S/C2H4/c1-2/h1-2H2',
+           'C2H5': 'InChI=1S/C2H5/c1-2/h1H2,2H3',
+           'CH3O': 'InChI=1S/CH3O/c1-2/h1H3',
+           'CH2OH': 'InChI=1S/CH3O/c1-2/h2H,1H2',
+           'C2H5O': 'InChI=1S/C2H5O/c1-2-3/h2H2,1H3',
+           'CH3OCH2': 'InChI=1S/C2H5O/c1-3-2/h1H2,2H3'}
+RXNS = ('H2+O<=>H+OH',
+        'CH4+OH<=>CH3+H2O',
+        'C2H4+H(+M)<=>C2H5(+M)',
+        'CH3O<=>CH2OH',
+        'CH3+H(+M)<=>CH4(+M)',
+        'C2H5O<=>CH3OCH2')
+
+
+def test__graph_cache():
+    """ test rxnmap.graph_cache
+    """
+    ichs = [ICH_DCT['OH'], ICH_DCT['H'], ICH_DCT['OH']]
+    gra_dct = rxnmap.graph_cache(ichs)
+    assert len(gra_dct) == 2
+    oh_gra = gra_dct['TUJKJAMUKRIRHC-UHFFFAOYSA-N']
+    assert graph.atom_symbols(oh_gra) == {0: 'O', 1: 'H'}
+
+    # the cache is added to, rather than rebuilt
+    assert rxnmap.graph_cache([ICH_DCT['H2O']], gra_dct) is gra_dct
+    assert len(gra_dct) == 3
+    assert gra_dct['TUJKJAMUKRIRHC-UHFFFAOYSA-N'] is oh_gra
+
+
+def test__find():
+    """ test rxnmap.find
+    """
+    gra_dct = {}
+    map_dct = rxnmap.find(RXNS, ICH_DCT, 'abstraction', gra_dct=gra_dct)
+    assert sorted(map_dct) == [0, 1]
+    spcs, idxs, err = map_dct[1]
+    assert spcs == ('CH4', 'OH', 'CH3', 'H2O')
+    assert idxs[1:3] == (0, 0) and err is None
+    assert len(gra_dct) == 7
+
+    map_dct = rxnmap.find(RXNS, ICH_DCT, 'addition', gra_dct=gra_dct)
+    assert sorted(map_dct) == [2, 4]
+    spcs, idxs, _ = map_dct[2]
+    assert spcs == ('H', 'C2H4', 'C2H5')
+    assert idxs[0] == 0
+    assert len(gra_dct) == 9
+
+    map_dct = rxnmap.find(RXNS, ICH_DCT, 'migration')
+    assert map_dct[3][0] == ('CH3O', 'CH2OH') and map_dct[3][1]
+    assert (map_dct[5] ==
+            (('C2H5O', 'CH3OCH2'), None, rxnmap.NO_MAPPING_ERROR))
+
+
+def test__table__aramco():
+    """ test rxnmap.table on the aramco example
+    """
+    mech_str = read_string(os.path.join(ARAMCO_PATH, 'mechanism.txt'))
+    rxns = [rxn for rxn, _ in reaction_data(mech_str)]
+    rxn_tbl = tab.from_records(
+        [(rxn,) for rxn in rxns], keys=(par.RXN.TAB.NAME_KEY,))
+
+    spc_tbl = tab.read_csv(os.path.join(ARAMCO_PATH, 'species.csv'))
+    smis, mults = zip(*(sid.rsplit('_m', 1)
+                        for sid in spc_tbl['species_id']))
+    spc_tbl = tab.from_records(
+        list(zip(spc_tbl['species'], map(smiles.inchi, smis),
+                 map(int, mults))),
+        keys=(par.SPC.TAB.NAME_KEY, par.SPC.ID_ICH_KEY, par.SPC.MULT_KEY))
+
+    gra_dct = {}
+    start = time.perf_counter()
+    map_tbl, err_tbl = rxnmap.table(rxn_tbl, spc_tbl, 'abstraction',
+                                    gra_dct=gra_dct)
+    print("{:d} abstractions in {:.3f} s"
+          .format(len(map_tbl), time.perf_counter() - start))
+    assert len(map_tbl) > 100 and len(err_tbl) == 0
+    assert len(gra_dct) < len(spc_tbl)
+    assert all(key in tab.keys_(map_tbl)
+               for key in rxnmap.SPECIES_KEYS['abstraction'] +
+               rxnmap.INDEX_KEYS['abstraction'])
+
+    map_tbl, err_tbl = rxnmap.table(rxn_tbl, spc_tbl, 'migration',
+                                    gra_dct=gra_dct)
+    assert len(map_tbl) > 0
+    assert all(err == rxnmap.NO_MAPPING_ERROR
+               for err in err_tbl[par.RXN.TAB.ERROR_KEY])
+
+
+if __name__ == '__main__':
+    test__graph_cache()
+    test__find()
+    test__table__aramco()
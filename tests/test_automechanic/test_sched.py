@@ -0,0 +1,120 @@
+""" test the automechanic.sched module
+"""
+import time
+import threading
+from automechanic import sched
+
+NODES = ('node1', 'node2')
+
+
+def test__run():
+    """ test sched.run
+    """
+    def _square(val, node):
+        assert node in NODES
+        return val * val
+
+    rets = sched.run(_square, [(val,) for val in range(20)], NODES,
+                     node_limit=2)
+    assert rets == tuple((True, val * val) for val in range(20))
+
+    assert sched.run(_square, (), NODES) == ()
+
+
+def test__run__priorities():
+    """ test sched.run with priorities
+    """
+    order = []
+
+    def _record(idx, node):
+        order.append((idx, node))
+
+    sched.run(_record, [(idx,) for idx in range(6)], NODES[:1],
+              priorities=(1, 5, 0, 5, 3, 1))
+    assert [idx for idx, _ in order] == [1, 3, 4, 0, 5, 2]
+
+
+def test__run__node_limit():
+    """ test sched.run with a per-node limit
+    """
+    lock = threading.Lock()
+    count_dct = {node: 0 for node in NODES}
+    max_count_dct = {node: 0 for node in NODES}
+
+    def _sleep(node):
+        with lock:
+            count_dct[node] += 1
+            max_count_dct[node] = max(max_count_dct[node], count_dct[node])
+        time.sleep(0.01)
+        with lock:
+            count_dct[node] -= 1
+
+    sched.run(_sleep, [()] * 30, NODES, node_limit=3)
+    assert max_count_dct == {'node1': 3, 'node2': 3}
+
+
+def test__run__retries():
+    """ test sched.run with retries and failures
+    """
+    calls = []
+    finished = []
+
+    def _flaky(idx, node):
+        calls.append((idx, node))
+        if idx == 1:
+            raise ValueError('always fails')
+        if idx == 2 and node == 'node1':
+            raise RuntimeError('fails on node1')
+        return idx
+
+    def _finish(job_idx, node, ok, val):
+        finished.append((job_idx, node, ok))
+
+    rets = sched.run(_flaky, [(0,), (1,)], NODES, retries=2,
+                     callback=_finish)
+    assert rets[0] == (True, 0)
+    assert rets[1][0] is False and isinstance(rets[1][1], ValueError)
+    assert sched.error_string(rets[1][1]) == 'ValueError: always fails'
+    assert sum(idx == 1 for idx, _ in calls) == 3
+    assert sorted(job_idx for job_idx, _, _ in finished) == [0, 1]
+
+    # a retry goes to a node the job hasn't failed on
+    del calls[:]
+    assert sched.run(_flaky, [(2,)], NODES, retries=1) == ((True, 2),)
+    assert calls == [(2, 'node1'), (2, 'node2')]
+
+
+def test__run__shutdown():
+    """ test that sched.run stops dispatching when the caller is interrupted
+    """
+    started = []
+    running = []
+
+    def _sleep(idx, node):
+        started.append(idx)
+        running.append(idx)
+        time.sleep(0.05)
+        running.remove(idx)
+
+    def _stop(job_idx, node, ok, val):
+        raise KeyboardInterrupt
+
+    try:
+        sched.run(_sleep, [(idx,) for idx in range(50)], NODES,
+                  callback=_stop)
+    except KeyboardInterrupt:
+        pass
+    else:
+        raise AssertionError("the interrupt didn't go through")
+
+    # running jobs were waited on, and no others were started
+    assert not running
+    assert len(started) <= 2 * len(NODES)
+
+
+if __name__ == '__main__':
+    test__run()
+    test__run__priorities()
+    test__run__node_limit()
+    test__run__retries()
+    test__run__shutdown()
@@ -0,0 +1,98 @@
+""" test the automechanic.stoich module
+"""
+import os
+import time
+import numpy
+from automechanic import stoich
+from automechanic.iohelp import read_string
+from automechanic.parse.chemkin import species_names
+from automechanic.parse.chemkin import reaction_data
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+HEPTANE_PATH = os.path.join(PATH, '../../examples/heptane')
+RXNS = ('H+O2<=>O+OH',
+        '2OH(+M)<=>H2O2(+M)',
+        'H+O2+M<=>HO2+M',
+        'H+MB<=>HMB',
+        'HO2+HO2<=>H2O2+O2')
+
+
+def test__matrices():
+    """ test stoich.matrices
+    """
+    spcs, rct_mat, prd_mat = stoich.matrices(RXNS, spcs=('O2', 'H'))
+    assert spcs == ('O2', 'H', 'O', 'OH', 'H2O2', 'HO2', 'MB', 'HMB')
+    assert numpy.array_equal(stoich.to_dense(rct_mat), [
+        [1, 1, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 2, 0, 0, 0, 0],
+        [1, 1, 0, 0, 0, 0, 0, 0],
+        [0, 1, 0, 0, 0, 0, 1, 0],
+        [0, 0, 0, 0, 0, 2, 0, 0]])
+    assert numpy.array_equal(stoich.to_dense(prd_mat), [
+        [0, 0, 1, 1, 0, 0, 0, 0],
+        [0, 0, 0, 0, 1, 0, 0, 0],
+        [0, 0, 0, 0, 0, 1, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0]])
+
+
+def test__net():
+    """ test stoich.net
+    """
+    _, rct_mat, prd_mat = stoich.matrices(RXNS)
+    net_mat = stoich.net(rct_mat, prd_mat)
+    assert numpy.array_equal(
+        stoich.to_dense(net_mat),
+        stoich.to_dense(prd_mat) - stoich.to_dense(rct_mat))
+    # entries that cancel are dropped
+    _, rct_mat, prd_mat = stoich.matrices(['A+B<=>A+C'])
+    cols, vals = stoich.row_entries(stoich.net(rct_mat, prd_mat), 0)
+    assert tuple(cols) == (1, 2) and tuple(vals) == (-1., 1.)
+
+
+def test__dot__transpose_dot():
+    """ test stoich.dot and stoich.transpose_dot
+    """
+    _, rct_mat, prd_mat = stoich.matrices(RXNS + ('A<=>B',))
+    net_mat = stoich.net(rct_mat, prd_mat)
+    net_arr = stoich.to_dense(net_mat)
+    nrxns, nspcs = net_arr.shape
+
+    vec = numpy.arange(nspcs, dtype=float)
+    arr = numpy.arange(nspcs * 3, dtype=float).reshape((nspcs, 3))
+    assert numpy.allclose(stoich.dot(net_mat, vec), net_arr.dot(vec))
+    assert numpy.allclose(stoich.dot(net_mat, arr), net_arr.dot(arr))
+
+    vec = numpy.arange(nrxns, dtype=float)
+    assert numpy.allclose(stoich.transpose_dot(net_mat, vec),
+                          net_arr.T.dot(vec))
+
+    # rows without entries
+    empty_mat = stoich.from_triples([], [], [], shape=(3, 2))
+    assert numpy.array_equal(stoich.dot(empty_mat, [1., 1.]), [0., 0., 0.])
+
+
+def test__matrices__heptane():
+    """ test stoich.matrices on the heptane mechanism
+    """
+    mech_str = read_string(os.path.join(HEPTANE_PATH, 'mechanism.txt'))
+    spcs = species_names(mech_str)
+    rxns = [rxn for rxn, _ in reaction_data(mech_str)]
+
+    start = time.perf_counter()
+    all_spcs, rct_mat, prd_mat = stoich.matrices(rxns, spcs)
+    print("{:.3f} s".format(time.perf_counter() - start))
+    assert all_spcs == tuple(spcs)
+    assert stoich.shape_(rct_mat) == (len(rxns), len(spcs))
+
+    # every reaction has reactants and products
+    ones = numpy.ones(len(spcs))
+    assert numpy.all(stoich.dot(rct_mat, ones) > 0)
+    assert numpy.all(stoich.dot(prd_mat, ones) > 0)
+
+
+if __name__ == '__main__':
+    test__matrices()
+    test__net()
+    test__dot__transpose_dot()
+    test__matrices__heptane()
@@ -0,0 +1,124 @@
+""" test the automechanic.subproc module
+
+the jobs are run with a fake executable, which sleeps and exits as told
+"""
+import os
+import stat
+import time
+import asyncio
+import tempfile
+import subprocess
+from automechanic import subproc
+from automechanic import sched
+
+FAKE_JOB_SH = """#!/bin/sh
+# usage: fake_job.sh [seconds to sleep] [exit code]
+echo "running in $(pwd)"
+echo "a warning" >&2
+sleep "${1:-0}"
+echo "done"
+exit "${2:-0}"
+"""
+NJOBS = 300
+
+
+def _fake_job(tmp_dir):
+    """ write the fake executable to a directory
+    """
+    job_pth = os.path.join(tmp_dir, 'fake_job.sh')
+    with open(job_pth, 'w') as file_obj:
+        file_obj.write(FAKE_JOB_SH)
+    os.chmod(job_pth, os.stat(job_pth).st_mode | stat.S_IXUSR)
+    return job_pth
+
+
+def test__run():
+    """ test subproc.run
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+    job_pth = _fake_job(tmp_dir)
+
+    asyncio.run(subproc.run([job_pth], cwd=tmp_dir, out_name='job.out',
+                            err_name='job.err'))
+    assert (open(os.path.join(tmp_dir, 'job.out')).read() ==
+            'running in {:s}\ndone\n'.format(os.path.realpath(tmp_dir)))
+    assert open(os.path.join(tmp_dir, 'job.err')).read() == 'a warning\n'
+
+    try:
+        asyncio.run(subproc.run([job_pth, '0', '3'], cwd=tmp_dir))
+    except subprocess.CalledProcessError as err:
+        assert err.returncode == 3
+    else:
+        raise AssertionError("the job didn't fail")
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(subproc.run([job_pth, '5'], cwd=tmp_dir,
+                                out_name='job.out', timeout=0.2))
+    except subprocess.TimeoutExpired:
+        pass
+    else:
+        raise AssertionError("the job didn't time out")
+    assert time.perf_counter() - start < 2.
+    # the log has what was written before the job was killed
+    assert open(os.path.join(tmp_dir, 'job.out')).read().startswith(
+        'running in')
+
+
+def test__run__many():
+    """ test subproc.run with hundreds of jobs at once
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+    job_pth = _fake_job(tmp_dir)
+    job_dirs = [os.path.join(tmp_dir, 'job{:d}'.format(idx))
+                for idx in range(NJOBS)]
+    for job_dir in job_dirs:
+        os.mkdir(job_dir)
+
+    async def _run(job_dir, exit_code, node):
+        await subproc.run([job_pth, '0.5', str(exit_code)], cwd=job_dir,
+                          out_name='{:s}.out'.format(node))
+
+    start = time.perf_counter()
+    rets = sched.run_async(
+        _run, [(job_dir, int(idx % 50 == 0))
+               for idx, job_dir in enumerate(job_dirs)],
+        ('node1', 'node2'), node_limit=NJOBS // 2)
+    duration = time.perf_counter() - start
+    print("{:d} jobs in {:.2f} s".format(NJOBS, duration))
+
+    # the jobs sleep for 0.5 s each, so they must have run concurrently
+    assert duration < NJOBS * 0.5 / 10
+    assert [ok for ok, _ in rets] == [idx % 50 != 0 for idx in range(NJOBS)]
+    assert all(len(os.listdir(job_dir)) == 1 for job_dir in job_dirs)
+
+
+def test__run__cancel():
+    """ test that subproc.run kills its command when cancelled
+    """
+    tmp_dir = tempfile.mkdtemp()
+    print(tmp_dir)
+    job_pth = _fake_job(tmp_dir)
+
+    async def _run_and_cancel():
+        tsk = asyncio.ensure_future(subproc.run([job_pth, '5'], cwd=tmp_dir,
+                                                out_name='job.out'))
+        await asyncio.sleep(0.2)
+        tsk.cancel()
+        try:
+            await tsk
+        except asyncio.CancelledError:
+            pass
+
+    start = time.perf_counter()
+    asyncio.run(_run_and_cancel())
+    assert time.perf_counter() - start < 2.
+    assert 'done' not in open(os.path.join(tmp_dir, 'job.out')).read()
+
+
+if __name__ == '__main__':
+    test__run()
+    test__run__many()
+    test__run__cancel()
@@ -1,7 +1,9 @@
 """ test the automechanic.tab module
 """
+import os
 import tempfile
 import numpy
+from pandas import merge as _merge
 from automechanic import tab
 
 A_KEY = 'a'
@@ -31,6 +33,23 @@ def test__iter_():
                           (4, (20.0, (21, 22, 23))))
 
 
+def test__arr_():
+    """ test tab.arr_
+    """
+    arr = tab.arr_(TBL, (A_KEY, B_KEYS), typ=float)
+    assert arr.shape == (5, 4)
+    assert arr.dtype == numpy.float64
+    assert numpy.array_equal(arr, VALS[:, :4])
+
+
+def test__take():
+    """ test tab.take
+    """
+    tbl = tab.take(TBL, (3, 1))
+    assert tab.idxs_(tbl) == (3, 1)
+    assert numpy.array_equal(tab.vals_(tbl), VALS[[3, 1]])
+
+
 def test__from_records():
     """ test tab.from_records
     """
@@ -50,6 +69,28 @@ def test__from_records():
     assert tab.keys_(tbl) == ('a', 'b', 'c')
 
 
+def test__from_records__mixed_types():
+    """ test tab.from_records with mixed-type records
+    """
+    nrows = 1000
+    vals = [('x{:d}'.format(num), (num, 2. * num), float(num) / 3.)
+            for num in range(nrows)]
+    keys = ('a', ('b1', 'b2'), 'c')
+    typs = (str, int, float)
+    tbl = tab.from_records(vals, keys, typs)
+    assert tab.keys_(tbl) == ('a', 'b1', 'b2', 'c')
+    assert tab.typs_(tbl) == (numpy.dtype('O'), numpy.dtype('int64'),
+                              numpy.dtype('int64'), numpy.dtype('float64'))
+    assert tab.idxs_(tbl) == tuple(range(nrows))
+    assert tuple(tab.iter_(tbl, keys)) == tuple(
+        (a, (int(b1), int(b2)), c) for a, (b1, b2), c in vals)
+
+    tbl = tab.from_records([(0, 1), (2, 3)], ('a', 'b'))
+    assert tab.typs_(tbl) == (numpy.dtype('O'), numpy.dtype('O'))
+    tbl = tab.from_records(['x', 'y', 'z'], ('a',), typs=(str,))
+    assert tuple(tbl['a']) == ('x', 'y', 'z')
+
+
 def test__read_csv():
     """ test tab.read_csv
     """
@@ -63,6 +104,52 @@ def test__read_csv():
     assert tab.equal(tbl2, tbl2_)
 
 
+def test__read__write():
+    """ test tab.read and tab.write for all table file formats
+    """
+    tbl = tab.save_index(TBL.iloc[[4, 2, 0]])
+    tbl['d'] = ['x', tab.NAN, 'z']
+
+    tmp_dir = tempfile.mkdtemp()
+    for ext in (tab.CSV_EXT, tab.NPZ_EXT):
+        tbl_fle = os.path.join(tmp_dir, 'table' + ext)
+        tab.write(tbl_fle, tbl)
+        tbl_ = tab.read(tbl_fle)
+        assert tab.equal(tbl.fillna(''), tbl_.fillna(''))
+        assert tab.idxs_(tbl_) == (4, 2, 0)
+
+
+def test__iter_csv():
+    """ test tab.iter_csv, tab.append_csv, and tab.last_csv_value
+    """
+    tbl = tab.save_index(TBL)
+
+    tbl_fle = os.path.join(tempfile.mkdtemp(), 'table.csv')
+    assert tab.last_csv_value(tbl_fle) is None
+    tab.write_csv(tbl_fle, tbl)
+
+    tbls = tuple(tab.iter_csv(tbl_fle, chunk_size=2))
+    assert tuple(map(tab.idxs_, tbls)) == ((0, 1), (2, 3), (4,))
+    tbls = tuple(tab.iter_csv(tbl_fle, chunk_size=2, after=2))
+    assert tuple(map(tab.idxs_, tbls)) == ((3,), (4,))
+
+    # resuming after an index that isn't there is an error, not a no-op
+    try:
+        tuple(tab.iter_csv(tbl_fle, chunk_size=2, after=9))
+    except ValueError as err:
+        assert 'index 9' in str(err)
+    else:
+        raise AssertionError("no error for a missing index")
+
+    tbl_fle_out = os.path.join(tempfile.mkdtemp(), 'table.csv')
+    for tbl_ in tab.iter_csv(tbl_fle, chunk_size=2):
+        tab.append_csv(tbl_fle_out, tbl_)
+        assert tab.last_csv_value(tbl_fle_out) == tab.idxs_(tbl_)[-1]
+    assert tab.equal(tab.read_csv(tbl_fle_out), tab.read_csv(tbl_fle))
+    assert tab.last_csv_value(tbl_fle_out, key=A_KEY) == 20.
+    assert tab.keys_(tab.read_csv_header(tbl_fle_out)) == tab.keys_(tbl)
+
+
 def test__update():
     """ test tab.update
     """
@@ -84,6 +171,24 @@ def test__update():
                               tab.vals_(tbl3_.fillna(value=-99))))
 
 
+def test__update__inplace():
+    """ test tab.update, in place and copy-on-write
+    """
+    tbl = tab.from_records(tab.vals_(TBL), tab.keys_(TBL), tab.typs_(TBL))
+    tbl2 = tab.from_records([(-1., 'x'), (-2., 'y')], (A_KEY, 'd'),
+                            typs=(float, str), idxs=(3, 1))
+
+    tbl3 = tab.update(tbl, tbl2)
+    assert tab.equal(tbl, TBL)
+    assert tuple(tbl3[A_KEY]) == (0., -2., 10., -1., 20.)
+    assert tuple(tbl3['d'].fillna('')) == ('', 'y', '', 'x', '')
+    assert tab.typs_(tbl3) == tab.typs_(TBL) + (numpy.dtype('O'),)
+
+    tbl4 = tab.update(tbl, tbl2, inplace=True)
+    assert tbl4 is tbl
+    assert tab.equal(tbl.fillna(''), tbl3.fillna(''))
+
+
 def test__set_typs():
     """ test tab.change_type
     """
@@ -107,6 +212,19 @@ def test__next_index_save_key():
     assert tab.next_index_save_key(tbl) == 'i4_'
 
 
+def test__expand():
+    """ test tab.expand
+    """
+    vals_lst = ([0, 1], [3], [], [7], [8, 9])
+    vals = [[idx, val] for idx, vals in enumerate(vals_lst) for val in vals]
+    tbl = tab.save_index(TBL)
+    tbl2 = tab.from_records(vals, ('i0_', 'c'), typs=(int, float))
+    tbl3 = tab.expand(tbl, C_KEY, vals_lst, typ=float)
+    tbl3_ = tab.left_join(tbl[[key for key in tab.keys_(tbl) if key != C_KEY]],
+                          tbl2, key='i0_')
+    assert tab.equal(tbl3.fillna(-99), tbl3_.fillna(-99))
+
+
 def test__save_index():
     """ test tab.save_index
     """
@@ -120,36 +238,53 @@ def test__save_index():
 def test__left_join():
     """ test tab.left_join
     """
-    # for now, just make sure this runs
     vals_lst = ([0, 1], [3], [4, 5, 6], [7], [8, 9])
     vals = [[idx, val] for idx, vals in enumerate(vals_lst) for val in vals]
     vals.pop(2)
     tbl = tab.save_index(TBL)
     tbl2 = tab.from_records(vals, ('i0_', 'd'), typs=(int, int))
     tbl3 = tab.left_join(tbl, tbl2, key='i0_')
-    print(tbl3)
+    tbl3_ = _merge(tbl, tbl2, how='left', on='i0_')
+    assert tab.idxs_(tbl3) == (0, 1, 2, 3, 4, 5, 6, 7, 8)
+    assert tab.equal(tbl3.fillna(-99), tbl3_.fillna(-99))
+
+    tbl2 = tab.from_records([(1.,), (2.,)], ('d',), idxs=(3, 1))
+    tbl3 = tab.left_join(TBL, tbl2)
+    tbl3_ = _merge(TBL, tbl2, how='left', on=tab.IDX_KEY)
+    assert tab.equal(tbl3.fillna(-99), tbl3_.fillna(-99))
 
 
 def test__right_join():
     """ test tab.right_join
     """
-    # for now, just make sure this runs
     vals_lst = ([0, 1], [3], [4, 5, 6], [7], [8, 9])
     vals = [[idx, val] for idx, vals in enumerate(vals_lst) for val in vals]
     vals.pop(2)
+    vals.append([7, 10])
     tbl = tab.save_index(TBL)
     tbl2 = tab.from_records(vals, ('i0_', 'd'), typs=(int, int))
-    tbl3 = tab.right_join(tbl2, tbl, key='i0_')
-    print(tbl3)
+    for tbl3, tbl3_ in (
+            (tab.right_join(tbl2, tbl, key='i0_'),
+             _merge(tbl2, tbl, how='right', on='i0_')),
+            (tab.right_join(tbl, tbl2, key='i0_'),
+             _merge(tbl, tbl2, how='right', on='i0_'))):
+        assert tab.equal(tbl3.fillna(-99), tbl3_.fillna(-99))
 
 
 if __name__ == '__main__':
     test__iter_()
+    test__arr_()
+    test__take()
     test__from_records()
+    test__from_records__mixed_types()
     test__read_csv()
+    test__read__write()
+    test__iter_csv()
     test__update()
+    test__update__inplace()
     test__set_typs()
     test__has_keys()
     test__next_index_save_key()
+    test__expand()
     test__save_index()
     test__right_join()
@@ -0,0 +1,120 @@
+""" test the automechanic.thermo module
+"""
+import os
+import time
+import numpy
+from automechanic import tab
+from automechanic import thermo
+from automechanic import params as par
+from automechanic.iohelp import read_string
+from automechanic.parse.chemkin import thermo_data
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+HEPTANE_THERMO_PATH = os.path.join(PATH, '../../examples/heptane',
+                                   'thermo_data.txt')
+TEMPS = numpy.linspace(300., 3000., 10)
+
+
+def _species_table():
+    thm_dat_lst = thermo_data(read_string(HEPTANE_THERMO_PATH))
+    keys = (par.SPC.TAB.NAME_KEY, par.SPC.TAB.NASA_C_LO_KEYS,
+            par.SPC.TAB.NASA_C_HI_KEYS, par.SPC.TAB.NASA_T_KEYS)
+    typs = (par.SPC.TAB.NAME_TYP, par.SPC.TAB.NASA_C_TYP,
+            par.SPC.TAB.NASA_C_TYP, par.SPC.TAB.NASA_T_TYP)
+    return tab.from_records(vals=thm_dat_lst, keys=keys, typs=typs)
+
+
+def _enthalpy_over_rt(temp, cfts):
+    cf1, cf2, cf3, cf4, cf5, cf6, _ = cfts
+    return (cf1 + cf2 * temp / 2. + cf3 * temp ** 2 / 3. +
+            cf4 * temp ** 3 / 4. + cf5 * temp ** 4 / 5. + cf6 / temp)
+
+
+def _entropy_over_r(temp, cfts):
+    cf1, cf2, cf3, cf4, cf5, _, cf7 = cfts
+    return (cf1 * numpy.log(temp) + cf2 * temp + cf3 * temp ** 2 / 2. +
+            cf4 * temp ** 3 / 3. + cf5 * temp ** 4 / 4. + cf7)
+
+
+def test__nasa_coefficients():
+    """ test thermo.nasa_coefficients
+    """
+    spc_tbl = _species_table()
+    cfts_lo, cfts_hi, tmps = thermo.nasa_coefficients(spc_tbl)
+    nspcs = len(spc_tbl)
+    assert cfts_lo.shape == cfts_hi.shape == (nspcs, 7)
+    assert tmps.shape == (nspcs, 3)
+
+
+def test__enthalpy_over_rt__entropy_over_r__gibbs_over_rt():
+    """ test thermo.enthalpy_over_rt, .entropy_over_r and .gibbs_over_rt
+
+    against a species-by-species, temperature-by-temperature evaluation
+    """
+    spc_tbl = _species_table()
+    enth = thermo.enthalpy_over_rt(spc_tbl, TEMPS)
+    entr = thermo.entropy_over_r(spc_tbl, TEMPS)
+    gibbs = thermo.gibbs_over_rt(spc_tbl, TEMPS)
+    assert enth.shape == entr.shape == gibbs.shape == (len(spc_tbl),
+                                                       len(TEMPS))
+    assert numpy.allclose(gibbs, enth - entr)
+
+    for row, (cfts_lo, cfts_hi, tmps) in enumerate(tab.iter_(
+            spc_tbl, (par.SPC.TAB.NASA_C_LO_KEYS, par.SPC.TAB.NASA_C_HI_KEYS,
+                      par.SPC.TAB.NASA_T_KEYS))):
+        _, _, t_c = tmps
+        for col, temp in enumerate(TEMPS):
+            cfts = cfts_lo if temp <= t_c else cfts_hi
+            assert numpy.isclose(enth[row, col], _enthalpy_over_rt(temp, cfts))
+            assert numpy.isclose(entr[row, col], _entropy_over_r(temp, cfts))
+
+
+def test__heat_capacity_over_r():
+    """ test thermo.heat_capacity_over_r
+
+    as the temperature derivative of the enthalpy
+    """
+    spc_tbl = _species_table()
+    dtmp = 1e-3
+    temps = numpy.array([500., 2000.])
+    cp_ = thermo.heat_capacity_over_r(spc_tbl, temps)
+    enth_hi = thermo.enthalpy_over_rt(spc_tbl, temps + dtmp) * (temps + dtmp)
+    enth_lo = thermo.enthalpy_over_rt(spc_tbl, temps - dtmp) * (temps - dtmp)
+    assert numpy.allclose(cp_, (enth_hi - enth_lo) / (2 * dtmp), rtol=1e-5)
+
+
+def test__out_of_range():
+    """ test thermo.out_of_range
+    """
+    spc_tbl = _species_table()
+    temps = [100., 1000., 10000.]
+    mask = thermo.out_of_range(spc_tbl, temps)
+    for row, (t_lo, t_hi, _) in enumerate(
+            tab.iter_(spc_tbl, par.SPC.TAB.NASA_T_KEYS)):
+        assert tuple(mask[row]) == tuple(not t_lo <= temp <= t_hi
+                                         for temp in temps)
+
+
+def test__gibbs_over_rt__large():
+    """ test thermo.gibbs_over_rt on 5,000 species and 1,000 temperatures
+    """
+    spc_tbl = _species_table()
+    reps = 5000 // len(spc_tbl) + 1
+    big_spc_tbl = tab.from_records(
+        vals=numpy.tile(tab.vals_(spc_tbl), (reps, 1))[:5000],
+        keys=tab.keys_(spc_tbl))
+    temps = numpy.linspace(300., 3000., 1000)
+
+    start = time.perf_counter()
+    gibbs = thermo.gibbs_over_rt(big_spc_tbl, temps)
+    print("{:.3f} s".format(time.perf_counter() - start))
+    assert gibbs.shape == (5000, 1000)
+    assert numpy.isfinite(gibbs).all()
+
+
+if __name__ == '__main__':
+    test__nasa_coefficients()
+    test__enthalpy_over_rt__entropy_over_r__gibbs_over_rt()
+    test__heat_capacity_over_r()
+    test__out_of_range()
+    test__gibbs_over_rt__large()
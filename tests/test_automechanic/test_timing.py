@@ -0,0 +1,46 @@
+""" test the automechanic.timing module
+"""
+import os
+import json
+import tempfile
+from automechanic import timing
+from automechanic import mol
+
+
+def test__timer():
+    """ test timing.timer
+    """
+    timing.reset()
+    for _ in range(3):
+        with timing.timer('stage1'):
+            pass
+    with timing.timer('stage2'):
+        pass
+    assert set(timing.timings()) == {'stage1', 'stage2'}
+    assert all(val >= 0. for val in timing.timings().values())
+
+    timing.reset()
+    assert timing.timings() == {}
+
+
+def test__summary():
+    """ test timing.summary
+    """
+    ich = 'InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3'
+
+    timing.reset()
+    mol.inchi.recalculate(ich)
+    mol.inchi.recalculate(ich)
+    summ = timing.summary(command='test')
+    assert summ['command'] == 'test'
+    assert summ['caches']['inchi.recalculate']['hits'] >= 1
+    assert summ['counts'].get(timing.RDKIT_CALLS_KEY, 0) <= 2
+
+    summ_pth = os.path.join(tempfile.mkdtemp(), 'summary.json')
+    timing.write_summary(summ_pth, summ)
+    assert json.load(open(summ_pth)) == summ
+
+
+if __name__ == '__main__':
+    test__timer()
+    test__summary()